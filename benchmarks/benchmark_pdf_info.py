@@ -0,0 +1,123 @@
+"""
+This code benchmarks reading a PDF's metadata with the light trailer reader
+against reading it with a full pdfrw parse, on a synthetic PDF with a great
+many pages and a large annexe.
+"""
+
+# Standard imports.
+import argparse
+import os
+import tempfile
+import timeit
+
+# Non-standard imports.
+from pdfrw import PdfArray, PdfDict, PdfName, PdfReader, PdfWriter
+
+# Bespoke imports.
+from chancery_b.pdf_info import LightTrailer, read_trailer
+
+# Local constants.
+DEFAULT_PAGES = 500
+DEFAULT_ANNEXE_BYTES = 8*1024*1024
+DEFAULT_REPEATS = 5
+
+#############
+# FUNCTIONS #
+#############
+
+def make_parser():
+    """ Make the parser object. """
+    desc_str = "Benchmark the light trailer reader against pdfrw."
+    result = argparse.ArgumentParser(description=desc_str)
+    result.add_argument(
+        "--pages",
+        help="The number of pages in the synthetic PDF",
+        type=int,
+        default=DEFAULT_PAGES
+    )
+    result.add_argument(
+        "--annexe-bytes",
+        help="The size of the annexe, before hex encoding",
+        type=int,
+        dest="annexe_bytes",
+        default=DEFAULT_ANNEXE_BYTES
+    )
+    result.add_argument(
+        "--repeats",
+        help="The number of times to read the PDF with each reader",
+        type=int,
+        default=DEFAULT_REPEATS
+    )
+    return result
+
+def make_synthetic_pdf(path_to_pdf, pages, annexe_bytes):
+    """ Write a PDF with a given number of pages, and an annexe of a given
+    size, to a given path. """
+    page_tree = PdfDict(Type=PdfName.Pages, Kids=PdfArray(), Count=pages)
+    page_tree.indirect = True
+    for index in range(pages):
+        page = \
+            PdfDict(
+                Type=PdfName.Page,
+                MediaBox=PdfArray([0, 0, 612, 792]),
+                Parent=page_tree
+            )
+        page.indirect = True
+        page.Contents = PdfDict()
+        page.Contents.stream = "% Page "+str(index)
+        page_tree.Kids.append(page)
+    info = PdfDict()
+    info.indirect = True
+    info.data_ordinal = 1
+    info.data_latex = "A synthetic ordinance."
+    info.data_annexe = os.urandom(annexe_bytes).hex()
+    info.hash = "0"*64
+    info.stamp = "0"*512
+    trailer = \
+        PdfDict(Root=PdfDict(Type=PdfName.Catalog, Pages=page_tree), Info=info)
+    PdfWriter(path_to_pdf, trailer=trailer).write()
+
+def read_with_pdfrw(path_to_pdf):
+    """ Read the metadata we need, the old way. """
+    info = PdfReader(path_to_pdf).Info
+    result = (info.hash, info.stamp, info.data_annexe)
+    return result
+
+def read_with_light_reader(path_to_pdf):
+    """ Read the metadata we need, the new way. """
+    trailer = read_trailer(path_to_pdf)
+    if not isinstance(trailer, LightTrailer):
+        raise RuntimeError("The light reader fell back to pdfrw.")
+    info = trailer.Info
+    result = (info.hash, info.stamp, info.data_annexe)
+    return result
+
+###################
+# RUN AND WRAP UP #
+###################
+
+def run():
+    """ Run this file. """
+    arguments = make_parser().parse_args()
+    with tempfile.TemporaryDirectory() as path_to_dir:
+        path_to_pdf = os.path.join(path_to_dir, "synthetic.pdf")
+        make_synthetic_pdf(path_to_pdf, arguments.pages, arguments.annexe_bytes)
+        if read_with_pdfrw(path_to_pdf) != read_with_light_reader(path_to_pdf):
+            raise RuntimeError("The readers disagree.")
+        print("PDF size: "+str(os.path.getsize(path_to_pdf))+" bytes")
+        for name, function in (
+            ("pdfrw", read_with_pdfrw),
+            ("light reader", read_with_light_reader)
+        ):
+            seconds = \
+                min(
+                    timeit.repeat(
+                        lambda function=function: function(path_to_pdf),
+                        number=1,
+                        repeat=arguments.repeats
+                    )
+                )
+            print(name+": "+format(seconds*1000, ".1f")+" ms per read")
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,97 @@
+"""
+This code benchmarks making and verifying stamps with each of the supported
+key types, using a freshly generated pair of keys of each type.
+"""
+
+# Standard imports.
+import argparse
+import os
+import tempfile
+import timeit
+
+# Bespoke imports.
+from chancery_b.digistamp import (
+    KEY_TYPES,
+    StampMachine,
+    Verifier,
+    generate_keys
+)
+
+# Local constants.
+DEFAULT_NUMBER = 200
+DEFAULT_REPEATS = 5
+PASSWORD = "benchmark"
+DATA = "0"*64 # The length of a block's hash.
+
+#############
+# FUNCTIONS #
+#############
+
+def make_parser():
+    """ Make the parser object. """
+    desc_str = "Benchmark stamping and verifying with each key type."
+    result = argparse.ArgumentParser(description=desc_str)
+    result.add_argument(
+        "--number",
+        help="The number of stamps to make or verify in each timing",
+        type=int,
+        default=DEFAULT_NUMBER
+    )
+    result.add_argument(
+        "--repeats",
+        help="The number of timings to take the best of",
+        type=int,
+        default=DEFAULT_REPEATS
+    )
+    return result
+
+def time_per_call(function, arguments):
+    """ Return the best time per call, in microseconds. """
+    seconds = \
+        min(
+            timeit.repeat(
+                function,
+                number=arguments.number,
+                repeat=arguments.repeats
+            )
+        )
+    result = seconds*1e6/arguments.number
+    return result
+
+def benchmark_key_type(key_type, path_to_dir, arguments):
+    """ Print the timings for a given key type. """
+    path_to_private_key = os.path.join(path_to_dir, key_type+"_private.pem")
+    path_to_public_key = os.path.join(path_to_dir, key_type+"_public.pem")
+    generate_keys(
+        path_to_private_key=path_to_private_key,
+        path_to_public_key=path_to_public_key,
+        password=PASSWORD,
+        key_type=key_type
+    )
+    stamp_machine = \
+        StampMachine(path_to_private_key=path_to_private_key, password=PASSWORD)
+    verifier = Verifier(path_to_public_key=path_to_public_key)
+    stamp = stamp_machine.make_stamp(DATA)
+    if not verifier.verify(DATA, stamp):
+        raise RuntimeError("A "+key_type+" stamp failed to verify.")
+    make_time = time_per_call(lambda: stamp_machine.make_stamp(DATA), arguments)
+    verify_time = time_per_call(lambda: verifier.verify(DATA, stamp), arguments)
+    print(
+        key_type+": "+format(make_time, ".1f")+" us per stamp, "+
+        format(verify_time, ".1f")+" us per verification, "+
+        str(len(stamp)//2)+" bytes per stamp"
+    )
+
+###################
+# RUN AND WRAP UP #
+###################
+
+def run():
+    """ Run this file. """
+    arguments = make_parser().parse_args()
+    with tempfile.TemporaryDirectory() as path_to_dir:
+        for key_type in KEY_TYPES:
+            benchmark_key_type(key_type, path_to_dir, arguments)
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,341 @@
+"""
+This code times the hot paths - uploading, looking up, hashing, verifying and
+extracting - against a synthetic ledger, writes the results as JSON, and can
+compare them with a saved baseline, flagging any regressions.
+"""
+
+# Standard imports.
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Non-standard imports.
+from pdfrw import PdfArray, PdfDict, PdfName, PdfWriter
+
+# Bespoke imports.
+from chancery_b.configs import ANNEXE_DIGEST_COLUMN, HASH_COLUMN, STAMP_COLUMN
+from chancery_b.digistamp import Verifier
+from chancery_b.extractor import Extractor
+from chancery_b.ledger import Ledger
+from chancery_b.ordinance import Ordinance
+from chancery_b.pdf_info import read_trailer
+from chancery_b.pdf_verifier import PDFVerifier
+from chancery_b.uploader import Uploader
+from chancery_b.utils import get_hash_of_ordinance
+from synthetic_ledger import (
+    LEDGER_FN,
+    PASSWORD,
+    PATH_TO_FIXED_PRIVATE_KEY,
+    PATH_TO_FIXED_PUBLIC_KEY,
+    SIZES,
+    add_generator_arguments,
+    generate_ordinances,
+    make_synthetic_ledger
+)
+
+# Local constants.
+RESULTS_FORMAT_VERSION = 1
+DEFAULT_REPEATS = 3
+DEFAULT_TOLERANCE = 0.25
+# The number of operations per timing.
+LOOKUPS = 1000
+HASHES = 200
+STAMPS = 200
+PDF_READS = 50
+SINGLE_UPLOADS = 20
+EXTRACTIONS = 3
+
+#############
+# FUNCTIONS #
+#############
+
+def make_parser():
+    """ Make the parser object. """
+    desc_str = "Benchmark the hot paths against a synthetic ledger."
+    result = argparse.ArgumentParser(description=desc_str)
+    add_generator_arguments(result)
+    result.add_argument(
+        "--path-to-dir",
+        help=(
+            "Where to keep the synthetic ledger, so that it can be reused "+
+            "from one run to the next (default: a temporary directory)"
+        ),
+        type=str,
+        dest="path_to_dir"
+    )
+    result.add_argument(
+        "--repeats",
+        help="The number of timings to take the best of",
+        type=int,
+        default=DEFAULT_REPEATS
+    )
+    result.add_argument(
+        "--extract",
+        help="Also time full extractions, which needs pdflatex",
+        action="store_true",
+        dest="extract"
+    )
+    result.add_argument(
+        "--output",
+        help="Where to write the results as JSON",
+        type=str,
+        dest="path_to_output"
+    )
+    result.add_argument(
+        "--compare",
+        help="The path to a baseline results file to compare against",
+        type=str,
+        dest="path_to_baseline"
+    )
+    result.add_argument(
+        "--current",
+        help=(
+            "With --compare, a results file to compare with the baseline, "+
+            "instead of running the benchmarks"
+        ),
+        type=str,
+        dest="path_to_current"
+    )
+    result.add_argument(
+        "--tolerance",
+        help=(
+            "How much slower than the baseline a result can be before it "+
+            "counts as a regression (default: "+str(DEFAULT_TOLERANCE)+")"
+        ),
+        type=float,
+        default=DEFAULT_TOLERANCE
+    )
+    return result
+
+def time_per_op(function, inputs, repeats):
+    """ Call a given function on each of a list of inputs, a given number of
+    times over, and return the best average time per call, along with the
+    number of calls per round. """
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for item in inputs:
+            function(item)
+        elapsed = (time.perf_counter()-start)/len(inputs)
+        if best is None or elapsed < best:
+            best = elapsed
+    result = {"seconds": best, "ops": len(inputs)}
+    return result
+
+def make_base_pdf(path_to_pdf):
+    """ Write a one-page PDF, standing in for what pdflatex would make. """
+    page = \
+        PdfDict(
+            Type=PdfName.Page,
+            MediaBox=PdfArray([0, 0, 612, 792]),
+            Contents=PdfDict()
+        )
+    page.Contents.stream = "% A synthetic page."
+    page.indirect = True
+    page_tree = PdfDict(Type=PdfName.Pages, Kids=PdfArray([page]), Count=1)
+    page_tree.indirect = True
+    page.Parent = page_tree
+    trailer = \
+        PdfDict(
+            Root=PdfDict(Type=PdfName.Catalog, Pages=page_tree),
+            Info=PdfDict()
+        )
+    PdfWriter(path_to_pdf, trailer=trailer).write()
+
+def make_extract_pdf(ledger, ordinal, path_to_dir):
+    """ Make the PDF for a given block, as an extraction would, but without
+    running pdflatex, returning the path to it. """
+    extractor = \
+        Extractor(ordinal=ordinal, ledger=ledger, path_to_scratch=path_to_dir)
+    extractor.make_working_dir()
+    make_base_pdf(extractor.get_working_path(extractor.WORKING_STEM+".pdf"))
+    extractor.add_metadata()
+    result = extractor.get_working_path(extractor.WORKING_STEM+".pdf")
+    return result
+
+def find_ordinal_with_annexe(ledger):
+    """ Find the first block with an annexe, or else the first block. """
+    row = \
+        ledger.connection.execute(
+            "SELECT ordinal FROM Block WHERE "+ANNEXE_DIGEST_COLUMN+" IS NOT "+
+            "NULL ORDER BY ordinal LIMIT 1;"
+        ).fetchone()
+    result = row["ordinal"] if row else 1
+    return result
+
+def run_benchmarks(path_to_ledger, arguments, results):
+    """ Time each hot path against a given ledger, adding to a dictionary of
+    results. """
+    repeats = arguments.repeats
+    rng = random.Random(arguments.seed)
+    ledger = Ledger(path_to_ledger=path_to_ledger)
+    tip_ordinal = ledger.tip()["ordinal"]
+    ordinals = [rng.randint(1, tip_ordinal) for _ in range(LOOKUPS)]
+    results["tip"] = \
+        time_per_op(lambda _: ledger.tip(), range(LOOKUPS), repeats)
+    extractor = Extractor(ordinal=1, ledger=ledger)
+    results["fetch_block"] = \
+        time_per_op(extractor.fetch_block, ordinals, repeats)
+    results["get_by_hash"] = \
+        time_per_op(
+            ledger.get_by_hash,
+            [ledger.get_header(ordinal)[HASH_COLUMN] for ordinal in ordinals],
+            repeats
+        )
+    blocks = [ledger.get(ordinal) for ordinal in ordinals[:HASHES]]
+    ordinances = []
+    for block in blocks:
+        ordinance = Ordinance()
+        ordinance.load_from_block(block)
+        ordinances.append(ordinance)
+    results["get_hash_of_ordinance"] = \
+        time_per_op(get_hash_of_ordinance, ordinances, repeats)
+    verifier = Verifier(path_to_public_key=PATH_TO_FIXED_PUBLIC_KEY)
+    results["verify_stamp"] = \
+        time_per_op(
+            lambda block: \
+                verifier.verify(block[HASH_COLUMN], block[STAMP_COLUMN]),
+            blocks[:STAMPS],
+            repeats
+        )
+    with tempfile.TemporaryDirectory() as path_to_scratch:
+        path_to_pdf = \
+            make_extract_pdf(
+                ledger, find_ordinal_with_annexe(ledger), path_to_scratch
+            )
+        results["read_pdf_metadata"] = \
+            time_per_op(read_trailer, [path_to_pdf]*PDF_READS, repeats)
+        results["verify_pdf"] = \
+            time_per_op(
+                lambda path: PDFVerifier(
+                    path_to_pdf=path, verifier=verifier, debug=False
+                ).verify(),
+                [path_to_pdf]*PDF_READS,
+                repeats
+            )
+        if arguments.extract:
+            results["extract"] = \
+                time_per_op(
+                    lambda ordinal: Extractor(
+                        ordinal=ordinal,
+                        ledger=ledger,
+                        path_to_extracts=path_to_scratch,
+                        path_to_public_key=PATH_TO_FIXED_PUBLIC_KEY
+                    ).extract(),
+                    ordinals[:EXTRACTIONS],
+                    1
+                )
+    # Last of all, since this adds to the ledger.
+    uploads = \
+        generate_ordinances(SINGLE_UPLOADS, seed=arguments.seed+tip_ordinal)
+    results["upload"] = \
+        time_per_op(
+            lambda ordinance: Uploader(
+                ordinance=ordinance,
+                ledger=ledger,
+                path_to_private_key=PATH_TO_FIXED_PRIVATE_KEY,
+                password=PASSWORD
+            ).upload(),
+            list(uploads),
+            1
+        )
+    ledger.close()
+
+def benchmark(arguments):
+    """ Build or reuse the synthetic ledger, run the benchmarks, and return
+    the results. """
+    number = SIZES[arguments.size]
+    result = {
+        "format_version": RESULTS_FORMAT_VERSION,
+        "meta": {
+            "size": arguments.size,
+            "blocks": number,
+            "seed": arguments.seed,
+            "annexe_rate": arguments.annexe_rate,
+            "max_annexe_bytes": arguments.max_annexe_bytes,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "machine": platform.machine(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        },
+        "results": {}
+    }
+    with tempfile.TemporaryDirectory() as path_to_temp:
+        path_to_dir = arguments.path_to_dir or path_to_temp
+        path_to_ledger = os.path.join(path_to_dir, LEDGER_FN)
+        if not os.path.exists(path_to_ledger):
+            start = time.perf_counter()
+            make_synthetic_ledger(
+                path_to_dir,
+                number,
+                seed=arguments.seed,
+                annexe_rate=arguments.annexe_rate,
+                max_annexe_bytes=arguments.max_annexe_bytes
+            )
+            result["results"]["upload_batch"] = {
+                "seconds": (time.perf_counter()-start)/number,
+                "ops": number
+            }
+        run_benchmarks(path_to_ledger, arguments, result["results"])
+    return result
+
+def compare(baseline, current, tolerance):
+    """ Print each result beside its baseline, and return the names of those
+    which have slowed down by more than a given tolerance. """
+    result = []
+    if baseline["meta"].get("blocks") != current["meta"].get("blocks"):
+        print(
+            "Warning: the baseline was taken on a ledger of a different size."
+        )
+    for name, timing in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+        ratio = timing["seconds"]/baseline["results"][name]["seconds"]
+        line = \
+            name.ljust(24)+format(ratio, ".2f").rjust(6)+"x baseline"
+        if ratio > 1+tolerance:
+            line += "  REGRESSION"
+            result.append(name)
+        print(line)
+    return result
+
+def print_results(results):
+    """ Print each result on a line of its own. """
+    for name, timing in results["results"].items():
+        print(
+            name.ljust(24)+
+            format(timing["seconds"]*1e6, ".1f").rjust(12)+" us per op"
+        )
+
+###################
+# RUN AND WRAP UP #
+###################
+
+def run():
+    """ Run this file. """
+    arguments = make_parser().parse_args()
+    if arguments.path_to_current:
+        if not arguments.path_to_baseline:
+            sys.exit("--current only makes sense with --compare.")
+        with open(arguments.path_to_current, "r") as current_file:
+            results = json.load(current_file)
+    else:
+        results = benchmark(arguments)
+        print_results(results)
+    if arguments.path_to_output:
+        with open(arguments.path_to_output, "w") as output_file:
+            json.dump(results, output_file, indent=4)
+    if arguments.path_to_baseline:
+        with open(arguments.path_to_baseline, "r") as baseline_file:
+            baseline = json.load(baseline_file)
+        if compare(baseline, results, arguments.tolerance):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,220 @@
+"""
+This code builds a synthetic ledger, of any size, for benchmarking. The
+ordinances have LaTeX bodies of a realistic length and markup, and a few of
+them have annexes - real zip archives - of a realistic range of sizes. The
+blocks are stamped with the fixed test key, so that no key need be generated,
+and the same seed always gives the same ordinances.
+"""
+
+# Standard imports.
+import argparse
+import io
+import os
+import random
+import time
+import zipfile
+from datetime import date
+from pathlib import Path
+
+# Bespoke imports.
+from chancery_b.configs import TEST_PASSWORD
+from chancery_b.ordinance import Ordinance
+from chancery_b.uploader import BatchUploader
+from chancery_b.utils import create_data_dir_as_necessary
+
+# Local constants.
+SIZES = {"1k": 1000, "100k": 100000, "1m": 1000000}
+DEFAULT_SIZE = "1k"
+DEFAULT_SEED = 1707
+FIRST_DATE = date(2000, 1, 1)
+DEFAULT_ANNEXE_RATE = 0.05
+MIN_ANNEXE_BYTES = 1024
+DEFAULT_MAX_ANNEXE_BYTES = 64*1024
+COMMIT_GROUP_SIZE = 1000
+LEDGER_FN = "synthetic_ledger.db"
+PATH_OBJ_TO_FIXED_DATA = Path(__file__).parent.parent/"tests"/"test_data"
+PATH_TO_FIXED_PRIVATE_KEY = \
+    str(PATH_OBJ_TO_FIXED_DATA/"fixed_stamp_private_key.pem")
+PATH_TO_FIXED_PUBLIC_KEY = \
+    str(PATH_OBJ_TO_FIXED_DATA/"fixed_stamp_public_key.pem")
+PASSWORD = TEST_PASSWORD
+# Text.
+WORDS = (
+    "whereas", "the", "chancellor", "hereby", "ordains", "that", "all",
+    "persons", "of", "our", "realm", "shall", "be", "bound", "by", "this",
+    "warrant", "and", "any", "seal", "affixed", "thereto", "in", "witness",
+    "whereof", "we", "have", "caused", "these", "letters", "to", "made",
+    "patent", "given", "at", "court", "under", "hand", "for", "term",
+    "office", "during", "pleasure", "with", "such", "rights", "privileges",
+    "as", "are", "accustomed", "lands", "tenements", "revenues", "thereof",
+    "provided", "always", "nothing", "herein", "contained", "prejudice"
+)
+ORDINANCE_TYPES = ("declaration", "order")
+MIN_PARAGRAPHS = 1
+MAX_PARAGRAPHS = 6
+MIN_WORDS = 40
+MAX_WORDS = 120
+
+#############
+# FUNCTIONS #
+#############
+
+def make_paragraph(rng):
+    """ Make a paragraph of LaTeX, with a little markup. """
+    words = rng.choices(WORDS, k=rng.randint(MIN_WORDS, MAX_WORDS))
+    words[0] = words[0].capitalize()
+    index = rng.randrange(len(words))
+    words[index] = rng.choice(("\\textit{", "\\emph{"))+words[index]+"}"
+    result = " ".join(words)+"."
+    if rng.random() < 0.2:
+        items = [
+            "\\item "+" ".join(rng.choices(WORDS, k=8))+";"
+            for _ in range(rng.randint(2, 5))
+        ]
+        result += \
+            "\n\\begin{enumerate}\n"+"\n".join(items)+"\n\\end{enumerate}"
+    return result
+
+def make_latex(rng):
+    """ Make the body of an ordinance. """
+    paragraphs = [
+        make_paragraph(rng)
+        for _ in range(rng.randint(MIN_PARAGRAPHS, MAX_PARAGRAPHS))
+    ]
+    result = "\n\n".join(paragraphs)
+    return result
+
+def make_annexe(rng, max_annexe_bytes):
+    """ Make a zip archive, of a size drawn log-uniformly from the range
+    allowed, holding incompressible data, as scanned documents would be. """
+    size = \
+        int(
+            MIN_ANNEXE_BYTES*
+            (max_annexe_bytes/MIN_ANNEXE_BYTES)**rng.random()
+        )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+        archive.writestr("scan.bin", rng.randbytes(size))
+    result = buffer.getvalue()
+    return result
+
+def generate_ordinances(
+        number,
+        seed=DEFAULT_SEED,
+        annexe_rate=DEFAULT_ANNEXE_RATE,
+        max_annexe_bytes=DEFAULT_MAX_ANNEXE_BYTES
+    ):
+    """ Yield a given number of synthetic ordinances, in date order, with
+    up to two days between each. """
+    rng = random.Random(seed)
+    day_number = FIRST_DATE.toordinal()
+    for _ in range(number):
+        day_number += rng.randint(0, 2)
+        ordinance_date = date.fromordinal(day_number)
+        annexe = None
+        if rng.random() < annexe_rate:
+            annexe = make_annexe(rng, max_annexe_bytes)
+        yield Ordinance(
+            ordinance_type=rng.choice(ORDINANCE_TYPES),
+            latex=make_latex(rng),
+            year=ordinance_date.year,
+            month_num=ordinance_date.month,
+            day=ordinance_date.day,
+            annexe=annexe
+        )
+
+def make_synthetic_ledger(
+        path_to_dir,
+        number,
+        seed=DEFAULT_SEED,
+        annexe_rate=DEFAULT_ANNEXE_RATE,
+        max_annexe_bytes=DEFAULT_MAX_ANNEXE_BYTES
+    ):
+    """ Build a ledger of a given number of blocks in a given directory,
+    returning the path to it. """
+    path_to_ledger = os.path.join(path_to_dir, LEDGER_FN)
+    if os.path.exists(path_to_ledger):
+        raise FileExistsError("Ledger already exists at: "+path_to_ledger)
+    create_data_dir_as_necessary(path_to_data=path_to_dir, ledger_fn=LEDGER_FN)
+    uploader = \
+        BatchUploader(
+            ordinances=
+                generate_ordinances(
+                    number,
+                    seed=seed,
+                    annexe_rate=annexe_rate,
+                    max_annexe_bytes=max_annexe_bytes
+                ),
+            path_to_ledger=path_to_ledger,
+            path_to_private_key=PATH_TO_FIXED_PRIVATE_KEY,
+            password=PASSWORD,
+            commit_group_size=COMMIT_GROUP_SIZE
+        )
+    uploader.upload()
+    uploader.ledger.close()
+    return path_to_ledger
+
+def add_generator_arguments(parser):
+    """ Add the arguments which shape the synthetic ledger. """
+    parser.add_argument(
+        "--size",
+        help="The number of blocks (default: "+DEFAULT_SIZE+")",
+        choices=SIZES,
+        default=DEFAULT_SIZE
+    )
+    parser.add_argument(
+        "--seed",
+        help="The seed for the random number generator",
+        type=int,
+        default=DEFAULT_SEED
+    )
+    parser.add_argument(
+        "--annexe-rate",
+        help="The proportion of ordinances with an annexe",
+        type=float,
+        dest="annexe_rate",
+        default=DEFAULT_ANNEXE_RATE
+    )
+    parser.add_argument(
+        "--max-annexe-bytes",
+        help="The size of the largest annexe",
+        type=int,
+        dest="max_annexe_bytes",
+        default=DEFAULT_MAX_ANNEXE_BYTES
+    )
+
+def make_parser():
+    """ Make the parser object. """
+    desc_str = "Build a synthetic ledger for benchmarking."
+    result = argparse.ArgumentParser(description=desc_str)
+    result.add_argument(
+        "path_to_dir",
+        help="The directory in which to build the ledger",
+        type=str
+    )
+    add_generator_arguments(result)
+    return result
+
+###################
+# RUN AND WRAP UP #
+###################
+
+def run():
+    """ Run this file. """
+    arguments = make_parser().parse_args()
+    start = time.perf_counter()
+    path_to_ledger = \
+        make_synthetic_ledger(
+            arguments.path_to_dir,
+            SIZES[arguments.size],
+            seed=arguments.seed,
+            annexe_rate=arguments.annexe_rate,
+            max_annexe_bytes=arguments.max_annexe_bytes
+        )
+    print(
+        "Built "+path_to_ledger+" in "+
+        format(time.perf_counter()-start, ".1f")+" s"
+    )
+
+if __name__ == "__main__":
+    run()
@@ -17,7 +17,14 @@ SCRIPT_PATHS = (
     "scripts/extract-ordinance",
     "scripts/generate-chancery-keys",
     "scripts/generate-chancery-public-key",
-    "scripts/verify-ordinance-pdf"
+    "scripts/verify-ordinance-pdf",
+    "scripts/verify-ledger",
+    "scripts/checkpoint-ledger",
+    "scripts/prove-ordinance",
+    "scripts/check-ordinance-proof",
+    "scripts/search-ordinances",
+    "scripts/lookup-ordinances",
+    "scripts/chancery-daemon"
 )
 INSTALL_REQUIRES = ("cryptography", "hosker_utils", "pdfrw")
 INCLUDE_PACKAGE_DATA = True
@@ -4,15 +4,54 @@ provides an apparatus for creating, storing and verifying royal warrants.
 """
 
 # Local imports.
+from .aio import AsyncInterface
+from .configs import (
+    DEFAULT_CHECKPOINT_INTERVAL,
+    DEFAULT_PATH_TO_AUDIT_STATE,
+    DEFAULT_PATH_TO_LEDGER,
+    DEFAULT_PATH_TO_SOCKET
+)
+from .daemon import ChanceryDaemon, run_daemon
+from .daemon_client import (
+    add_daemon_arguments,
+    upload_ordinance_via_daemon,
+    extract_ordinance_via_daemon,
+    verify_pdf_via_daemon
+)
 from .digistamp import (
     DEFAULT_PATH_TO_PRIVATE_KEY,
     DEFAULT_PATH_TO_PUBLIC_KEY,
+    DEFAULT_KEY_TYPE,
+    KEY_TYPES,
     generate_keys,
     generate_public_key_from_path
 )
+from .instrumentation import (
+    Instrument,
+    JSONSink,
+    LogSink,
+    MemorySink,
+    add_profiling_arguments,
+    get_instrument,
+    run_with_profiling
+)
+from .ledger import DEFAULT_PAGE_SIZE
 from .machine_interface import (
     upload_ordinance_from_input_file,
+    upload_ordinances_from_batch_file,
     extract_ordinance_with_ordinal,
-    verify_pdf
+    extract_ordinances_in_range,
+    verify_pdf,
+    verify_pdfs_in_directory,
+    verify_ledger,
+    deduplicate_annexes,
+    checkpoint_ledger,
+    prove_ordinance,
+    check_ordinance_proof,
+    search_ordinances,
+    rebuild_search_index,
+    get_ordinance_by_hash,
+    list_ordinances_between,
+    list_ordinances_by_type
 )
 from .utils import create_data_dir_as_necessary
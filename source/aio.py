@@ -0,0 +1,406 @@
+"""
+This code defines an asyncio interface, mirroring the parts of the machine
+interface which a web service would call - uploading, extracting and
+verifying - without ever blocking the event loop.
+
+SQLite reads run on a small pool of threads, each with its own connection;
+writes run on a single thread of their own, since SQLite only takes one
+writer at a time anyway; and the heavier work - signing, checking stamps,
+hashing annexes and rewriting PDFs - runs on a pool sized to the CPUs. LaTeX
+runs as an asyncio subprocess, with a cap on how many compile at once. Every
+request is also subject to a cap on how many run at once, and to a timeout;
+note that a request which times out while waiting on a thread is abandoned,
+rather than interrupted, so the thread finishes its piece of work regardless.
+"""
+
+# Standard imports.
+import asyncio
+import json
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+
+# Local imports.
+from .configs import (
+    DEFAULT_PATH_TO_EXTRACTS,
+    DEFAULT_PATH_TO_LEDGER,
+    DEFAULT_PATH_TO_PDF_CACHE,
+    DEFAULT_PATH_TO_PRIVATE_KEY,
+    DEFAULT_PATH_TO_PUBLIC_KEY
+)
+from .extractor import Extractor
+from .ledger import get_ledger
+from .ordinance import Ordinance
+from .pdf_cache import PDFCache
+from .pdf_verifier import PDFVerifier
+from .uploader import Uploader
+
+# Local constants.
+CPU_COUNT = os.cpu_count() or 1
+DEFAULT_READ_WORKERS = 4
+DEFAULT_WORK_WORKERS = CPU_COUNT
+DEFAULT_LATEX_JOBS = CPU_COUNT
+DEFAULT_MAX_REQUESTS = 64
+DEFAULT_TIMEOUT = 300 # In seconds, for a whole request.
+DEFAULT_LATEX_TIMEOUT = 120 # In seconds, for one run of LaTeX.
+THREAD_NAME_PREFIX = "chancery_b_aio"
+
+##############
+# MAIN CLASS #
+##############
+
+@dataclass
+class AsyncInterface:
+    """ The class in question. Its executors can be shared between event
+    loops, but its semaphores belong to one loop at a time, and are made
+    afresh whenever the running loop changes. """
+    # Object attributes.
+    path_to_ledger: str = DEFAULT_PATH_TO_LEDGER
+    path_to_extracts: str = DEFAULT_PATH_TO_EXTRACTS
+    path_to_private_key: str = DEFAULT_PATH_TO_PRIVATE_KEY
+    path_to_public_key: str = DEFAULT_PATH_TO_PUBLIC_KEY
+    path_to_pdf_cache: str = DEFAULT_PATH_TO_PDF_CACHE
+    password: str = None
+    read_workers: int = DEFAULT_READ_WORKERS
+    work_workers: int = DEFAULT_WORK_WORKERS
+    latex_jobs: int = DEFAULT_LATEX_JOBS
+    max_requests: int = DEFAULT_MAX_REQUESTS
+    timeout: float = DEFAULT_TIMEOUT # If None, requests never time out.
+    latex_timeout: float = DEFAULT_LATEX_TIMEOUT
+    read_executor: ThreadPoolExecutor = None
+    write_executor: ThreadPoolExecutor = None
+    work_executor: ThreadPoolExecutor = None
+    loop: asyncio.AbstractEventLoop = None
+    request_semaphore: asyncio.Semaphore = None
+    latex_semaphore: asyncio.Semaphore = None
+
+    def __post_init__(self):
+        self.read_executor = \
+            ThreadPoolExecutor(
+                max_workers=self.read_workers,
+                thread_name_prefix=THREAD_NAME_PREFIX+"_read"
+            )
+        self.write_executor = \
+            ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix=THREAD_NAME_PREFIX+"_write"
+            )
+        self.work_executor = \
+            ThreadPoolExecutor(
+                max_workers=self.work_workers,
+                thread_name_prefix=THREAD_NAME_PREFIX+"_work"
+            )
+
+    def bind_to_running_loop(self):
+        """ Make the semaphores for the running loop, if we haven't
+        already. """
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self.loop = loop
+            self.request_semaphore = asyncio.Semaphore(self.max_requests)
+            self.latex_semaphore = asyncio.Semaphore(self.latex_jobs)
+
+    async def run_in(self, executor, function, *args, **kwargs):
+        """ Run a given function on a given executor, and await the
+        result. """
+        result = \
+            await asyncio.get_running_loop().run_in_executor(
+                executor, partial(function, *args, **kwargs)
+            )
+        return result
+
+    async def run_request(self, coroutine, timeout=None):
+        """ Await a given coroutine, once there's room for another request,
+        within a given timeout, or else this object's default. """
+        self.bind_to_running_loop()
+        if timeout is None:
+            timeout = self.timeout
+        async with self.request_semaphore:
+            try:
+                result = await asyncio.wait_for(coroutine, timeout)
+            except asyncio.TimeoutError as my_exception:
+                raise AsyncInterfaceError(
+                    "Request timed out after "+str(timeout)+" s."
+                ) from my_exception
+        return result
+
+    def upload_from_input_file(
+            self,
+            path_to_input_file,
+            deduplicate_annexe=False,
+            checkpoint_interval=None
+        ):
+        """ Upload an ordinance from a given input file, returning its
+        ordinal. This runs on the write thread. """
+        with open(path_to_input_file, "r") as input_file:
+            input_dict = json.loads(input_file.read())
+        result = \
+            self.upload_from_dict(
+                input_dict,
+                deduplicate_annexe=deduplicate_annexe,
+                checkpoint_interval=checkpoint_interval
+            )
+        return result
+
+    def upload_from_dict(
+            self,
+            input_dict,
+            deduplicate_annexe=False,
+            checkpoint_interval=None
+        ):
+        """ Upload an ordinance from a dictionary such as an input file
+        holds, returning its ordinal. This runs on the write thread. """
+        ordinance = Ordinance(**input_dict)
+        uploader = \
+            Uploader(
+                ordinance=ordinance,
+                ledger=get_ledger(path_to_ledger=self.path_to_ledger),
+                path_to_private_key=self.path_to_private_key,
+                password=self.password,
+                deduplicate_annexe=deduplicate_annexe,
+                checkpoint_interval=checkpoint_interval
+            )
+        uploader.upload()
+        result = ordinance.ordinal
+        return result
+
+    def make_extractor(self, ordinal, use_pdf_cache):
+        """ Make an extractor for the block with a given ordinal, and do all
+        the reading from the ledger which it will need, so that none of the
+        later stages need touch this thread's connection. This runs on a read
+        thread. """
+        pdf_cache = None
+        if use_pdf_cache:
+            pdf_cache = PDFCache(path_to_cache=self.path_to_pdf_cache)
+        result = \
+            Extractor(
+                ordinal=ordinal,
+                ledger=get_ledger(path_to_ledger=self.path_to_ledger),
+                path_to_extracts=self.path_to_extracts,
+                path_to_public_key=self.path_to_public_key,
+                pdf_cache=pdf_cache
+            )
+        result.run_stage(result.compare_hashes)
+        # An empty annexe is as good as none, and won't be fetched again.
+        if result.fetch_annexe() is None:
+            result.annexe = b""
+        return result
+
+    async def compile_main_tex(self, extractor):
+        """ Compile the PDF, or fetch it from the cache, without blocking the
+        event loop. LaTeX's input is closed, so that it fails, rather than
+        waiting for an answer, on an error. """
+        if await self.run_in(
+            self.work_executor, extractor.fetch_from_pdf_cache
+        ):
+            return
+        latex_args = extractor.get_latex_args()
+        async with self.latex_semaphore:
+            process = \
+                await asyncio.create_subprocess_exec(
+                    *latex_args,
+                    cwd=extractor.path_obj_to_working_dir,
+                    env=extractor.get_latex_env(),
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.STDOUT
+                )
+            try:
+                output, _ = \
+                    await asyncio.wait_for(
+                        process.communicate(), self.latex_timeout
+                    )
+            except asyncio.TimeoutError as my_exception:
+                raise AsyncInterfaceError(
+                    "LaTeX timed out after "+str(self.latex_timeout)+" s."
+                ) from my_exception
+            finally:
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+        if process.returncode:
+            raise subprocess.CalledProcessError(
+                process.returncode, latex_args, output=output
+            )
+        await self.run_in(self.work_executor, extractor.store_in_pdf_cache)
+
+    async def extract(self, ordinal, use_pdf_cache=True):
+        """ Extract the ordinance with a given ordinal, as Extractor.extract()
+        does, returning the path to the extract. """
+        extractor = \
+            await self.run_in(
+                self.read_executor, self.make_extractor, ordinal, use_pdf_cache
+            )
+        await self.run_in(
+            self.work_executor, extractor.run_stage, extractor.verify_stamp
+        )
+        await self.run_in(self.work_executor, extractor.make_working_dir)
+        try:
+            await self.run_in(
+                self.work_executor,
+                extractor.run_stage,
+                extractor.write_main_tex
+            )
+            with extractor.instrument.stage("extract.compile_main_tex"):
+                await self.compile_main_tex(extractor)
+            for method in (
+                extractor.add_metadata,
+                extractor.create_and_copy,
+                extractor.write_and_unpack_annexe
+            ):
+                await self.run_in(
+                    self.work_executor, extractor.run_stage, method
+                )
+        finally:
+            if extractor.clean_flag:
+                await self.run_in(self.work_executor, extractor.clean)
+        result = str(extractor.path_obj_to_extract.resolve())
+        return result
+
+    def verify(self, path_to_pdf, path_to_public_key=None):
+        """ Verify a given PDF, against this object's public key, unless
+        another is given. This runs on a work thread. """
+        document_verifier = \
+            PDFVerifier(
+                path_to_pdf=path_to_pdf,
+                path_to_public_key=
+                    path_to_public_key or self.path_to_public_key,
+                debug=False
+            )
+        result = document_verifier.verify()
+        return result
+
+    async def upload_ordinance_from_input_file(
+            self,
+            path_to_input_file,
+            deduplicate_annexe=False,
+            checkpoint_interval=None,
+            timeout=None
+        ):
+        """ Ronseal. Returns the new block's ordinal. """
+        result = \
+            await self.run_request(
+                self.run_in(
+                    self.write_executor,
+                    self.upload_from_input_file,
+                    path_to_input_file,
+                    deduplicate_annexe=deduplicate_annexe,
+                    checkpoint_interval=checkpoint_interval
+                ),
+                timeout=timeout
+            )
+        return result
+
+    async def upload_ordinance(
+            self,
+            input_dict,
+            deduplicate_annexe=False,
+            checkpoint_interval=None,
+            timeout=None
+        ):
+        """ Upload an ordinance from a dictionary such as an input file holds,
+        returning the new block's ordinal. """
+        result = \
+            await self.run_request(
+                self.run_in(
+                    self.write_executor,
+                    self.upload_from_dict,
+                    input_dict,
+                    deduplicate_annexe=deduplicate_annexe,
+                    checkpoint_interval=checkpoint_interval
+                ),
+                timeout=timeout
+            )
+        return result
+
+    async def extract_ordinance_with_ordinal(
+            self,
+            ordinal,
+            use_pdf_cache=True,
+            timeout=None
+        ):
+        """ Ronseal. """
+        result = \
+            await self.run_request(
+                self.extract(ordinal, use_pdf_cache=use_pdf_cache),
+                timeout=timeout
+            )
+        return result
+
+    async def verify_pdf(
+            self,
+            path_to_pdf,
+            path_to_public_key=None,
+            timeout=None
+        ):
+        """ Ronseal. """
+        result = \
+            await self.run_request(
+                self.run_in(
+                    self.work_executor,
+                    self.verify,
+                    path_to_pdf,
+                    path_to_public_key=path_to_public_key
+                ),
+                timeout=timeout
+            )
+        return result
+
+    def close(self, wait=True):
+        """ Shut down the executors. """
+        for executor in (
+            self.read_executor,
+            self.write_executor,
+            self.work_executor
+        ):
+            executor.shutdown(wait=wait)
+
+################################
+# HELPER CLASSES AND FUNCTIONS #
+################################
+
+class AsyncInterfaceError(Exception):
+    """ A custom exception. """
+
+#############
+# FUNCTIONS #
+#############
+
+# The interface shared by everything in this process, using the default
+# paths, as the machine interface does.
+async_interface = AsyncInterface()
+
+async def upload_ordinance_from_input_file(
+        path_to_input_file,
+        deduplicate_annexe=False,
+        checkpoint_interval=None
+    ):
+    """ Ronseal. Returns the new block's ordinal. """
+    result = \
+        await async_interface.upload_ordinance_from_input_file(
+            path_to_input_file,
+            deduplicate_annexe=deduplicate_annexe,
+            checkpoint_interval=checkpoint_interval
+        )
+    return result
+
+async def extract_ordinance_with_ordinal(ordinal, use_pdf_cache=True):
+    """ Ronseal. """
+    result = \
+        await async_interface.extract_ordinance_with_ordinal(
+            ordinal, use_pdf_cache=use_pdf_cache
+        )
+    return result
+
+async def verify_pdf(
+        path_to_pdf,
+        path_to_public_key=DEFAULT_PATH_TO_PUBLIC_KEY
+    ):
+    """ Ronseal. """
+    result = \
+        await async_interface.verify_pdf(
+            path_to_pdf, path_to_public_key=path_to_public_key
+        )
+    return result
@@ -0,0 +1,85 @@
+"""
+This code defines a class which records how far a ledger has been audited,
+so that the next audit need only verify the blocks appended since.
+
+The state is kept in a sidecar file, belonging to the auditor rather than to
+the ledger, so that whoever can rewrite the ledger can't also rewrite the
+record of what it used to say. Alongside the last verified ordinal and hash,
+it holds a rolling digest over the headers - every column but the annexe -
+of all the blocks verified so far, against which any rewrite of an earlier
+row shows up at the cost of a quick scan, rather than a full audit.
+"""
+
+# Standard imports.
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+# Local imports.
+from .configs import DEFAULT_PATH_TO_AUDIT_STATE, ENCODING
+from .ledger import HEADER_COLUMNS
+
+# Local constants.
+INITIAL_DIGEST = "0"*64
+
+##############
+# MAIN CLASS #
+##############
+
+@dataclass
+class AuditState:
+    """ The class in question. """
+    # Object attributes.
+    path_to_ledger: str = None # The real path.
+    key_fingerprint: str = None
+    last_ordinal: int = 0
+    last_hash: str = None
+    rolling_digest: str = INITIAL_DIGEST
+
+    @classmethod
+    def load(cls, path_to_audit_state=DEFAULT_PATH_TO_AUDIT_STATE):
+        """ Load the state from a given file, returning None if there's no
+        such file, or if it can't be read. """
+        try:
+            with open(path_to_audit_state, "r") as audit_state_file:
+                result = cls(**json.load(audit_state_file))
+        except (OSError, TypeError, ValueError):
+            return None
+        return result
+
+    def save(self, path_to_audit_state=DEFAULT_PATH_TO_AUDIT_STATE):
+        """ Write the state to a given file. The new file is moved into place
+        in one go, so that an interrupted save leaves the old state as it
+        was. """
+        path_obj_to_dir = Path(path_to_audit_state).parent
+        path_obj_to_dir.mkdir(parents=True, exist_ok=True)
+        file_descriptor, path_to_temp = \
+            tempfile.mkstemp(dir=path_obj_to_dir, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "w") as temp_file:
+                json.dump(asdict(self), temp_file, indent=4)
+            os.replace(path_to_temp, path_to_audit_state)
+        except BaseException:
+            Path(path_to_temp).unlink(missing_ok=True)
+            raise
+
+####################
+# HELPER FUNCTIONS #
+####################
+
+def get_key_fingerprint(path_to_public_key):
+    """ Get a digest of the public key file. """
+    with open(path_to_public_key, "rb") as key_file:
+        result = hashlib.sha256(key_file.read()).hexdigest()
+    return result
+
+def update_rolling_digest(rolling_digest, block):
+    """ Fold a given block's header into a given rolling digest. """
+    header = json.dumps([block[column] for column in HEADER_COLUMNS])
+    hash_maker = hashlib.sha256(bytes.fromhex(rolling_digest))
+    hash_maker.update(bytes(header, ENCODING))
+    result = hash_maker.hexdigest()
+    return result
@@ -0,0 +1,172 @@
+"""
+This code defines a class which verifies a whole batch of ordinance PDFs at
+once, using a pool of processes, and reports on each PDF as soon as it has
+been checked.
+"""
+
+# Standard imports.
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from itertools import islice
+from typing import Iterable
+
+# Local imports.
+from .configs import DEFAULT_PATH_TO_PUBLIC_KEY
+from .digistamp import load_public_key
+from .key_registry import get_verifier
+from .pdf_verifier import PDFVerifier
+
+# Local constants.
+DEFAULT_CHUNK_SIZE = 16
+PDF_EXT = ".pdf"
+
+# Set in each worker process by initialise_worker().
+worker_verifier = None
+
+################
+# MAIN CLASSES #
+################
+
+@dataclass
+class PDFVerificationResult:
+    """ A class which holds the result of verifying a single PDF. """
+    # Object attributes.
+    path_to_pdf: str
+    verified: bool = False
+    reason: str = None # Why the PDF failed, if it did.
+
+    def to_dict(self):
+        """ Convert this object into a JSON-friendly dictionary. """
+        result = {
+            "path": self.path_to_pdf,
+            "verified": self.verified,
+            "reason": self.reason
+        }
+        return result
+
+    def to_json(self):
+        """ Convert this object into a single line of JSON. """
+        result = json.dumps(self.to_dict())
+        return result
+
+@dataclass
+class BulkPDFVerifier:
+    """ The class in question. The paths are sent to the pool in chunks, and
+    only a bounded number of chunks are in flight at any one time, so that
+    even a very long list of paths is consumed lazily. """
+    # Object attributes.
+    paths_to_pdfs: Iterable[str]
+    path_to_public_key: str = DEFAULT_PATH_TO_PUBLIC_KEY
+    jobs: int = None # Defaults to the number of CPUs.
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+    verified_count: int = 0
+    failed_count: int = 0
+
+    def __post_init__(self):
+        if not self.jobs:
+            self.jobs = os.cpu_count() or 1
+
+    @property
+    def all_verified(self):
+        """ Decide whether every PDF checked so far passed. """
+        result = not self.failed_count
+        return result
+
+    def generate_chunks(self):
+        """ Ronseal. """
+        paths = iter(self.paths_to_pdfs)
+        while True:
+            chunk = list(islice(paths, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def count(self, results):
+        """ Keep a tally of some results, and pass them on. """
+        for result in results:
+            if result.verified:
+                self.verified_count += 1
+            else:
+                self.failed_count += 1
+            yield result
+
+    def generate_results_serially(self):
+        """ Check all the PDFs in this process. """
+        initialise_worker(self.path_to_public_key)
+        for chunk in self.generate_chunks():
+            yield from verify_pdfs(chunk)
+
+    def generate_results_in_parallel(self):
+        """ Check all the PDFs using a pool of processes, yielding each
+        chunk's results as soon as they're ready. """
+        max_in_flight = 2*self.jobs
+        with ProcessPoolExecutor(
+            max_workers=self.jobs,
+            initializer=initialise_worker,
+            initargs=(self.path_to_public_key,)
+        ) as executor:
+            in_flight = set()
+            for chunk in self.generate_chunks():
+                if len(in_flight) >= max_in_flight:
+                    done, in_flight = \
+                        wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from future.result()
+                in_flight.add(executor.submit(verify_pdfs, chunk))
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+
+    def generate_results(self):
+        """ Yield a result object for each PDF. NB: When more than one process
+        is used, the results are not necessarily in the order of the
+        paths. """
+        # Load the key here first, so that a bad key fails loudly and at
+        # once, rather than breaking the pool.
+        load_public_key(path_to_public_key=self.path_to_public_key)
+        if self.jobs == 1:
+            results = self.generate_results_serially()
+        else:
+            results = self.generate_results_in_parallel()
+        yield from self.count(results)
+
+####################
+# HELPER FUNCTIONS #
+####################
+
+def generate_paths_to_pdfs(path_to_dir):
+    """ Yield the path to every PDF in a given directory, or in any directory
+    within it, in a stable order. """
+    for path_to_subdir, subdir_names, filenames in os.walk(path_to_dir):
+        subdir_names.sort()
+        for filename in sorted(filenames):
+            if filename.lower().endswith(PDF_EXT):
+                yield os.path.join(path_to_subdir, filename)
+
+def initialise_worker(path_to_public_key):
+    """ Load the public key once per worker process. """
+    global worker_verifier # pylint: disable=global-statement
+    worker_verifier = get_verifier(path_to_public_key=path_to_public_key)
+
+def verify_pdf(path_to_pdf, verifier):
+    """ Verify a single PDF, using a given verifier object, and return a
+    result object rather than raising, so that one unreadable file doesn't
+    sink the whole batch. """
+    result = PDFVerificationResult(path_to_pdf=path_to_pdf)
+    try:
+        pdf_verifier = \
+            PDFVerifier(path_to_pdf=path_to_pdf, verifier=verifier, debug=False)
+        result.verified = pdf_verifier.verify()
+        if not result.verified:
+            result.reason = str(pdf_verifier.last_exception)
+    except Exception as my_exception: # pylint: disable=broad-except
+        result.reason = str(my_exception) or type(my_exception).__name__
+    return result
+
+def verify_pdfs(paths_to_pdfs):
+    """ Verify a chunk of PDFs, using this worker's verifier. """
+    result = [verify_pdf(path, worker_verifier) for path in paths_to_pdfs]
+    return result
@@ -0,0 +1,340 @@
+"""
+This code defines checkpoints: stamped Merkle roots, each over a run of
+consecutive blocks' hashes. A block's inclusion proof - its place in the run,
+plus one sibling hash per level of the tree - lets an auditor authenticate it
+against its checkpoint alone, without re-walking the chain back to genesis.
+
+The tree follows RFC 6962: leaves and interior nodes are hashed with
+different prefixes, and a run whose length isn't a power of two is split at
+the largest power of two below its length.
+"""
+
+# Standard imports.
+import hashlib
+import json
+from dataclasses import dataclass, field
+
+# Local imports.
+from .configs import (
+    DEFAULT_CHECKPOINT_INTERVAL,
+    ENCODING,
+    ORDINAL_COLUMN,
+    LAST_ORDINAL_COLUMN
+)
+from .digistamp import StampMachine, Verifier
+from .ledger import Ledger
+
+# Local constants.
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+# Bump this whenever the data which a checkpoint's stamp covers changes.
+CHECKPOINT_STAMP_LABEL = "chancery_b/checkpoint/v1"
+
+################
+# MAIN CLASSES #
+################
+
+@dataclass
+class Checkpoint:
+    """ A class which holds a stamped Merkle root over the hashes of the
+    blocks from first_ordinal to last_ordinal inclusive. """
+    # Object attributes.
+    first_ordinal: int = None
+    last_ordinal: int = None
+    root: str = None
+    stamp: str = None
+    stamp_scheme: int = None
+
+    @property
+    def size(self):
+        """ The number of blocks covered. """
+        result = self.last_ordinal-self.first_ordinal+1
+        return result
+
+    def get_stamp_data(self):
+        """ Get the string which this checkpoint's stamp covers. """
+        result = ":".join((
+            CHECKPOINT_STAMP_LABEL,
+            str(self.first_ordinal),
+            str(self.last_ordinal),
+            self.root
+        ))
+        return result
+
+    def update_stamp(self, stamp_machine):
+        """ Stamp this checkpoint with a given stamp machine. """
+        self.stamp = stamp_machine.make_stamp(self.get_stamp_data())
+        self.stamp_scheme = stamp_machine.stamp_scheme
+
+    def verify_stamp(self, verifier):
+        """ Decide whether this checkpoint's stamp is authentic. """
+        result = \
+            verifier.verify(
+                self.get_stamp_data(),
+                self.stamp,
+                stamp_scheme=self.stamp_scheme
+            )
+        return result
+
+    def to_dict(self):
+        """ Convert this object into a JSON-friendly dictionary. """
+        result = {
+            "first_ordinal": self.first_ordinal,
+            "last_ordinal": self.last_ordinal,
+            "root": self.root,
+            "stamp": self.stamp,
+            "stamp_scheme": self.stamp_scheme
+        }
+        return result
+
+@dataclass
+class InclusionProof:
+    """ A class which holds the proof that the block with a given ordinal
+    and hash is covered by a given checkpoint. The path runs from the leaf
+    up to the root. """
+    # Object attributes.
+    ordinal: int = None
+    hash: str = None
+    checkpoint: Checkpoint = None
+    path: list = field(default_factory=list)
+
+    def verify(self, verifier):
+        """ Decide whether this proof holds: the checkpoint's stamp must be
+        authentic, and the path must lead from the block's hash to the
+        checkpoint's root. """
+        checkpoint = self.checkpoint
+        if not (
+            checkpoint.first_ordinal <= self.ordinal <= checkpoint.last_ordinal
+        ):
+            return False
+        if not checkpoint.verify_stamp(verifier):
+            return False
+        try:
+            path = [bytes.fromhex(node) for node in self.path]
+            root = bytes.fromhex(checkpoint.root)
+        except ValueError:
+            return False
+        result = \
+            check_audit_path(
+                hash_leaf(self.hash),
+                self.ordinal-checkpoint.first_ordinal,
+                checkpoint.size,
+                path,
+                root
+            )
+        return result
+
+    def to_dict(self):
+        """ Convert this object into a JSON-friendly dictionary. """
+        result = {
+            "ordinal": self.ordinal,
+            "hash": self.hash,
+            "checkpoint": self.checkpoint.to_dict(),
+            "path": self.path
+        }
+        return result
+
+    def to_json(self):
+        """ Ronseal. """
+        result = json.dumps(self.to_dict(), indent=4)
+        return result
+
+    @classmethod
+    def from_dict(cls, proof_dict):
+        """ Construct an object of this class from a dictionary such as that
+        produced by to_dict(). """
+        try:
+            result = \
+                cls(
+                    ordinal=proof_dict["ordinal"],
+                    hash=proof_dict["hash"],
+                    checkpoint=Checkpoint(**proof_dict["checkpoint"]),
+                    path=list(proof_dict["path"])
+                )
+        except (KeyError, TypeError) as my_exception:
+            raise CheckpointError(
+                "Invalid inclusion proof: "+str(my_exception)
+            ) from my_exception
+        return result
+
+    @classmethod
+    def from_json(cls, proof_json):
+        """ Ronseal. """
+        try:
+            proof_dict = json.loads(proof_json)
+        except ValueError as my_exception:
+            raise CheckpointError(
+                "Invalid inclusion proof: "+str(my_exception)
+            ) from my_exception
+        result = cls.from_dict(proof_dict)
+        return result
+
+################################
+# HELPER CLASSES AND FUNCTIONS #
+################################
+
+class CheckpointError(Exception):
+    """ A custom exception. """
+
+def hash_leaf(block_hash):
+    """ Hash a block's hash into a leaf of the tree. """
+    result = hashlib.sha256(LEAF_PREFIX+bytes(block_hash, ENCODING)).digest()
+    return result
+
+def hash_node(left, right):
+    """ Hash two sibling nodes into their parent. """
+    result = hashlib.sha256(NODE_PREFIX+left+right).digest()
+    return result
+
+def generate_levels(leaves):
+    """ Yield each level of the tree, from the leaves up to the root. A lone
+    node at the end of a level is carried up as it is, which gives the same
+    tree as RFC 6962's split at the largest power of two. """
+    level = list(leaves)
+    if not level:
+        raise CheckpointError("Cannot make a tree with no leaves.")
+    yield level
+    while len(level) > 1:
+        parents = [
+            hash_node(level[index], level[index+1])
+            for index in range(0, len(level)-1, 2)
+        ]
+        if len(level)%2:
+            parents.append(level[-1])
+        level = parents
+        yield level
+
+def get_root(leaves):
+    """ Get the root of the tree over a given list of leaves. """
+    for level in generate_levels(leaves):
+        result = level[0]
+    return result
+
+def get_audit_path(leaves, index):
+    """ Get the sibling nodes needed to get from the leaf with a given index
+    up to the root. """
+    result = []
+    for level in generate_levels(leaves):
+        sibling_index = index^1
+        if sibling_index < len(level):
+            result.append(level[sibling_index])
+        index //= 2
+    return result
+
+def check_audit_path(leaf, index, size, path, root):
+    """ Decide whether a given audit path leads from a given leaf to a given
+    root, following RFC 9162, section 2.1.3.2. """
+    if not 0 <= index < size:
+        return False
+    node_index = index
+    last_index = size-1
+    node = leaf
+    for sibling in path:
+        if last_index == 0:
+            return False
+        if node_index%2 or node_index == last_index:
+            node = hash_node(sibling, node)
+            while not node_index%2 and node_index:
+                node_index //= 2
+                last_index //= 2
+        else:
+            node = hash_node(node, sibling)
+        node_index //= 2
+        last_index //= 2
+    result = (last_index == 0 and node == root)
+    return result
+
+def make_checkpoint(ledger, first_ordinal, last_ordinal, stamp_machine):
+    """ Make and stamp - but don't store - the checkpoint over a given run of
+    blocks. """
+    hashes = ledger.get_hashes(first_ordinal, last_ordinal)
+    if len(hashes) != last_ordinal-first_ordinal+1:
+        raise CheckpointError(
+            "Missing blocks between ordinals "+str(first_ordinal)+" and "+
+            str(last_ordinal)+"."
+        )
+    result = \
+        Checkpoint(
+            first_ordinal=first_ordinal,
+            last_ordinal=last_ordinal,
+            root=get_root(hash_leaf(block_hash) for block_hash in hashes).hex()
+        )
+    result.update_stamp(stamp_machine)
+    return result
+
+#############
+# FUNCTIONS #
+#############
+
+def make_checkpoints(
+        ledger: Ledger,
+        stamp_machine: StampMachine,
+        interval=DEFAULT_CHECKPOINT_INTERVAL
+    ):
+    """ Add a checkpoint for every complete run of a given number of blocks
+    since the last checkpoint, returning the new checkpoints. """
+    if interval < 1:
+        raise CheckpointError("Invalid checkpoint interval: "+str(interval))
+    result = []
+    with ledger.transaction():
+        tip = ledger.tip()
+        if not tip:
+            return result
+        last_checkpoint = ledger.last_checkpoint()
+        if last_checkpoint:
+            first_ordinal = last_checkpoint[LAST_ORDINAL_COLUMN]+1
+        else:
+            first_ordinal = 1
+        while tip[ORDINAL_COLUMN]-first_ordinal+1 >= interval:
+            checkpoint = \
+                make_checkpoint(
+                    ledger,
+                    first_ordinal,
+                    first_ordinal+interval-1,
+                    stamp_machine
+                )
+            ledger.append_checkpoint(checkpoint)
+            result.append(checkpoint)
+            first_ordinal = checkpoint.last_ordinal+1
+    return result
+
+def make_inclusion_proof(ledger: Ledger, ordinal):
+    """ Make the proof that the block with a given ordinal is covered by its
+    checkpoint. """
+    row = ledger.get_checkpoint(ordinal)
+    if not row:
+        raise CheckpointError(
+            "No checkpoint covers the block with ordinal "+str(ordinal)+"."
+        )
+    checkpoint = Checkpoint(**row)
+    hashes = \
+        ledger.get_hashes(checkpoint.first_ordinal, checkpoint.last_ordinal)
+    leaves = [hash_leaf(block_hash) for block_hash in hashes]
+    path = get_audit_path(leaves, ordinal-checkpoint.first_ordinal)
+    result = \
+        InclusionProof(
+            ordinal=ordinal,
+            hash=hashes[ordinal-checkpoint.first_ordinal],
+            checkpoint=checkpoint,
+            path=[node.hex() for node in path]
+        )
+    return result
+
+def verify_checkpoints(ledger: Ledger, verifier: Verifier):
+    """ Check every checkpoint's stamp, and its root against the blocks it
+    covers, returning the last ordinals of those which fail. """
+    result = []
+    for row in ledger.generate_checkpoints():
+        checkpoint = Checkpoint(**row)
+        hashes = \
+            ledger.get_hashes(
+                checkpoint.first_ordinal, checkpoint.last_ordinal
+            )
+        if (
+            len(hashes) != checkpoint.size or
+            get_root(hash_leaf(block_hash) for block_hash in hashes).hex() !=
+            checkpoint.root or
+            not checkpoint.verify_stamp(verifier)
+        ):
+            result.append(checkpoint.last_ordinal)
+    return result
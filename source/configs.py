@@ -14,6 +14,27 @@ ENCODING = "utf-8"
 COMPRESSION_FORMAT = "zip"
 COMPRESSION_EXT = ".zip"
 ANNEXE = "annexe"
+# Hash schemes. Version 1 is the original scheme, which must never change, so
+# that existing ledgers and PDFs continue to verify.
+HASH_SCHEME_V1 = 1
+HASH_SCHEME_V2 = 2
+DEFAULT_HASH_SCHEME = HASH_SCHEME_V2
+# Metadata formats, i.e. how a PDF carries its ordinance's data. Version 1
+# puts the annexe into the Info dictionary as hex; version 2 embeds it as a
+# compressed file stream, to which the Info dictionary refers.
+METADATA_FORMAT_V1 = 1
+METADATA_FORMAT_V2 = 2
+DEFAULT_METADATA_FORMAT = METADATA_FORMAT_V2
+# Key types, and the stamp schemes which go with them. Each block records the
+# scheme with which it was stamped, so that a ledger can outlive a change of
+# key.
+KEY_TYPE_RSA = "rsa"
+KEY_TYPE_ED25519 = "ed25519"
+DEFAULT_KEY_TYPE = KEY_TYPE_RSA
+STAMP_SCHEME_RSA_PSS = 1
+STAMP_SCHEME_ED25519 = 2
+# Checkpoints, i.e. stamped Merkle roots over runs of consecutive blocks.
+DEFAULT_CHECKPOINT_INTERVAL = 1024
 # General TEST configs.
 TEST_PASSWORD = "guest"
 
@@ -24,6 +45,7 @@ TEST_PATH_OBJ_TO_DATA = Path("test_data")
 
 # Filenames.
 ARCHIVE_FN = ANNEXE+COMPRESSION_EXT
+ANNEXE_DIGEST_FN = ANNEXE+".sha256"
 DEFAULT_LEDGER_FN = "ledger.db"
 DEFAULT_PRIVATE_KEY_FN = "stamp_private_key.pem"
 DEFAULT_PUBLIC_KEY_FN = "stamp_public_key.pem"
@@ -39,12 +61,19 @@ DEFAULT_PATH_TO_PUBLIC_KEY = \
     str(DEFAULT_PATH_OBJ_TO_DATA/DEFAULT_PUBLIC_KEY_FN)
 DEFAULT_PATH_TO_LEDGER = str(DEFAULT_PATH_OBJ_TO_DATA/DEFAULT_LEDGER_FN)
 DEFAULT_PATH_TO_EXTRACTS = str(DEFAULT_PATH_OBJ_TO_DATA/"extracts")
+DEFAULT_PATH_TO_PDF_CACHE = str(DEFAULT_PATH_OBJ_TO_DATA/"pdf_cache")
+DEFAULT_PATH_TO_AUDIT_STATE = \
+    str(DEFAULT_PATH_OBJ_TO_DATA/"audit_state.json")
+DEFAULT_PATH_TO_SOCKET = str(DEFAULT_PATH_OBJ_TO_DATA/"daemon.sock")
 # Test paths.
 TEST_PATH_TO_DATA = str(TEST_PATH_OBJ_TO_DATA)
 TEST_PATH_TO_LEDGER = str(TEST_PATH_OBJ_TO_DATA/TEST_LEDGER_FN)
 TEST_PATH_TO_PRIVATE_KEY = str(TEST_PATH_OBJ_TO_DATA/TEST_PRIVATE_KEY_FN)
 TEST_PATH_TO_PUBLIC_KEY = str(TEST_PATH_OBJ_TO_DATA/TEST_PUBLIC_KEY_FN)
 TEST_PATH_TO_EXTRACTS = str(TEST_PATH_OBJ_TO_DATA/"extracts")
+TEST_PATH_TO_PDF_CACHE = str(TEST_PATH_OBJ_TO_DATA/"pdf_cache")
+TEST_PATH_TO_AUDIT_STATE = str(TEST_PATH_OBJ_TO_DATA/"audit_state.json")
+TEST_PATH_TO_SOCKET = str(TEST_PATH_OBJ_TO_DATA/"daemon.sock")
 
 # Ledger columns and keys.
 ORDINAL_COLUMN = "ordinal"
@@ -57,6 +86,12 @@ HASH_COLUMN = "hash"
 PREV_COLUMN = "prev"
 ANNEXE_COLUMN = "annexe"
 STAMP_COLUMN = "stamp"
+HASH_SCHEME_COLUMN = "hash_scheme"
+STAMP_SCHEME_COLUMN = "stamp_scheme"
+ANNEXE_DIGEST_COLUMN = "annexe_digest"
+FIRST_ORDINAL_COLUMN = "first_ordinal"
+LAST_ORDINAL_COLUMN = "last_ordinal"
+ROOT_COLUMN = "root"
 DECLARATION_KEY = "declaration"
 ORDER_KEY = "order"
 GENESIS_KEY = "genesis"
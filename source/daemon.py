@@ -0,0 +1,189 @@
+"""
+This code defines the chancery daemon: a long-running process, listening on
+a Unix socket, which keeps the keys loaded, the templates parsed and the
+ledger connections open, so that each call from a script costs a round trip
+rather than a cold start.
+
+Whoever can connect to the socket can have ordinances signed with the
+private key which the daemon holds, so the socket is made readable and
+writable by its owner alone.
+"""
+
+# Standard imports.
+import asyncio
+import json
+import os
+import signal
+import stat
+from dataclasses import dataclass
+from pathlib import Path
+
+# Local imports.
+from .aio import AsyncInterface
+from .configs import DEFAULT_PATH_TO_SOCKET, ENCODING
+from .daemon_client import (
+    ERROR_KEY,
+    ERROR_TYPE_KEY,
+    RESULT_KEY,
+    DaemonError,
+    connect_to_daemon
+)
+from .digistamp import get_bytes_password
+from .key_registry import get_stamp_machine, get_verifier
+from .templates import PATHS_TO_BASES, get_template
+
+# Local constants.
+MAX_REQUEST_BYTES = 64*1024*1024 # Uploads carry the whole ordinance.
+SOCKET_UMASK = 0o177
+
+##############
+# MAIN CLASS #
+##############
+
+@dataclass
+class ChanceryDaemon:
+    """ The class in question. """
+    # Object attributes.
+    path_to_socket: str = DEFAULT_PATH_TO_SOCKET
+    async_interface: AsyncInterface = None
+    read_only: bool = False # If True, hold no private key, and refuse uploads.
+    server: asyncio.AbstractServer = None
+    loop: asyncio.AbstractEventLoop = None
+    stopping: asyncio.Event = None
+
+    def __post_init__(self):
+        if not self.async_interface:
+            self.async_interface = AsyncInterface()
+
+    def warm_up(self):
+        """ Load the keys and parse the templates ahead of the first
+        request. Unless we're read-only, ask for the private key's password,
+        if the interface doesn't have it already. """
+        get_verifier(
+            path_to_public_key=self.async_interface.path_to_public_key
+        )
+        for ordinance_type in PATHS_TO_BASES:
+            get_template(ordinance_type)
+        if self.read_only:
+            return
+        if self.async_interface.password is None:
+            self.async_interface.password = \
+                str(get_bytes_password(), ENCODING)
+        get_stamp_machine(
+            path_to_private_key=self.async_interface.path_to_private_key,
+            password=self.async_interface.password
+        )
+
+    def remove_stale_socket(self):
+        """ Remove the socket file left behind by a daemon which is no longer
+        running, but refuse to start if one still is. """
+        if connect_to_daemon(path_to_socket=self.path_to_socket):
+            raise DaemonError(
+                "A daemon is already listening at: "+self.path_to_socket
+            )
+        try:
+            if stat.S_ISSOCK(os.stat(self.path_to_socket).st_mode):
+                os.remove(self.path_to_socket)
+        except FileNotFoundError:
+            pass
+
+    async def ping(self):
+        """ Ronseal. """
+        result = {"pid": os.getpid()}
+        return result
+
+    async def upload_ordinance(self, **arguments):
+        """ Upload an ordinance, unless we're read-only. """
+        if self.read_only:
+            raise DaemonError("This daemon is read-only.")
+        result = await self.async_interface.upload_ordinance(**arguments)
+        return result
+
+    def get_handler(self, command):
+        """ Get the coroutine function which handles a given command. """
+        handlers = {
+            "ping": self.ping,
+            "upload_ordinance": self.upload_ordinance,
+            "extract_ordinance_with_ordinal":
+                self.async_interface.extract_ordinance_with_ordinal,
+            "verify_pdf": self.async_interface.verify_pdf
+        }
+        if command not in handlers:
+            raise DaemonError("Unknown command: "+str(command))
+        result = handlers[command]
+        return result
+
+    async def handle_request(self, line):
+        """ Carry out the request on a given line, and return the response,
+        with any exception raised in the process reported in it. """
+        try:
+            request = json.loads(line)
+            handler = self.get_handler(request.get("command"))
+            result = {
+                RESULT_KEY: await handler(**request.get("arguments", {}))
+            }
+        except Exception as my_exception:
+            result = {
+                ERROR_KEY: str(my_exception),
+                ERROR_TYPE_KEY: type(my_exception).__name__
+            }
+        return result
+
+    async def handle_connection(self, reader, writer):
+        """ Answer each request on a given connection, until the client hangs
+        up. """
+        try:
+            while line := await reader.readline():
+                response = await self.handle_request(line)
+                writer.write(bytes(json.dumps(response)+"\n", ENCODING))
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            pass # The client went away, or sent too long a line.
+        finally:
+            writer.close()
+
+    async def serve(self):
+        """ Listen on the socket until stop() is called. """
+        self.loop = asyncio.get_running_loop()
+        self.stopping = asyncio.Event()
+        self.remove_stale_socket()
+        Path(self.path_to_socket).parent.mkdir(parents=True, exist_ok=True)
+        old_umask = os.umask(SOCKET_UMASK)
+        try:
+            self.server = \
+                await asyncio.start_unix_server(
+                    self.handle_connection,
+                    path=self.path_to_socket,
+                    limit=MAX_REQUEST_BYTES
+                )
+        finally:
+            os.umask(old_umask)
+        try:
+            await self.stopping.wait()
+        finally:
+            self.server.close()
+            await self.server.wait_closed()
+            Path(self.path_to_socket).unlink(missing_ok=True)
+
+    def stop(self):
+        """ Stop serving. This may be called from any thread. """
+        self.loop.call_soon_threadsafe(self.stopping.set)
+
+    async def run(self):
+        """ Serve until told to stop by a signal. """
+        loop = asyncio.get_running_loop()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signal_number, self.stop)
+        await self.serve()
+
+#############
+# FUNCTIONS #
+#############
+
+def run_daemon(daemon):
+    """ Warm a given daemon up, and then serve until told to stop. """
+    daemon.warm_up()
+    try:
+        asyncio.run(daemon.run())
+    finally:
+        daemon.async_interface.close(wait=False)
@@ -0,0 +1,214 @@
+"""
+This code defines the client side of the chancery daemon: a connection to
+its socket, plus versions of the machine interface's upload, extract and
+verify functions which forward the call to the daemon, if one is listening,
+or else make it in this process, just as before.
+
+It imports nothing beyond the standard library until it has to fall back,
+so that a call answered by the daemon pays for neither cryptography nor
+pdfrw, nor for loading keys and connecting to the ledger.
+"""
+
+# Standard imports.
+import json
+import os
+import socket
+from dataclasses import dataclass
+
+# Local imports.
+from .configs import (
+    DEFAULT_PATH_TO_PUBLIC_KEY,
+    DEFAULT_PATH_TO_SOCKET,
+    ENCODING
+)
+
+# Local constants.
+CONNECT_TIMEOUT = 1 # In seconds.
+RESULT_KEY = "result"
+ERROR_KEY = "error"
+ERROR_TYPE_KEY = "error_type"
+ANNEXE_PATH_KEY = "annexe_path"
+
+##############
+# MAIN CLASS #
+##############
+
+@dataclass
+class DaemonClient:
+    """ The class in question. Requests and responses are single lines of
+    JSON, so that any number of requests can share one connection. """
+    # Object attributes.
+    path_to_socket: str = DEFAULT_PATH_TO_SOCKET
+    connection: socket.socket = None
+    connection_file: object = None
+
+    def connect(self):
+        """ Connect to the daemon, and say whether we could. """
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.settimeout(CONNECT_TIMEOUT)
+        try:
+            connection.connect(self.path_to_socket)
+        except OSError:
+            connection.close()
+            return False
+        connection.settimeout(None)
+        self.connection = connection
+        self.connection_file = connection.makefile("rwb")
+        return True
+
+    def close(self):
+        """ Ronseal. """
+        if self.connection:
+            self.connection_file.close()
+            self.connection.close()
+            self.connection = None
+            self.connection_file = None
+
+    def request(self, command, **arguments):
+        """ Ask the daemon to carry out a given command, and return the
+        result, raising an exception if the daemon reports an error. """
+        line = json.dumps({"command": command, "arguments": arguments})
+        self.connection_file.write(bytes(line+"\n", ENCODING))
+        self.connection_file.flush()
+        response_line = self.connection_file.readline()
+        if not response_line:
+            raise DaemonError("The daemon closed the connection.")
+        response = json.loads(response_line)
+        if ERROR_KEY in response:
+            raise DaemonError(
+                response[ERROR_KEY]+" ("+response[ERROR_TYPE_KEY]+")"
+            )
+        result = response[RESULT_KEY]
+        return result
+
+################################
+# HELPER CLASSES AND FUNCTIONS #
+################################
+
+class DaemonError(Exception):
+    """ A custom exception. """
+
+def connect_to_daemon(path_to_socket=DEFAULT_PATH_TO_SOCKET):
+    """ Get a client connected to the daemon, or None if no daemon is
+    listening. """
+    result = DaemonClient(path_to_socket=path_to_socket)
+    if not result.connect():
+        return None
+    return result
+
+def forward(command, path_to_socket, use_daemon, **arguments):
+    """ Forward a given command to the daemon, returning a tuple of whether
+    it was answered and, if so, the result. """
+    if not use_daemon:
+        return False, None
+    client = connect_to_daemon(path_to_socket=path_to_socket)
+    if not client:
+        return False, None
+    try:
+        result = client.request(command, **arguments)
+    finally:
+        client.close()
+    return True, result
+
+def add_daemon_arguments(parser):
+    """ Add the arguments which govern whether a script talks to the
+    daemon. """
+    parser.add_argument(
+        "--socket",
+        help="The path to the daemon's socket",
+        type=str,
+        dest="path_to_socket",
+        default=DEFAULT_PATH_TO_SOCKET
+    )
+    parser.add_argument(
+        "--no-daemon",
+        help="Do the work in this process, even if a daemon is listening",
+        action="store_false",
+        dest="use_daemon"
+    )
+
+#############
+# FUNCTIONS #
+#############
+
+def upload_ordinance_via_daemon(
+        path_to_input_file,
+        deduplicate_annexe=False,
+        checkpoint_interval=None,
+        path_to_socket=DEFAULT_PATH_TO_SOCKET,
+        use_daemon=True
+    ):
+    """ Upload an ordinance from a given input file, through the daemon if
+    possible. The daemon is sent the file's contents, with any annexe path
+    made absolute, since it doesn't share our working directory. """
+    with open(path_to_input_file, "r") as input_file:
+        input_dict = json.loads(input_file.read())
+    if input_dict.get(ANNEXE_PATH_KEY):
+        input_dict[ANNEXE_PATH_KEY] = \
+            os.path.abspath(input_dict[ANNEXE_PATH_KEY])
+    answered, result = \
+        forward(
+            "upload_ordinance",
+            path_to_socket,
+            use_daemon,
+            input_dict=input_dict,
+            deduplicate_annexe=deduplicate_annexe,
+            checkpoint_interval=checkpoint_interval
+        )
+    if answered:
+        return result
+    # Only now do we need the heavy machinery.
+    from .machine_interface import upload_ordinance_from_input_file
+    result = \
+        upload_ordinance_from_input_file(
+            path_to_input_file,
+            deduplicate_annexe=deduplicate_annexe,
+            checkpoint_interval=checkpoint_interval
+        )
+    return result
+
+def extract_ordinance_via_daemon(
+        ordinal,
+        use_pdf_cache=True,
+        path_to_socket=DEFAULT_PATH_TO_SOCKET,
+        use_daemon=True
+    ):
+    """ Extract the ordinance with a given ordinal, through the daemon if
+    possible, returning the path to the extract. """
+    answered, result = \
+        forward(
+            "extract_ordinance_with_ordinal",
+            path_to_socket,
+            use_daemon,
+            ordinal=ordinal,
+            use_pdf_cache=use_pdf_cache
+        )
+    if answered:
+        return result
+    # Only now do we need the heavy machinery.
+    from .machine_interface import extract_ordinance_with_ordinal
+    result = \
+        extract_ordinance_with_ordinal(ordinal, use_pdf_cache=use_pdf_cache)
+    return result
+
+def verify_pdf_via_daemon(
+        path_to_pdf,
+        path_to_public_key=DEFAULT_PATH_TO_PUBLIC_KEY,
+        path_to_socket=DEFAULT_PATH_TO_SOCKET,
+        use_daemon=True
+    ):
+    """ Verify a given PDF, through the daemon if possible. """
+    answered, result = \
+        forward(
+            "verify_pdf",
+            path_to_socket,
+            use_daemon,
+            path_to_pdf=os.path.abspath(path_to_pdf),
+            path_to_public_key=os.path.abspath(path_to_public_key)
+        )
+    if answered:
+        return result
+    # Only now do we need the heavy machinery.
+    from .machine_interface import verify_pdf
+    result = verify_pdf(path_to_pdf, path_to_public_key=path_to_public_key)
+    return result
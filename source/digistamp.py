@@ -7,23 +7,33 @@ the same.
 # Standard imports.
 import getpass
 import os
+import re
 
 # Non-standard imports.
 from cryptography.exceptions import InvalidSignature
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.asymmetric import padding, rsa
+from cryptography.hazmat.primitives.asymmetric import ed25519, padding, rsa
 
 # Local imports.
 from .configs import (
     DEFAULT_PATH_TO_PRIVATE_KEY,
     DEFAULT_PATH_TO_PUBLIC_KEY,
-    ENCODING
+    ENCODING,
+    KEY_TYPE_RSA,
+    KEY_TYPE_ED25519,
+    DEFAULT_KEY_TYPE,
+    STAMP_SCHEME_RSA_PSS,
+    STAMP_SCHEME_ED25519
 )
 
 # Local constants.
 PUBLIC_EXPONENT = 65537
 KEY_SIZE = 2048
+KEY_TYPES = (KEY_TYPE_RSA, KEY_TYPE_ED25519)
+PUBLIC_KEY_PEM_PATTERN = re.compile(
+    rb"-----BEGIN PUBLIC KEY-----.*?-----END PUBLIC KEY-----", re.DOTALL
+)
 
 ################
 # MAIN CLASSES #
@@ -31,7 +41,8 @@ KEY_SIZE = 2048
 
 class StampMachine:
     """ A class which produces a string of binary, which in turn testifies to
-    the authenticity of a given document. """
+    the authenticity of a given document. The stamp scheme follows from the
+    type of the private key. """
     def __init__(
             self,
             path_to_private_key=DEFAULT_PATH_TO_PRIVATE_KEY,
@@ -42,45 +53,56 @@ class StampMachine:
                 path_to_private_key=path_to_private_key,
                 password=password
             )
-        self.sig = \
-            padding.PSS(
-                mgf=padding.MGF1(hashes.SHA256()),
-                salt_length=padding.PSS.MAX_LENGTH
-            )
+        self.stamp_scheme = get_stamp_scheme(self.private_key)
+        self.sig = make_pss_padding()
 
     def make_stamp(self, data):
         """ Ronseal. """
         data_bytes = bytes(data, ENCODING)
-        stamp_bytes = \
-            self.private_key.sign(data_bytes, self.sig, hashes.SHA256())
+        if self.stamp_scheme == STAMP_SCHEME_ED25519:
+            stamp_bytes = self.private_key.sign(data_bytes)
+        else:
+            stamp_bytes = \
+                self.private_key.sign(data_bytes, self.sig, hashes.SHA256())
         result = stamp_bytes.hex()
         return result
 
 class Verifier:
-    """ A class which allows the user to verify a stamp produced as above. """
+    """ A class which allows the user to verify a stamp produced as above.
+    The public key file may hold more than one key - of either type - in
+    which case a stamp made with any of them is accepted. """
     def __init__(self, path_to_public_key=DEFAULT_PATH_TO_PUBLIC_KEY):
-        self.public_key = \
-            load_public_key(path_to_public_key=path_to_public_key)
-        self.sig = \
-            padding.PSS(
-                mgf=padding.MGF1(hashes.SHA256()),
-                salt_length=padding.PSS.MAX_LENGTH
-            )
+        self.public_keys = \
+            load_public_keys(path_to_public_key=path_to_public_key)
+        self.public_key = self.public_keys[0]
+        self.schemes_and_keys = [
+            (get_stamp_scheme(public_key), public_key)
+            for public_key in self.public_keys
+        ]
+        self.sig = make_pss_padding()
 
-    def verify(self, data, stamp):
-        """ Decide whether the stamp in question is authentic or not. """
+    def verify(self, data, stamp, stamp_scheme=None):
+        """ Decide whether the stamp in question is authentic or not. If the
+        stamp scheme is given, only keys of the matching type are tried. """
         stamp_bytes = bytes.fromhex(stamp)
         data_bytes = bytes(data, ENCODING)
-        try:
-            self.public_key.verify(
-                stamp_bytes,
-                data_bytes,
-                self.sig,
-                hashes.SHA256()
-            )
-        except InvalidSignature:
-            return False
-        return True
+        for key_scheme, public_key in self.schemes_and_keys:
+            if stamp_scheme and key_scheme != stamp_scheme:
+                continue
+            try:
+                if key_scheme == STAMP_SCHEME_ED25519:
+                    public_key.verify(stamp_bytes, data_bytes)
+                else:
+                    public_key.verify(
+                        stamp_bytes,
+                        data_bytes,
+                        self.sig,
+                        hashes.SHA256()
+                    )
+            except (InvalidSignature, ValueError):
+                continue
+            return True
+        return False
 
 ################################
 # HELPER CLASSES AND FUNCTIONS #
@@ -89,6 +111,24 @@ class Verifier:
 class DigistampKeyFileError(Exception):
     """ A custom exception. """
 
+def make_pss_padding():
+    """ Make the padding object used by RSA stamps. """
+    result = \
+        padding.PSS(
+            mgf=padding.MGF1(hashes.SHA256()),
+            salt_length=padding.PSS.MAX_LENGTH
+        )
+    return result
+
+def get_stamp_scheme(key):
+    """ Get the stamp scheme which goes with a given key, public or
+    private. """
+    if isinstance(key, (rsa.RSAPrivateKey, rsa.RSAPublicKey)):
+        return STAMP_SCHEME_RSA_PSS
+    if isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)):
+        return STAMP_SCHEME_ED25519
+    raise DigistampKeyFileError("Unsupported key type: "+type(key).__name__)
+
 def get_bytes_password():
     """ Get a password from the user, and convert it into bytes. """
     password = getpass.getpass(prompt="Digistamp password: ")
@@ -118,12 +158,28 @@ def generate_public_key(
     with open(path_to_public_key, "wb") as public_key_file:
         public_key_file.write(pem)
 
+def generate_private_key(key_type=DEFAULT_KEY_TYPE):
+    """ Generate a new private key of a given type. """
+    if key_type == KEY_TYPE_RSA:
+        result = \
+            rsa.generate_private_key(
+                public_exponent=PUBLIC_EXPONENT,
+                key_size=KEY_SIZE,
+                backend=default_backend()
+            )
+    elif key_type == KEY_TYPE_ED25519:
+        result = ed25519.Ed25519PrivateKey.generate()
+    else:
+        raise DigistampKeyFileError("Unsupported key type: "+str(key_type))
+    return result
+
 def generate_keys(
         path_to_private_key=DEFAULT_PATH_TO_PRIVATE_KEY,
         path_to_public_key=DEFAULT_PATH_TO_PUBLIC_KEY,
-        password=None
+        password=None,
+        key_type=DEFAULT_KEY_TYPE
     ):
-    """ Generate a new private and public key. """
+    """ Generate a new private and public key, of a given type. """
     if os.path.exists(path_to_private_key):
         raise DigistampKeyFileError(
             "Private file already exists at path: "+path_to_private_key
@@ -133,12 +189,7 @@ def generate_keys(
     else:
         password = get_bytes_password_new()
     algorithm = serialization.BestAvailableEncryption(password)
-    private_key = \
-        rsa.generate_private_key(
-            public_exponent=PUBLIC_EXPONENT,
-            key_size=KEY_SIZE,
-            backend=default_backend()
-        )
+    private_key = generate_private_key(key_type=key_type)
     pem = \
         private_key.private_bytes(
             encoding=serialization.Encoding.PEM,
@@ -153,7 +204,7 @@ def load_private_key(
         path_to_private_key=DEFAULT_PATH_TO_PRIVATE_KEY,
         password=None
     ):
-    """ Load the private key from its file. """
+    """ Load the private key from its file, whatever its type. """
     if not path_to_private_key:
         raise DigistampKeyFileError("No file at path: "+path_to_private_key)
     if password:
@@ -167,18 +218,32 @@ def load_private_key(
                 backend=default_backend(),
                 password=password
             )
+    get_stamp_scheme(result) # Check that it's a type we can use.
     return result
 
 def load_public_key(path_to_public_key=DEFAULT_PATH_TO_PUBLIC_KEY):
-    """ Load the public key from its file. """
+    """ Load the public key from its file - or, if the file holds more than
+    one, the first of them. """
+    result = load_public_keys(path_to_public_key=path_to_public_key)[0]
+    return result
+
+def load_public_keys(path_to_public_key=DEFAULT_PATH_TO_PUBLIC_KEY):
+    """ Load every public key in a given file, in order. """
     if not path_to_public_key:
         raise DigistampKeyFileError("No file at path: "+path_to_public_key)
     with open(path_to_public_key, "rb") as key_file:
-        result = \
+        pem_blocks = PUBLIC_KEY_PEM_PATTERN.findall(key_file.read())
+    if not pem_blocks:
+        raise DigistampKeyFileError("No public key in: "+path_to_public_key)
+    result = []
+    for pem_block in pem_blocks:
+        public_key = \
             serialization.load_pem_public_key(
-                key_file.read(),
+                pem_block,
                 backend=default_backend()
             )
+        get_stamp_scheme(public_key)
+        result.append(public_key)
     return result
 
 def generate_public_key_from_path(
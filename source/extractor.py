@@ -4,17 +4,19 @@ and converts it into a directory.
 """
 
 # Standard imports.
-import glob
+import calendar
+import hashlib
 import os
 import shutil
-import sqlite3
 import subprocess
+import tempfile
+import zlib
 from dataclasses import dataclass
 from pathlib import Path
 from typing import ClassVar
 
 # Non-standard imports.
-from pdfrw import PdfReader, PdfWriter
+from pdfrw import PdfArray, PdfDict, PdfName, PdfReader, PdfString, PdfWriter
 
 # Local imports.
 from .configs import (
@@ -29,33 +31,27 @@ from .configs import (
     YEAR_COLUMN,
     HASH_COLUMN,
     PREV_COLUMN,
-    ANNEXE_COLUMN,
     STAMP_COLUMN,
-    DECLARATION_KEY,
-    ORDER_KEY,
+    STAMP_SCHEME_COLUMN,
+    STAMP_SCHEME_RSA_PSS,
+    HASH_SCHEME_COLUMN,
+    HASH_SCHEME_V1,
+    ANNEXE_DIGEST_COLUMN,
+    METADATA_FORMAT_V1,
+    DEFAULT_METADATA_FORMAT,
     GENESIS_KEY,
     ANNEXE,
     COMPRESSION_FORMAT,
-    ARCHIVE_FN
+    ARCHIVE_FN,
+    ANNEXE_DIGEST_FN
 )
-from .digistamp import Verifier
-from .utils import dict_factory
+from .instrumentation import Instrument, get_instrument
+from .key_registry import get_verifier
+from .ledger import Ledger
+from .pdf_cache import PDFCache
+from .templates import TemplateError, render_main_tex
 
 # Local constants.
-MONTH_NAMES = (
-    "Jan",
-    "Feb",
-    "Mar",
-    "Apr",
-    "May",
-    "Jun",
-    "Jul",
-    "Aug",
-    "Sep",
-    "Oct",
-    "Nov",
-    "Dec"
-)
 VERIFICATION_INSTRUCTIONS = (
     "To verify this Ordinance: (1) Verify that the hash matches the data. "+
     "It should be the hex digest of the SHA256 hash of the data points. (2) "+
@@ -63,18 +59,10 @@ VERIFICATION_INSTRUCTIONS = (
     "padding and, again, SHA256. (To make your life easier, you could just "+
     "use the verification software provided by this office.)"
 )
-MIN_PACKED_ORDINAL_LENGTH = 3
+WORKING_DIR_PREFIX = "chancery_b_"
+PDF_STREAM_ENCODING = "latin-1"
 # Paths.
-PATH_OBJ_TO_TEX = Path(__file__).parent/"tex"
-PATH_TO_DECLARATION_BASE = str(PATH_OBJ_TO_TEX/"base_declaration.tex")
-PATH_TO_ORDER_BASE = str(PATH_OBJ_TO_TEX/"base_order.tex")
-# Markers.
-BODY_MARKER = "#BODY"
-DAY_STR_MARKER = "#DAY_STR"
-MONTH_STR_MARKER = "#MONTH_STR"
-YEAR_MARKER = "#YEAR"
-PACKED_ORDINAL_MARKER = "#PACKED_ORDINAL"
-PATH_TO_IMAGES_MARKER = "#PATH_TO_IMAGES"
+PATH_TO_SHARED_MEMORY = "/dev/shm"
 
 ##############
 # MAIN CLASS #
@@ -93,66 +81,54 @@ class Extractor:
     path_to_extracts: str = DEFAULT_PATH_TO_EXTRACTS
     path_to_ledger: str = DEFAULT_PATH_TO_LEDGER
     path_to_public_key: str = DEFAULT_PATH_TO_PUBLIC_KEY
+    ledger: Ledger = None
+    path_to_scratch: str = None # Where to make the working directory.
+    path_obj_to_working_dir: Path = None
+    pdf_cache: PDFCache = None
+    metadata_format: int = DEFAULT_METADATA_FORMAT
     path_obj_to_extract: Path = None
-    block: tuple = None
+    block: dict = None # Everything but the annexe; see fetch_annexe().
+    annexe: bytes = None
     main_tex: str = None
     clean_flag: bool = True
     purge_existing: bool = False
+    instrument: Instrument = None # Default: the process-wide instrument.
 
     def __post_init__(self):
+        if not self.instrument:
+            self.instrument = get_instrument()
         self.path_obj_to_extract = \
             Path(self.path_to_extracts)/str(self.ordinal)
+        if not self.ledger:
+            self.ledger = Ledger(path_to_ledger=self.path_to_ledger)
+        if not self.path_to_scratch:
+            self.path_to_scratch = get_default_path_to_scratch()
         self.block = self.fetch_block(self.ordinal)
         self.main_tex = self.make_main_tex()
         if self.purge_existing:
             shutil.rmtree(self.path_to_extracts, ignore_errors=True)
 
     def fetch_block(self, local_ordinal):
-        """ Fetch the block matching this object's ordinal from the ledger. """
-        connection = sqlite3.connect(self.path_to_ledger)
-        connection.row_factory = dict_factory
-        cursor = connection.cursor()
-        query = "SELECT * FROM Block WHERE ordinal = ?;"
-        cursor.execute(query, (local_ordinal,))
-        result = cursor.fetchone()
-        connection.close()
+        """ Fetch the block matching a given ordinal from the ledger, less its
+        annexe. """
+        result = self.ledger.get_header(local_ordinal)
         if not result:
-            raise ExtractorError("No block with ordinal: "+str(self.ordinal))
+            raise ExtractorError("No block with ordinal: "+str(local_ordinal))
         return result
 
-    def get_base(self):
-        """ Get the base for main.tex, given the type of the ordinance. """
-        col_id = ORDINANCE_TYPE_COLUMN
-        if self.block[col_id] == DECLARATION_KEY:
-            path_to_base = PATH_TO_DECLARATION_BASE
-        elif self.block[col_id] == ORDER_KEY:
-            path_to_base = PATH_TO_ORDER_BASE
-        else:
-            raise ExtractorError("Invalid "+col_id+": "+self.block[col_id])
-        with open(path_to_base, "r") as base_file:
-            result = base_file.read()
-        return result
+    def fetch_annexe(self):
+        """ Fetch this block's annexe, if we haven't already. """
+        if self.annexe is None:
+            self.annexe = self.ledger.get_annexe(self.ordinal)
+        return self.annexe
 
     def make_main_tex(self):
         """ Make the code for main.tex, which will then be used build our
         PDF. """
-        day_str = str(self.block[DAY_COLUMN])
-        if len(day_str) == 1:
-            day_str = "0"+day_str
-        packed_ordinal = str(self.ordinal)
-        while len(packed_ordinal) < MIN_PACKED_ORDINAL_LENGTH:
-            packed_ordinal = "0"+packed_ordinal
-        month_str = MONTH_NAMES[self.block[MONTH_COLUMN]-1]
-        result = self.get_base()
-        result = result.replace(BODY_MARKER, self.block[LATEX_COLUMN])
-        result = result.replace(DAY_STR_MARKER, day_str)
-        result = result.replace(MONTH_STR_MARKER, month_str)
-        result = result.replace(YEAR_MARKER, str(self.block[YEAR_COLUMN]))
-        result = result.replace(PACKED_ORDINAL_MARKER, packed_ordinal)
-        result = \
-            result.replace(
-                PATH_TO_IMAGES_MARKER, str(Path(__file__).parent/"images")
-            )
+        try:
+            result = render_main_tex(self.block)
+        except TemplateError as my_exception:
+            raise ExtractorError(str(my_exception)) from my_exception
         return result
 
     def authenticate(self):
@@ -178,98 +154,239 @@ class Extractor:
 
     def verify_stamp(self):
         """ Check that this block's stamp is in order. """
-        verifier = Verifier(path_to_public_key=self.path_to_public_key)
+        verifier = get_verifier(path_to_public_key=self.path_to_public_key)
         verified = \
-            verifier.verify(self.block[HASH_COLUMN], self.block[STAMP_COLUMN])
+            verifier.verify(
+                self.block[HASH_COLUMN],
+                self.block[STAMP_COLUMN],
+                stamp_scheme=self.block.get(STAMP_SCHEME_COLUMN)
+            )
         if not verified:
             raise ExtractorError(
                 "Block with ordinal "+str(self.ordinal)+" is not authentic: "+
                 "its stamp cannot be verified against its hash."
             )
 
+    def make_working_dir(self):
+        """ Make a fresh directory, in which all our intermediate files will
+        be written, so that any number of extractions can run at once. """
+        self.path_obj_to_working_dir = \
+            Path(
+                tempfile.mkdtemp(
+                    prefix=WORKING_DIR_PREFIX+str(self.ordinal)+"_",
+                    dir=self.path_to_scratch
+                )
+            )
+
+    def get_working_path(self, filename):
+        """ Get the path to a given file in the working directory. """
+        result = str(self.path_obj_to_working_dir/filename)
+        return result
+
     def write_main_tex(self):
         """ Ronseal. """
-        with open(self.WORKING_STEM+".tex", "w") as main_tex:
+        path_to_main_tex = self.get_working_path(self.WORKING_STEM+".tex")
+        with open(path_to_main_tex, "w") as main_tex:
             main_tex.write(self.main_tex)
 
+    def get_latex_env(self):
+        """ Get the environment in which to run LaTeX. Pinning the date to
+        that of the ordinance makes the output byte-for-byte reproducible. """
+        source_date_epoch = \
+            calendar.timegm(
+                (
+                    self.block[YEAR_COLUMN],
+                    self.block[MONTH_COLUMN],
+                    self.block[DAY_COLUMN],
+                    0,
+                    0,
+                    0
+                )
+            )
+        result = dict(os.environ)
+        result["SOURCE_DATE_EPOCH"] = str(max(source_date_epoch, 0))
+        result["FORCE_SOURCE_DATE"] = "1"
+        return result
+
+    def get_latex_args(self):
+        """ Get the command, with its arguments, which compiles main.tex in
+        the working directory. """
+        result = [self.LATEX_COMMAND, self.WORKING_STEM+".tex"]
+        return result
+
+    def fetch_from_pdf_cache(self):
+        """ Fetch the PDF from the cache, if we have one and it has seen this
+        exact main.tex before, and say whether we did. """
+        if not self.pdf_cache:
+            return False
+        key = self.pdf_cache.make_key(self.main_tex, self.LATEX_COMMAND)
+        result = \
+            self.pdf_cache.fetch(
+                key, self.get_working_path(self.WORKING_STEM+".pdf")
+            )
+        return result
+
+    def store_in_pdf_cache(self):
+        """ Add the newly compiled PDF to the cache, if we have one. """
+        if self.pdf_cache:
+            key = self.pdf_cache.make_key(self.main_tex, self.LATEX_COMMAND)
+            self.pdf_cache.store(
+                key, self.get_working_path(self.WORKING_STEM+".pdf")
+            )
+
     def compile_main_tex(self):
-        """ Compile the PDF. """
+        """ Compile the PDF, or fetch it from the cache. """
+        if self.fetch_from_pdf_cache():
+            return
         subprocess.run(
-            [self.LATEX_COMMAND, self.WORKING_STEM+".tex"], check=True
+            self.get_latex_args(),
+            check=True,
+            cwd=self.path_obj_to_working_dir,
+            env=self.get_latex_env()
         )
+        self.store_in_pdf_cache()
 
     def get_decoded_annexe(self):
         """ Get the annexe field, if it exists, and decode it. """
         result = None
-        if self.block[ANNEXE_COLUMN]:
-            result = self.block[ANNEXE_COLUMN].hex()
+        if self.fetch_annexe():
+            result = self.annexe.hex()
         return result
 
+    def make_annexe_file(self):
+        """ Make an embedded file stream holding the annexe, compressed, or
+        return None if there's no annexe. """
+        if not self.fetch_annexe():
+            return None
+        result = \
+            PdfDict(
+                Type=PdfName.EmbeddedFile,
+                Filter=PdfName.FlateDecode,
+                DL=len(self.annexe)
+            )
+        result.indirect = True
+        # NB: pdfrw holds streams as strings, one character per byte.
+        result.stream = \
+            zlib.compress(self.annexe).decode(PDF_STREAM_ENCODING)
+        return result
+
+    def attach_annexe_file(self, trailer, annexe_file):
+        """ List the annexe among the document's embedded files, so that a
+        PDF viewer will offer it as an attachment. """
+        filespec = \
+            PdfDict(
+                Type=PdfName.Filespec,
+                F=PdfString.encode(ARCHIVE_FN),
+                UF=PdfString.encode(ARCHIVE_FN),
+                EF=PdfDict(F=annexe_file)
+            )
+        if not trailer.Root.Names:
+            trailer.Root.Names = PdfDict()
+        trailer.Root.Names.EmbeddedFiles = \
+            PdfDict(Names=PdfArray([PdfString.encode(ARCHIVE_FN), filespec]))
+
     def add_metadata(self):
         """ Add the verification metadata to the PDF. """
-        path_to_old = self.WORKING_STEM+self.OLD_SUFFIX+".pdf"
-        os.rename(self.WORKING_STEM+".pdf", path_to_old)
+        path_to_pdf = self.get_working_path(self.WORKING_STEM+".pdf")
+        path_to_old = \
+            self.get_working_path(self.WORKING_STEM+self.OLD_SUFFIX+".pdf")
+        os.rename(path_to_pdf, path_to_old)
         trailer = PdfReader(path_to_old)
         trailer.Info.instructions = VERIFICATION_INSTRUCTIONS
+        trailer.Info.metadata_format = self.metadata_format
         trailer.Info.data_ordinal = self.block[ORDINAL_COLUMN]
         trailer.Info.data_ordinance_type = self.block[ORDINANCE_TYPE_COLUMN]
         trailer.Info.data_latex = self.block[LATEX_COLUMN]
         trailer.Info.data_year = self.block[YEAR_COLUMN]
         trailer.Info.data_month = self.block[MONTH_COLUMN]
         trailer.Info.data_day = self.block[DAY_COLUMN]
-        trailer.Info.data_annexe = self.get_decoded_annexe()
+        if self.metadata_format == METADATA_FORMAT_V1:
+            trailer.Info.data_annexe = self.get_decoded_annexe()
+        else:
+            annexe_file = self.make_annexe_file()
+            if annexe_file is not None:
+                trailer.Info.data_annexe_file = annexe_file
+                self.attach_annexe_file(trailer, annexe_file)
         trailer.Info.data_prev = self.block[PREV_COLUMN]
+        trailer.Info.data_hash_scheme = \
+            self.block.get(HASH_SCHEME_COLUMN) or HASH_SCHEME_V1
         trailer.Info.hash = self.block[HASH_COLUMN]
         trailer.Info.stamp = self.block[STAMP_COLUMN]
-        PdfWriter(self.WORKING_STEM+".pdf", trailer=trailer).write()
+        trailer.Info.stamp_scheme = \
+            self.block.get(STAMP_SCHEME_COLUMN) or STAMP_SCHEME_RSA_PSS
+        PdfWriter(path_to_pdf, trailer=trailer).write()
 
     def create_and_copy(self):
         """ Create the extract directory, and copy the PDF into it. """
         source_fn = self.WORKING_STEM+".pdf"
         path_to_dest = str(self.path_obj_to_extract/source_fn)
         self.path_obj_to_extract.mkdir(parents=True, exist_ok=True)
-        os.rename(source_fn, path_to_dest)
+        # NB: The working directory may well be on a different filesystem.
+        shutil.move(self.get_working_path(source_fn), path_to_dest)
 
     def write_and_unpack_annexe(self):
-        """ Write annexe to a file in the directory. """
-        archive_bytes = self.block[ANNEXE_COLUMN]
-        if archive_bytes:
-            with open(ARCHIVE_FN, "wb") as archive_file:
-                archive_file.write(archive_bytes)
-            path_to_annexe = str(self.path_obj_to_extract/ANNEXE)
-            shutil.unpack_archive(
-                ARCHIVE_FN, path_to_annexe, COMPRESSION_FORMAT
-            )
+        """ Write annexe to a file in the directory, unless the very same
+        annexe has already been unpacked there. """
+        archive_bytes = self.fetch_annexe()
+        if not archive_bytes:
+            return
+        digest = \
+            self.block.get(ANNEXE_DIGEST_COLUMN) or \
+            hashlib.sha256(archive_bytes).hexdigest()
+        path_obj_to_annexe = self.path_obj_to_extract/ANNEXE
+        path_obj_to_digest = self.path_obj_to_extract/ANNEXE_DIGEST_FN
+        if (
+            path_obj_to_annexe.is_dir() and
+            path_obj_to_digest.is_file() and
+            path_obj_to_digest.read_text() == digest
+        ):
+            return
+        path_to_archive = self.get_working_path(ARCHIVE_FN)
+        with open(path_to_archive, "wb") as archive_file:
+            archive_file.write(archive_bytes)
+        shutil.rmtree(path_obj_to_annexe, ignore_errors=True)
+        shutil.unpack_archive(
+            path_to_archive, str(path_obj_to_annexe), COMPRESSION_FORMAT
+        )
+        path_obj_to_digest.write_text(digest)
 
     def clean(self):
-        """ Clean up any temporary generated files. """
-        files_to_delete = (
-            [ARCHIVE_FN]+
-            glob.glob(self.WORKING_STEM+".*")+
-            glob.glob(self.WORKING_STEM+self.OLD_SUFFIX+".*")
-        )
-        for filename in files_to_delete:
-            try:
-                os.remove(filename)
-            except OSError:
-                pass
+        """ Clean up any temporary generated files, i.e. the whole working
+        directory. """
+        if self.path_obj_to_working_dir:
+            shutil.rmtree(self.path_obj_to_working_dir, ignore_errors=True)
+
+    def run_stage(self, method):
+        """ Run a given method as a stage of the extraction. """
+        with self.instrument.stage("extract."+method.__name__):
+            method()
 
     def extract(self):
         """ Do the thing. """
-        self.authenticate()
-        self.write_main_tex()
-        self.compile_main_tex()
-        self.add_metadata()
-        self.create_and_copy()
-        self.write_and_unpack_annexe()
-        if self.clean_flag:
-            self.clean()
+        self.run_stage(self.authenticate)
+        self.make_working_dir()
+        try:
+            self.run_stage(self.write_main_tex)
+            self.run_stage(self.compile_main_tex)
+            self.run_stage(self.add_metadata)
+            self.run_stage(self.create_and_copy)
+            self.run_stage(self.write_and_unpack_annexe)
+        finally:
+            if self.clean_flag:
+                self.clean()
         result = str(self.path_obj_to_extract.resolve())
         return result
 
-################
-# HELPER CLASS #
-################
+################################
+# HELPER CLASSES AND FUNCTIONS #
+################################
 
 class ExtractorError(Exception):
     """ A custom exception. """
+
+def get_default_path_to_scratch():
+    """ Get the directory in which to make working directories: shared
+    memory, if we can write to it, or else the system default. """
+    if os.access(PATH_TO_SHARED_MEMORY, os.W_OK):
+        return PATH_TO_SHARED_MEMORY
+    return None
@@ -0,0 +1,217 @@
+"""
+This code defines a light instrumentation layer: a context manager which
+times a named stage of the work - and counts the bytes read and written
+during it - and passes the result on to any number of sinks, which might log
+it, append it to a JSON file or simply keep it in memory.
+
+With no sinks attached, which is the default, a stage costs next to nothing.
+The byte counts come from the kernel's per-process counters, where it keeps
+them, so they take in everything the process reads and writes - the ledger's
+pages included - but not what a subprocess, such as pdflatex, does; they are
+also shared between threads, so that concurrent stages muddle them.
+"""
+
+# Standard imports.
+import argparse
+import cProfile
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+
+# Local constants.
+PATH_TO_PROC_IO = "/proc/self/io"
+BYTES_READ_KEY = "rchar"
+BYTES_WRITTEN_KEY = "wchar"
+LOGGER = logging.getLogger(__name__)
+
+################
+# MAIN CLASSES #
+################
+
+@dataclass
+class StageTiming:
+    """ A class which holds the measurements taken over one stage. The byte
+    counts are None where the platform doesn't keep them. """
+    # Object attributes.
+    name: str = None
+    seconds: float = None
+    bytes_read: int = None
+    bytes_written: int = None
+    failed: bool = False
+
+    def to_dict(self):
+        """ Ronseal. """
+        result = asdict(self)
+        return result
+
+@dataclass
+class Instrument:
+    """ A class which times stages, and hands each timing to its sinks. """
+    # Object attributes.
+    sinks: list = field(default_factory=list)
+
+    def add_sink(self, sink):
+        """ Ronseal. """
+        self.sinks.append(sink)
+
+    def remove_sink(self, sink):
+        """ Ronseal. """
+        self.sinks.remove(sink)
+
+    @contextmanager
+    def stage(self, name):
+        """ Time the body of the with statement as the stage with a given
+        name. A stage which raises an exception is still recorded, but
+        marked as having failed. """
+        if not self.sinks:
+            yield None
+            return
+        timing = StageTiming(name=name)
+        start_counters = read_io_counters()
+        start = time.perf_counter()
+        try:
+            yield timing
+        except BaseException:
+            timing.failed = True
+            raise
+        finally:
+            timing.seconds = time.perf_counter()-start
+            end_counters = read_io_counters()
+            if start_counters and end_counters:
+                timing.bytes_read = \
+                    end_counters[BYTES_READ_KEY]-start_counters[BYTES_READ_KEY]
+                timing.bytes_written = \
+                    end_counters[BYTES_WRITTEN_KEY]- \
+                    start_counters[BYTES_WRITTEN_KEY]
+            for sink in list(self.sinks):
+                sink.record(timing)
+
+################################
+# HELPER CLASSES AND FUNCTIONS #
+################################
+
+@dataclass
+class MemorySink:
+    """ A sink which keeps every timing in a list. """
+    # Object attributes.
+    timings: list = field(default_factory=list)
+
+    def record(self, timing):
+        """ Ronseal. """
+        self.timings.append(timing)
+
+    def get_totals(self):
+        """ Get the total seconds spent in each stage, by name. """
+        result = {}
+        for timing in self.timings:
+            result[timing.name] = result.get(timing.name, 0)+timing.seconds
+        return result
+
+@dataclass
+class LogSink:
+    """ A sink which writes each timing as a log line. """
+    # Object attributes.
+    logger: logging.Logger = LOGGER
+    level: int = logging.INFO
+
+    def record(self, timing):
+        """ Ronseal. """
+        self.logger.log(
+            self.level,
+            "%s: %.6f s, %s bytes read, %s bytes written%s",
+            timing.name,
+            timing.seconds,
+            timing.bytes_read,
+            timing.bytes_written,
+            " (failed)" if timing.failed else ""
+        )
+
+@dataclass
+class JSONSink:
+    """ A sink which appends each timing to a file, as a line of JSON. """
+    # Object attributes.
+    path_to_output: str = None
+    lock: object = field(default_factory=threading.Lock)
+
+    def record(self, timing):
+        """ Ronseal. """
+        line = json.dumps(timing.to_dict())+"\n"
+        with self.lock:
+            with open(self.path_to_output, "a") as output_file:
+                output_file.write(line)
+
+def read_io_counters():
+    """ Read this process's I/O counters, returning None if the platform
+    doesn't keep them. """
+    result = {}
+    try:
+        with open(PATH_TO_PROC_IO, "r") as io_file:
+            for line in io_file:
+                key, value = line.split(":")
+                result[key] = int(value)
+    except (OSError, ValueError):
+        return None
+    if BYTES_READ_KEY not in result or BYTES_WRITTEN_KEY not in result:
+        return None
+    return result
+
+#############
+# FUNCTIONS #
+#############
+
+# The instrument shared by everything in this process.
+instrument = Instrument()
+
+def get_instrument():
+    """ Get the process-wide instrument. """
+    return instrument
+
+def add_profiling_arguments(parser):
+    """ Add the opt-in profiling arguments, which every script takes. """
+    parser.add_argument(
+        "--profile",
+        help="Dump cProfile statistics for the whole run to this path",
+        type=str,
+        dest="path_to_profile"
+    )
+    parser.add_argument(
+        "--stage-timings",
+        help="Append the time and I/O of each stage, as JSON lines, here",
+        type=str,
+        dest="path_to_stage_timings"
+    )
+
+@contextmanager
+def profiling(arguments):
+    """ Profile the body of the with statement, and record its stages, as
+    the arguments added by add_profiling_arguments() ask. The statistics are
+    dumped even if the body raises an exception or exits. """
+    sink = None
+    if arguments.path_to_stage_timings:
+        sink = JSONSink(path_to_output=arguments.path_to_stage_timings)
+        instrument.add_sink(sink)
+    profiler = None
+    if arguments.path_to_profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(arguments.path_to_profile)
+        if sink:
+            instrument.remove_sink(sink)
+
+def run_with_profiling(run):
+    """ Call a given script's run() function under profiling(), picking the
+    profiling arguments out of the command line ahead of the script's own
+    parser, which should also accept them. """
+    parser = argparse.ArgumentParser(add_help=False)
+    add_profiling_arguments(parser)
+    arguments, _ = parser.parse_known_args()
+    with profiling(arguments):
+        run()
@@ -0,0 +1,125 @@
+"""
+This code defines a process-wide registry of ready-made Verifier and
+StampMachine objects, so that each key file is parsed - and each private key
+decrypted - only once, however many blocks are stamped or checked.
+"""
+
+# Standard imports.
+import hashlib
+import os
+import threading
+from dataclasses import dataclass, field
+
+# Local imports.
+from .configs import (
+    DEFAULT_PATH_TO_PRIVATE_KEY,
+    DEFAULT_PATH_TO_PUBLIC_KEY,
+    ENCODING
+)
+from .digistamp import StampMachine, Verifier
+
+##############
+# MAIN CLASS #
+##############
+
+@dataclass
+class KeyRegistry:
+    """ The class in question. Each entry is stored against the key file's
+    fingerprint - its real path, modification time and size - so that, when a
+    key is rotated, the next lookup reloads it. Private keys are also stored
+    against a digest of the password used to decrypt them, so that a wrong
+    password is never let in on the strength of an earlier right one. """
+    # Object attributes.
+    verifiers: dict = field(default_factory=dict)
+    stamp_machines: dict = field(default_factory=dict)
+    lock: object = field(default_factory=threading.Lock)
+    hits: int = 0
+    misses: int = 0
+
+    def get_verifier(self, path_to_public_key=DEFAULT_PATH_TO_PUBLIC_KEY):
+        """ Get a verifier for the public key file at a given path. """
+        fingerprint = get_fingerprint(path_to_public_key)
+        with self.lock:
+            entry = self.verifiers.get(fingerprint[0])
+            if entry and entry[0] == fingerprint:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            result = Verifier(path_to_public_key=path_to_public_key)
+            self.verifiers[fingerprint[0]] = (fingerprint, result)
+        return result
+
+    def get_stamp_machine(
+            self,
+            path_to_private_key=DEFAULT_PATH_TO_PRIVATE_KEY,
+            password=None
+        ):
+        """ Get a stamp machine for the private key file at a given path. If
+        no password is given, the user is prompted for one the first time
+        only. """
+        fingerprint = get_fingerprint(path_to_private_key)
+        lookup = (fingerprint[0], get_password_digest(password))
+        with self.lock:
+            entry = self.stamp_machines.get(lookup)
+            if entry and entry[0] == fingerprint:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            result = \
+                StampMachine(
+                    path_to_private_key=path_to_private_key,
+                    password=password
+                )
+            self.stamp_machines[lookup] = (fingerprint, result)
+        return result
+
+    def clear(self):
+        """ Forget every key loaded so far. """
+        with self.lock:
+            self.verifiers.clear()
+            self.stamp_machines.clear()
+
+####################
+# HELPER FUNCTIONS #
+####################
+
+def get_fingerprint(path_to_key):
+    """ Get the (real path, modification time, size) triple which identifies
+    the current version of a given key file. """
+    real_path = os.path.realpath(path_to_key)
+    stat_result = os.stat(real_path)
+    result = (real_path, stat_result.st_mtime_ns, stat_result.st_size)
+    return result
+
+def get_password_digest(password):
+    """ Digest a password, so that it can serve as part of a lookup without
+    being kept in the clear. """
+    if password is None:
+        return None
+    result = hashlib.sha256(bytes(password, ENCODING)).hexdigest()
+    return result
+
+#############
+# FUNCTIONS #
+#############
+
+# The registry shared by everything in this process.
+key_registry = KeyRegistry()
+
+def get_verifier(path_to_public_key=DEFAULT_PATH_TO_PUBLIC_KEY):
+    """ Get a verifier from the process-wide registry. """
+    result = \
+        key_registry.get_verifier(path_to_public_key=path_to_public_key)
+    return result
+
+def get_stamp_machine(
+        path_to_private_key=DEFAULT_PATH_TO_PRIVATE_KEY,
+        password=None
+    ):
+    """ Get a stamp machine from the process-wide registry. """
+    result = \
+        key_registry.get_stamp_machine(
+            path_to_private_key=path_to_private_key,
+            password=password
+        )
+    return result
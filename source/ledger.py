@@ -0,0 +1,605 @@
+"""
+This code defines a class which provides access to the ledger, over a single,
+long-lived connection.
+"""
+
+# Standard imports.
+import hashlib
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+# Local imports.
+from .configs import (
+    DEFAULT_PATH_TO_LEDGER,
+    ORDINAL_COLUMN,
+    HASH_COLUMN,
+    STAMP_COLUMN,
+    ORDINANCE_TYPE_COLUMN,
+    LATEX_COLUMN,
+    YEAR_COLUMN,
+    MONTH_COLUMN,
+    DAY_COLUMN,
+    ANNEXE_COLUMN,
+    ANNEXE_DIGEST_COLUMN,
+    HASH_SCHEME_COLUMN,
+    HASH_SCHEME_V1,
+    STAMP_SCHEME_COLUMN,
+    STAMP_SCHEME_RSA_PSS,
+    FIRST_ORDINAL_COLUMN,
+    LAST_ORDINAL_COLUMN,
+    ROOT_COLUMN
+)
+from .utils import dict_factory
+
+# Local constants.
+BLOCK_ATTRIBUTES = (
+    "ordinal",
+    "ordinance_type",
+    "latex",
+    "year",
+    "month_num",
+    "day",
+    "stamp",
+    "annexe",
+    "prev",
+    "hash",
+    "hash_scheme",
+    "stamp_scheme"
+)
+BLOCK_COLUMNS = BLOCK_ATTRIBUTES+(ANNEXE_DIGEST_COLUMN,)
+# Everything but the annexe, which may run to many megabytes.
+HEADER_COLUMNS = tuple(
+    column for column in BLOCK_COLUMNS if column != ANNEXE_COLUMN
+)
+TIP_COLUMNS = (ORDINAL_COLUMN, HASH_COLUMN)
+CHECKPOINT_COLUMNS = (
+    FIRST_ORDINAL_COLUMN,
+    LAST_ORDINAL_COLUMN,
+    ROOT_COLUMN,
+    STAMP_COLUMN,
+    STAMP_SCHEME_COLUMN
+)
+# An annexe is stored either inline, or in the content-addressed Annexe
+# table, in which case the inline column is NULL.
+ANNEXE_EXPRESSION = "COALESCE(Block.annexe, Annexe.content) AS annexe"
+FROM_BLOCK_AND_ANNEXE = (
+    "FROM Block LEFT JOIN Annexe ON Annexe.digest = Block.annexe_digest"
+)
+BLOCK_SELECT_LIST = ", ".join(
+    ANNEXE_EXPRESSION if column == ANNEXE_COLUMN else "Block."+column
+    for column in BLOCK_COLUMNS
+)
+# The connection should spend its life mostly reading, and WAL mode lets
+# readers and the writer proceed without blocking one another.
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL;",
+    "PRAGMA synchronous = NORMAL;",
+    "PRAGMA mmap_size = 268435456;",
+    "PRAGMA busy_timeout = 5000;"
+)
+# Queries. These are kept constant, so that sqlite3's statement cache can
+# reuse the prepared statements.
+SELECT_TIP_QUERY = (
+    "SELECT "+", ".join(TIP_COLUMNS)+" FROM Block "+
+    "ORDER BY ordinal DESC LIMIT 1;"
+)
+SELECT_BLOCK_QUERY = (
+    "SELECT "+BLOCK_SELECT_LIST+" "+FROM_BLOCK_AND_ANNEXE+" "+
+    "WHERE Block.ordinal = ?;"
+)
+SELECT_HEADER_QUERY = (
+    "SELECT "+", ".join(HEADER_COLUMNS)+" FROM Block WHERE ordinal = ?;"
+)
+SELECT_ANNEXE_QUERY = (
+    "SELECT "+ANNEXE_EXPRESSION+" "+FROM_BLOCK_AND_ANNEXE+" "+
+    "WHERE Block.ordinal = ?;"
+)
+SELECT_ALL_BLOCKS_QUERY = (
+    "SELECT "+BLOCK_SELECT_LIST+" "+FROM_BLOCK_AND_ANNEXE+" "+
+    "WHERE Block.ordinal > ? ORDER BY Block.ordinal;"
+)
+SELECT_ALL_HEADERS_QUERY = (
+    "SELECT "+", ".join(HEADER_COLUMNS)+" FROM Block "+
+    "WHERE ordinal > ? ORDER BY ordinal;"
+)
+SELECT_HASHES_QUERY = (
+    "SELECT hash FROM Block WHERE ordinal BETWEEN ? AND ? ORDER BY ordinal;"
+)
+SELECT_CHECKPOINT_QUERY = (
+    "SELECT "+", ".join(CHECKPOINT_COLUMNS)+" FROM Checkpoint "+
+    "WHERE last_ordinal >= ? ORDER BY last_ordinal LIMIT 1;"
+)
+SELECT_LAST_CHECKPOINT_QUERY = (
+    "SELECT "+", ".join(CHECKPOINT_COLUMNS)+" FROM Checkpoint "+
+    "ORDER BY last_ordinal DESC LIMIT 1;"
+)
+SELECT_ALL_CHECKPOINTS_QUERY = (
+    "SELECT "+", ".join(CHECKPOINT_COLUMNS)+" FROM Checkpoint "+
+    "ORDER BY last_ordinal;"
+)
+INSERT_CHECKPOINT_QUERY = (
+    "INSERT INTO Checkpoint ("+", ".join(CHECKPOINT_COLUMNS)+") "+
+    "VALUES ("+", ".join(":"+column for column in CHECKPOINT_COLUMNS)+");"
+)
+SELECT_INLINE_ANNEXE_ORDINALS_QUERY = \
+    "SELECT ordinal FROM Block WHERE annexe IS NOT NULL ORDER BY ordinal;"
+INSERT_BLOCK_QUERY = (
+    "INSERT INTO Block ("+", ".join(BLOCK_COLUMNS)+") "+
+    "VALUES ("+", ".join(":"+column for column in BLOCK_COLUMNS)+");"
+)
+INSERT_ANNEXE_QUERY = \
+    "INSERT OR IGNORE INTO Annexe (digest, content) VALUES (?, ?);"
+MOVE_ANNEXE_QUERY = \
+    "UPDATE Block SET annexe = NULL, annexe_digest = ? WHERE ordinal = ?;"
+# Schema upgrades for older ledgers.
+MISSING_COLUMN_QUERIES = (
+    (
+        HASH_SCHEME_COLUMN,
+        "ALTER TABLE Block ADD COLUMN \""+HASH_SCHEME_COLUMN+"\" "+
+        "INTEGER NOT NULL DEFAULT "+str(HASH_SCHEME_V1)+";"
+    ),
+    (
+        ANNEXE_DIGEST_COLUMN,
+        "ALTER TABLE Block ADD COLUMN \""+ANNEXE_DIGEST_COLUMN+"\" TEXT;"
+    ),
+    (
+        STAMP_SCHEME_COLUMN,
+        "ALTER TABLE Block ADD COLUMN \""+STAMP_SCHEME_COLUMN+"\" "+
+        "INTEGER NOT NULL DEFAULT "+str(STAMP_SCHEME_RSA_PSS)+";"
+    )
+)
+# What searches and listings return. Each of these columns precedes the
+# annexe in each row, so that SQLite needn't walk an inline annexe's overflow
+# pages to fetch them.
+SUMMARY_COLUMNS = (
+    ORDINAL_COLUMN,
+    ORDINANCE_TYPE_COLUMN,
+    LATEX_COLUMN,
+    YEAR_COLUMN,
+    MONTH_COLUMN,
+    DAY_COLUMN
+)
+# Full-text search. The index is contentless - it holds no copy of the text -
+# and its rowids are the ordinals.
+SEARCH_TABLE = "OrdinanceSearch"
+DATE_EXPRESSION = "printf('%04d-%02d-%02d', year, month_num, day)"
+SELECT_SEARCH_TABLE_QUERY = \
+    "SELECT name FROM sqlite_master WHERE type = 'table' AND name = ?;"
+CREATE_SEARCH_TABLE_QUERY = (
+    "CREATE VIRTUAL TABLE \""+SEARCH_TABLE+"\" USING fts5("+
+    "latex, ordinance_type, date, content='', "+
+    "tokenize='porter unicode61');"
+)
+INSERT_SEARCH_ENTRY_QUERY = (
+    "INSERT INTO "+SEARCH_TABLE+" (rowid, latex, ordinance_type, date) "+
+    "VALUES (?, ?, ?, ?);"
+)
+CLEAR_SEARCH_TABLE_QUERY = (
+    "INSERT INTO "+SEARCH_TABLE+" ("+SEARCH_TABLE+") VALUES ('delete-all');"
+)
+FILL_SEARCH_TABLE_QUERY = (
+    "INSERT INTO "+SEARCH_TABLE+" (rowid, latex, ordinance_type, date) "+
+    "SELECT ordinal, latex, ordinance_type, "+DATE_EXPRESSION+" FROM Block;"
+)
+SEARCH_QUERY = (
+    "SELECT "+
+    ", ".join("Block."+column for column in SUMMARY_COLUMNS)+", "+
+    SEARCH_TABLE+".rank AS rank "+
+    "FROM "+SEARCH_TABLE+" JOIN Block ON Block.ordinal = "+SEARCH_TABLE+
+    ".rowid WHERE "+SEARCH_TABLE+" MATCH ? ORDER BY rank, Block.ordinal "+
+    "LIMIT ? OFFSET ?;"
+)
+DEFAULT_PAGE_SIZE = 20
+# Lookups and listings. Every index on Block ends, implicitly, with the
+# ordinal, so each listing below is a range scan of a single index, and its
+# pages can be keyed on the last result of the one before.
+SELECT_HEADER_BY_HASH_QUERY = (
+    "SELECT "+", ".join(HEADER_COLUMNS)+" FROM Block WHERE hash = ? "+
+    "ORDER BY ordinal LIMIT 1;"
+)
+SELECT_BETWEEN_QUERY = (
+    "SELECT "+", ".join(SUMMARY_COLUMNS)+" FROM Block "+
+    "WHERE (year, month_num, day, ordinal) > (?, ?, ?, ?) "+
+    "AND (year, month_num, day) <= (?, ?, ?) "+
+    "ORDER BY year, month_num, day, ordinal LIMIT ?;"
+)
+SELECT_BY_TYPE_QUERY = (
+    "SELECT "+", ".join(SUMMARY_COLUMNS)+" FROM Block "+
+    "WHERE ordinance_type = ? AND ordinal > ? ORDER BY ordinal LIMIT ?;"
+)
+CREATE_INDEX_QUERIES = (
+    "CREATE INDEX IF NOT EXISTS \"BlockHash\" ON \"Block\" (\"hash\");",
+    "CREATE INDEX IF NOT EXISTS \"BlockDate\" ON \"Block\" "+
+    "(\"year\", \"month_num\", \"day\");",
+    "CREATE INDEX IF NOT EXISTS \"BlockType\" ON \"Block\" "+
+    "(\"ordinance_type\");"
+)
+CREATE_TABLE_QUERIES = (
+    "CREATE TABLE IF NOT EXISTS \"Annexe\" ("+
+    "\"digest\" TEXT, "+
+    "\"content\" BLOB NOT NULL, "+
+    "PRIMARY KEY(\"digest\"));",
+    "CREATE TABLE IF NOT EXISTS \"Checkpoint\" ("+
+    "\"last_ordinal\" INTEGER, "+
+    "\"first_ordinal\" INTEGER NOT NULL, "+
+    "\"root\" TEXT NOT NULL, "+
+    "\"stamp\" TEXT NOT NULL, "+
+    "\"stamp_scheme\" INTEGER NOT NULL, "+
+    "PRIMARY KEY(\"last_ordinal\"));"
+)
+
+# One ledger per path, per thread; see get_ledger().
+local_ledgers = threading.local()
+
+##############
+# MAIN CLASS #
+##############
+
+@dataclass
+class Ledger:
+    """ The class in question. An object of this class must only be used by
+    the thread which created it. """
+    # Object attributes.
+    path_to_ledger: str = DEFAULT_PATH_TO_LEDGER
+    connection: sqlite3.Connection = None
+    process_id: int = None
+    file_id: tuple = None
+    has_search_index: bool = False # False if SQLite lacks FTS5.
+
+    def __post_init__(self):
+        self.connect()
+
+    def connect(self):
+        """ Open the connection, tune it, and bring the schema up to date. We
+        manage transactions ourselves, hence the isolation level. """
+        if not os.path.exists(self.path_to_ledger):
+            raise LedgerError("No ledger at path: "+self.path_to_ledger)
+        self.connection = \
+            sqlite3.connect(self.path_to_ledger, isolation_level=None)
+        for pragma in PRAGMAS:
+            self.connection.execute(pragma)
+        self.upgrade_as_necessary()
+        self.connection.row_factory = dict_factory
+        self.process_id = os.getpid()
+        self.file_id = get_file_id(self.path_to_ledger)
+
+    def close(self):
+        """ Ronseal. """
+        if self.connection:
+            self.connection.close()
+            self.connection = None
+
+    def is_stale(self):
+        """ Decide whether this object's connection can no longer be used,
+        i.e. because it was inherited across a fork, or because the file at
+        the path has been replaced. """
+        if not self.connection or self.process_id != os.getpid():
+            return True
+        try:
+            result = get_file_id(self.path_to_ledger) != self.file_id
+        except OSError:
+            result = True
+        return result
+
+    def upgrade_as_necessary(self):
+        """ Add any columns, tables or indexes missing from an older
+        ledger. """
+        cursor = self.connection.execute("SELECT * FROM Block LIMIT 0;")
+        columns = [description[0] for description in cursor.description]
+        for column, query in MISSING_COLUMN_QUERIES:
+            if column not in columns:
+                self.connection.execute(query)
+        for query in CREATE_TABLE_QUERIES+CREATE_INDEX_QUERIES:
+            self.connection.execute(query)
+        self.add_search_index_as_necessary()
+
+    def has_search_table(self):
+        """ Ronseal. """
+        result = \
+            self.connection.execute(
+                SELECT_SEARCH_TABLE_QUERY, (SEARCH_TABLE,)
+            ).fetchone() is not None
+        return result
+
+    def add_search_index_as_necessary(self):
+        """ Add the full-text search index, if it's missing, filling it from
+        the blocks already in the ledger. We check again once we have the
+        write lock, in case another connection got there first. """
+        if self.has_search_table():
+            self.has_search_index = True
+            return
+        with self.transaction():
+            if self.has_search_table():
+                self.has_search_index = True
+                return
+            try:
+                self.connection.execute(CREATE_SEARCH_TABLE_QUERY)
+            except sqlite3.OperationalError:
+                return # This build of SQLite has no FTS5.
+            self.connection.execute(FILL_SEARCH_TABLE_QUERY)
+            self.has_search_index = True
+
+    @contextmanager
+    def transaction(self):
+        """ Run the body of a with statement inside a write transaction,
+        which is committed at the end, or rolled back if an exception is
+        raised. Taking the write lock at the start means that nothing read
+        inside the transaction can be changed by another writer before we
+        commit. If a transaction is already open, we simply join it. """
+        if self.connection.in_transaction:
+            yield self
+            return
+        self.connection.execute("BEGIN IMMEDIATE;")
+        try:
+            yield self
+        except BaseException:
+            self.connection.execute("ROLLBACK;")
+            raise
+        self.connection.execute("COMMIT;")
+
+    def tip(self):
+        """ Return the ordinal and hash of the block at the tip of the chain,
+        or None if the ledger is empty. """
+        result = self.connection.execute(SELECT_TIP_QUERY).fetchone()
+        return result
+
+    def get(self, ordinal):
+        """ Return the block with a given ordinal, annexe and all, or None if
+        there isn't one. """
+        result = \
+            self.connection.execute(SELECT_BLOCK_QUERY, (ordinal,)).fetchone()
+        return result
+
+    def get_header(self, ordinal):
+        """ Return every field of the block with a given ordinal except its
+        annexe, or None if there isn't one. """
+        result = \
+            self.connection.execute(
+                SELECT_HEADER_QUERY, (ordinal,)
+            ).fetchone()
+        return result
+
+    def get_annexe(self, ordinal):
+        """ Return the annexe of the block with a given ordinal, or None if
+        there isn't one. """
+        row = \
+            self.connection.execute(
+                SELECT_ANNEXE_QUERY, (ordinal,)
+            ).fetchone()
+        if not row:
+            return None
+        result = row[ANNEXE_COLUMN]
+        return result
+
+    def get_by_hash(self, hash_str):
+        """ Return every field except the annexe of the block with a given
+        hash, or None if there isn't one. """
+        result = \
+            self.connection.execute(
+                SELECT_HEADER_BY_HASH_QUERY, (hash_str,)
+            ).fetchone()
+        return result
+
+    def list_between(
+            self,
+            date_from,
+            date_to,
+            after_ordinal=None,
+            limit=DEFAULT_PAGE_SIZE
+        ):
+        """ Return a page of summaries of the blocks dated from date_from to
+        date_to inclusive, in date order, then ordinal order. For the next
+        page, pass the ordinal of the last block in this one. """
+        # Ordinals start at 1, so this takes in all of date_from.
+        after = (date_from.year, date_from.month, date_from.day, 0)
+        if after_ordinal:
+            header = self.get_header(after_ordinal)
+            if not header:
+                raise LedgerError("No block with ordinal: "+str(after_ordinal))
+            after = max(
+                after,
+                (
+                    header[YEAR_COLUMN],
+                    header[MONTH_COLUMN],
+                    header[DAY_COLUMN],
+                    after_ordinal
+                )
+            )
+        parameters = \
+            after+(date_to.year, date_to.month, date_to.day, limit)
+        result = \
+            self.connection.execute(
+                SELECT_BETWEEN_QUERY, parameters
+            ).fetchall()
+        return result
+
+    def list_by_type(
+            self,
+            ordinance_type,
+            after_ordinal=None,
+            limit=DEFAULT_PAGE_SIZE
+        ):
+        """ Return a page of summaries of the blocks of a given type, in
+        ordinal order. For the next page, pass the ordinal of the last block
+        in this one. """
+        result = \
+            self.connection.execute(
+                SELECT_BY_TYPE_QUERY,
+                (ordinance_type, after_ordinal or 0, limit)
+            ).fetchall()
+        return result
+
+    def generate_blocks(self, headers_only=False, after_ordinal=0):
+        """ Yield every block - or, optionally, every header - in ordinal
+        order, starting after a given ordinal. """
+        if headers_only:
+            query = SELECT_ALL_HEADERS_QUERY
+        else:
+            query = SELECT_ALL_BLOCKS_QUERY
+        yield from self.connection.execute(query, (after_ordinal,))
+
+    def append(self, ordinance, deduplicate_annexe=False):
+        """ Add a block, constructed from a given ordinance object, to the
+        ledger. If deduplicate_annexe is set, the annexe goes into the Annexe
+        table, keyed by its SHA256 digest, rather than inline. Either way, the
+        block - and so its hash - is the same. """
+        values = {
+            attribute: getattr(ordinance, attribute)
+            for attribute in BLOCK_ATTRIBUTES
+        }
+        values[ANNEXE_DIGEST_COLUMN] = None
+        if values[STAMP_SCHEME_COLUMN] is None:
+            values[STAMP_SCHEME_COLUMN] = STAMP_SCHEME_RSA_PSS
+        with self.transaction():
+            if ordinance.annexe:
+                digest = \
+                    ordinance.annexe_digest or \
+                    hashlib.sha256(ordinance.annexe).hexdigest()
+                values[ANNEXE_DIGEST_COLUMN] = digest
+                if deduplicate_annexe:
+                    self.connection.execute(
+                        INSERT_ANNEXE_QUERY, (digest, ordinance.annexe)
+                    )
+                    values[ANNEXE_COLUMN] = None
+            self.connection.execute(INSERT_BLOCK_QUERY, values)
+            if self.has_search_index:
+                self.connection.execute(
+                    INSERT_SEARCH_ENTRY_QUERY,
+                    (
+                        ordinance.ordinal,
+                        ordinance.latex,
+                        ordinance.ordinance_type,
+                        format_date(
+                            ordinance.year, ordinance.month_num, ordinance.day
+                        )
+                    )
+                )
+
+    def get_hashes(self, first_ordinal, last_ordinal):
+        """ Return the hashes of the blocks from first_ordinal to last_ordinal
+        inclusive, in ordinal order. """
+        cursor = \
+            self.connection.execute(
+                SELECT_HASHES_QUERY, (first_ordinal, last_ordinal)
+            )
+        result = [row[HASH_COLUMN] for row in cursor]
+        return result
+
+    def get_checkpoint(self, ordinal):
+        """ Return the checkpoint covering the block with a given ordinal, or
+        None if there isn't one. """
+        result = \
+            self.connection.execute(
+                SELECT_CHECKPOINT_QUERY, (ordinal,)
+            ).fetchone()
+        if result and result[FIRST_ORDINAL_COLUMN] > ordinal:
+            return None
+        return result
+
+    def last_checkpoint(self):
+        """ Return the latest checkpoint, or None if there isn't one. """
+        result = \
+            self.connection.execute(SELECT_LAST_CHECKPOINT_QUERY).fetchone()
+        return result
+
+    def generate_checkpoints(self):
+        """ Yield every checkpoint, in ordinal order. """
+        yield from self.connection.execute(SELECT_ALL_CHECKPOINTS_QUERY)
+
+    def append_checkpoint(self, checkpoint):
+        """ Add a checkpoint, constructed from a given object, to the
+        ledger. """
+        values = {
+            column: getattr(checkpoint, column)
+            for column in CHECKPOINT_COLUMNS
+        }
+        with self.transaction():
+            self.connection.execute(INSERT_CHECKPOINT_QUERY, values)
+
+    def search(self, query, page=1, page_size=DEFAULT_PAGE_SIZE):
+        """ Return one page of the blocks matching a given FTS5 query, best
+        match first, each with its ordinal, type, date, LaTeX and rank, but
+        never its annexe. """
+        if not self.has_search_index:
+            raise LedgerError("This build of SQLite has no full-text search.")
+        if page < 1 or page_size < 1:
+            raise LedgerError(
+                "Invalid page: "+str(page)+" of size "+str(page_size)
+            )
+        try:
+            result = \
+                self.connection.execute(
+                    SEARCH_QUERY, (query, page_size, (page-1)*page_size)
+                ).fetchall()
+        except sqlite3.OperationalError as my_exception:
+            raise LedgerError(
+                "Invalid search query: "+query+" ("+str(my_exception)+")"
+            ) from my_exception
+        return result
+
+    def rebuild_search_index(self):
+        """ Refill the full-text search index from scratch, returning the
+        number of blocks indexed. """
+        if not self.has_search_index:
+            raise LedgerError("This build of SQLite has no full-text search.")
+        with self.transaction():
+            self.connection.execute(CLEAR_SEARCH_TABLE_QUERY)
+            result = \
+                self.connection.execute(FILL_SEARCH_TABLE_QUERY).rowcount
+        return result
+
+    def deduplicate_annexes(self):
+        """ Move every annexe still stored inline into the Annexe table,
+        returning the number of blocks changed. Run VACUUM afterwards to give
+        the space back. """
+        result = 0
+        with self.transaction():
+            rows = \
+                self.connection.execute(
+                    SELECT_INLINE_ANNEXE_ORDINALS_QUERY
+                ).fetchall()
+            # One annexe at a time, so as never to hold more than one in
+            # memory.
+            for row in rows:
+                ordinal = row[ORDINAL_COLUMN]
+                annexe = self.get_annexe(ordinal)
+                digest = hashlib.sha256(annexe).hexdigest()
+                self.connection.execute(INSERT_ANNEXE_QUERY, (digest, annexe))
+                self.connection.execute(MOVE_ANNEXE_QUERY, (digest, ordinal))
+                result += 1
+        return result
+
+################################
+# HELPER CLASSES AND FUNCTIONS #
+################################
+
+class LedgerError(Exception):
+    """ A custom exception. """
+
+def format_date(year, month_num, day):
+    """ Format a date as the search index does, e.g. "2000-01-31". """
+    result = \
+        str(year).zfill(4)+"-"+str(month_num).zfill(2)+"-"+str(day).zfill(2)
+    return result
+
+def get_file_id(path):
+    """ Get a tuple which identifies the file at a given path. """
+    stat_result = os.stat(path)
+    result = (stat_result.st_dev, stat_result.st_ino)
+    return result
+
+def get_ledger(path_to_ledger=DEFAULT_PATH_TO_LEDGER):
+    """ Get this thread's ledger object for a given path, making a new one if
+    there isn't one, or if the old one has gone stale. """
+    if not hasattr(local_ledgers, "by_path"):
+        local_ledgers.by_path = {}
+    result = local_ledgers.by_path.get(path_to_ledger)
+    if result is None or result.is_stale():
+        if result is not None and result.process_id == os.getpid():
+            result.close()
+        result = Ledger(path_to_ledger=path_to_ledger)
+        local_ledgers.by_path[path_to_ledger] = result
+    return result
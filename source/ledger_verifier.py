@@ -0,0 +1,323 @@
+"""
+This code defines a class which verifies the whole of the ledger: every
+block's hash, every "prev" link and every stamp - or, given the state saved
+by a previous audit, every block appended since.
+"""
+
+# Standard imports.
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+
+# Local imports.
+from .audit_state import (
+    INITIAL_DIGEST,
+    AuditState,
+    get_key_fingerprint,
+    update_rolling_digest
+)
+from .configs import (
+    DEFAULT_PATH_TO_LEDGER,
+    DEFAULT_PATH_TO_PUBLIC_KEY,
+    ORDINAL_COLUMN,
+    HASH_COLUMN,
+    PREV_COLUMN,
+    STAMP_COLUMN,
+    STAMP_SCHEME_COLUMN,
+    GENESIS_KEY
+)
+from .key_registry import get_verifier
+from .ledger import Ledger
+from .ordinance import Ordinance
+from .utils import HashSchemeError, get_hash_of_ordinance
+
+# Local constants.
+DEFAULT_CHUNK_SIZE = 256
+# Reasons.
+BAD_ORDINAL_REASON = "ordinal is out of sequence"
+BAD_PREV_REASON = "\"prev\" does not match previous hash"
+BAD_GENESIS_REASON = "block with ordinal 1 should be the genesis block"
+BAD_HASH_REASON = "hash does not match data"
+BAD_HASH_SCHEME_REASON = "hash scheme is unknown"
+BAD_STAMP_REASON = "stamp cannot be verified against hash"
+
+# Set in each worker process by initialise_worker().
+worker_verifier = None
+
+################
+# MAIN CLASSES #
+################
+
+@dataclass
+class LedgerVerificationReport:
+    """ A class which holds the results of verifying a ledger. """
+    # Object attributes.
+    blocks_checked: int = 0
+    failures: dict = None # Maps each bad ordinal to a list of reasons.
+    resumed_after_ordinal: int = None # Set if an earlier audit was resumed.
+    history_changed: bool = False # Whether audited blocks have changed.
+
+    def __post_init__(self):
+        if self.failures is None:
+            self.failures = {}
+
+    def add_failure(self, ordinal, reason):
+        """ Record that a given block failed a given check. """
+        self.failures.setdefault(ordinal, []).append(reason)
+
+    @property
+    def bad_ordinals(self):
+        """ Ronseal. """
+        result = sorted(self.failures)
+        return result
+
+    @property
+    def first_bad_ordinal(self):
+        """ Ronseal. """
+        if not self.failures:
+            return None
+        result = min(self.failures)
+        return result
+
+    @property
+    def verified(self):
+        """ Decide whether the whole ledger passed. """
+        result = not self.failures and not self.history_changed
+        return result
+
+    def to_dict(self):
+        """ Convert this object into a JSON-friendly dictionary. """
+        result = {
+            "verified": self.verified,
+            "blocks_checked": self.blocks_checked,
+            "resumed_after_ordinal": self.resumed_after_ordinal,
+            "history_changed": self.history_changed,
+            "first_bad_ordinal": self.first_bad_ordinal,
+            "bad_ordinals": self.bad_ordinals,
+            "failures": {
+                str(ordinal): self.failures[ordinal]
+                for ordinal in self.bad_ordinals
+            }
+        }
+        return result
+
+    def to_json(self):
+        """ Ronseal. """
+        result = json.dumps(self.to_dict(), indent=4)
+        return result
+
+@dataclass
+class LedgerVerifier:
+    """ The class in question. The blocks are streamed in ordinal order, and
+    the hashes and links are checked as they come in, while the stamps - by
+    far the most expensive check - are farmed out to a pool of processes, in
+    chunks.
+
+    If a path to an audit state file is given, the audit picks up after the
+    last block verified by the previous one, provided that the public key is
+    the same, and that none of the blocks already verified has changed since;
+    otherwise, it starts from the beginning. Either way, if the ledger
+    passes, the state is brought up to date. """
+    # Object attributes.
+    path_to_ledger: str = DEFAULT_PATH_TO_LEDGER
+    path_to_public_key: str = DEFAULT_PATH_TO_PUBLIC_KEY
+    jobs: int = None # Defaults to the number of CPUs.
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+    path_to_audit_state: str = None # If None, always audit everything.
+    full: bool = False # Whether to ignore any saved state.
+    report: LedgerVerificationReport = None
+    tip: dict = None # The ordinal and hash of the last block checked.
+    rolling_digest: str = INITIAL_DIGEST
+
+    def __post_init__(self):
+        if not self.jobs:
+            self.jobs = os.cpu_count() or 1
+
+    def generate_blocks(self, headers_only=False, after_ordinal=0):
+        """ Yield each block in the ledger, in ordinal order, starting after a
+        given ordinal. """
+        ledger = Ledger(path_to_ledger=self.path_to_ledger)
+        try:
+            yield from \
+                ledger.generate_blocks(
+                    headers_only=headers_only, after_ordinal=after_ordinal
+                )
+        finally:
+            ledger.close()
+
+    def load_audit_state(self):
+        """ Load the saved audit state, if there is any, and if it was made
+        for this ledger with this public key. """
+        if not self.path_to_audit_state or self.full:
+            return None
+        result = AuditState.load(self.path_to_audit_state)
+        if (
+            not result or
+            result.path_to_ledger != os.path.realpath(self.path_to_ledger) or
+            result.key_fingerprint !=
+            get_key_fingerprint(self.path_to_public_key)
+        ):
+            return None
+        return result
+
+    def check_history(self, audit_state):
+        """ Decide whether the blocks verified by the previous audit are as
+        they were, by recomputing the rolling digest over their headers. This
+        reads every header, but checks no hashes or stamps. """
+        rolling_digest = INITIAL_DIGEST
+        for header in self.generate_blocks(headers_only=True):
+            if header[ORDINAL_COLUMN] > audit_state.last_ordinal:
+                break
+            rolling_digest = update_rolling_digest(rolling_digest, header)
+        result = (rolling_digest == audit_state.rolling_digest)
+        return result
+
+    def resume(self):
+        """ Pick up where the previous audit left off, if we can. """
+        self.tip = None
+        self.rolling_digest = INITIAL_DIGEST
+        audit_state = self.load_audit_state()
+        if not audit_state:
+            return
+        if not self.check_history(audit_state):
+            self.report.history_changed = True
+            return
+        self.tip = {
+            ORDINAL_COLUMN: audit_state.last_ordinal,
+            HASH_COLUMN: audit_state.last_hash
+        }
+        self.rolling_digest = audit_state.rolling_digest
+        self.report.resumed_after_ordinal = audit_state.last_ordinal
+
+    def save_audit_state(self):
+        """ Record how far the ledger has now been verified. """
+        audit_state = \
+            AuditState(
+                path_to_ledger=os.path.realpath(self.path_to_ledger),
+                key_fingerprint=get_key_fingerprint(self.path_to_public_key),
+                last_ordinal=self.tip[ORDINAL_COLUMN],
+                last_hash=self.tip[HASH_COLUMN],
+                rolling_digest=self.rolling_digest
+            )
+        audit_state.save(self.path_to_audit_state)
+
+    def check_block(self, block, prev_block):
+        """ Run the cheap checks on a given block, i.e. everything except the
+        stamp. """
+        ordinal = block[ORDINAL_COLUMN]
+        if prev_block is None:
+            if ordinal != 1:
+                self.report.add_failure(ordinal, BAD_ORDINAL_REASON)
+            elif block[PREV_COLUMN] != GENESIS_KEY:
+                self.report.add_failure(ordinal, BAD_GENESIS_REASON)
+        else:
+            if ordinal != prev_block[ORDINAL_COLUMN]+1:
+                self.report.add_failure(ordinal, BAD_ORDINAL_REASON)
+            if block[PREV_COLUMN] != prev_block[HASH_COLUMN]:
+                self.report.add_failure(ordinal, BAD_PREV_REASON)
+        ordinance = Ordinance()
+        ordinance.load_from_block(block)
+        try:
+            if get_hash_of_ordinance(ordinance) != block[HASH_COLUMN]:
+                self.report.add_failure(ordinal, BAD_HASH_REASON)
+        except HashSchemeError:
+            self.report.add_failure(ordinal, BAD_HASH_SCHEME_REASON)
+
+    def generate_chunks(self):
+        """ Check each block, and yield chunks of (ordinal, hash, stamp, stamp
+        scheme) tuples, ready for their stamps to be checked. """
+        chunk = []
+        after_ordinal = self.tip[ORDINAL_COLUMN] if self.tip else 0
+        for block in self.generate_blocks(after_ordinal=after_ordinal):
+            self.check_block(block, self.tip)
+            self.rolling_digest = \
+                update_rolling_digest(self.rolling_digest, block)
+            self.report.blocks_checked += 1
+            chunk.append(
+                (
+                    block[ORDINAL_COLUMN],
+                    block[HASH_COLUMN],
+                    block[STAMP_COLUMN],
+                    block.get(STAMP_SCHEME_COLUMN)
+                )
+            )
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+            # Keep only what the next iteration needs, so as not to hold on
+            # to a potentially large annexe.
+            self.tip = {
+                ORDINAL_COLUMN: block[ORDINAL_COLUMN],
+                HASH_COLUMN: block[HASH_COLUMN]
+            }
+        if chunk:
+            yield chunk
+
+    def record_bad_stamps(self, bad_ordinals):
+        """ Ronseal. """
+        for ordinal in bad_ordinals:
+            self.report.add_failure(ordinal, BAD_STAMP_REASON)
+
+    def verify_serially(self):
+        """ Check all the stamps in this process. """
+        initialise_worker(self.path_to_public_key)
+        for chunk in self.generate_chunks():
+            self.record_bad_stamps(verify_stamps(chunk))
+
+    def verify_in_parallel(self):
+        """ Check all the stamps using a pool of processes, keeping only a
+        bounded number of chunks in flight at any one time. """
+        max_in_flight = 2*self.jobs
+        with ProcessPoolExecutor(
+            max_workers=self.jobs,
+            initializer=initialise_worker,
+            initargs=(self.path_to_public_key,)
+        ) as executor:
+            in_flight = set()
+            for chunk in self.generate_chunks():
+                if len(in_flight) >= max_in_flight:
+                    done, in_flight = \
+                        wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self.record_bad_stamps(future.result())
+                in_flight.add(executor.submit(verify_stamps, chunk))
+            for future in in_flight:
+                self.record_bad_stamps(future.result())
+
+    def verify(self):
+        """ Carry out all the checks, and return the report. """
+        self.report = LedgerVerificationReport()
+        self.resume()
+        if self.jobs == 1:
+            self.verify_serially()
+        else:
+            self.verify_in_parallel()
+        if self.path_to_audit_state and self.report.verified and self.tip:
+            self.save_audit_state()
+        return self.report
+
+####################
+# HELPER FUNCTIONS #
+####################
+
+def initialise_worker(path_to_public_key):
+    """ Load the public key once per worker process. """
+    global worker_verifier # pylint: disable=global-statement
+    worker_verifier = get_verifier(path_to_public_key=path_to_public_key)
+
+def verify_stamps(chunk):
+    """ Verify the stamps in a chunk of (ordinal, hash, stamp, stamp scheme)
+    tuples, and return the ordinals of those which fail. """
+    result = []
+    for ordinal, hash_str, stamp, stamp_scheme in chunk:
+        try:
+            verified = \
+                worker_verifier.verify(
+                    hash_str, stamp, stamp_scheme=stamp_scheme
+                )
+        except ValueError:
+            verified = False
+        if not verified:
+            result.append(ordinal)
+    return result
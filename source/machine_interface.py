@@ -7,30 +7,108 @@ interface for rest of the codebase.
 import json
 
 # Local imports.
-from .configs import DEFAULT_PATH_TO_PUBLIC_KEY
+from .bulk_pdf_verifier import BulkPDFVerifier, generate_paths_to_pdfs
+from .checkpoints import (
+    InclusionProof,
+    make_checkpoints,
+    make_inclusion_proof
+)
+from .configs import (
+    DEFAULT_CHECKPOINT_INTERVAL,
+    DEFAULT_PATH_TO_LEDGER,
+    DEFAULT_PATH_TO_PDF_CACHE,
+    DEFAULT_PATH_TO_PRIVATE_KEY,
+    DEFAULT_PATH_TO_PUBLIC_KEY
+)
 from .extractor import Extractor
+from .key_registry import get_stamp_machine, get_verifier
+from .ledger import DEFAULT_PAGE_SIZE, get_ledger
+from .ledger_verifier import LedgerVerifier
 from .ordinance import Ordinance
+from .pdf_cache import PDFCache
 from .pdf_verifier import PDFVerifier
-from .uploader import Uploader
+from .range_extractor import RangeExtractor
+from .uploader import BatchUploader, Uploader
 
 #############
 # FUNCTIONS #
 #############
 
-def upload_ordinance_from_input_file(path_to_input_file):
-    """ Ronseal. """
+def upload_ordinance_from_input_file(
+        path_to_input_file,
+        deduplicate_annexe=False,
+        checkpoint_interval=None
+    ):
+    """ Ronseal. Returns the new block's ordinal. """
     with open(path_to_input_file, "r") as input_file:
         input_dict = json.loads(input_file.read())
     ordinance = Ordinance(**input_dict)
-    uploader = Uploader(ordinance=ordinance)
+    uploader = \
+        Uploader(
+            ordinance=ordinance,
+            ledger=get_ledger(),
+            deduplicate_annexe=deduplicate_annexe,
+            checkpoint_interval=checkpoint_interval
+        )
     uploader.upload()
+    result = ordinance.ordinal
+    return result
+
+def upload_ordinances_from_batch_file(
+        path_to_batch_file,
+        commit_group_size=None,
+        deduplicate_annexe=False,
+        checkpoint_interval=None
+    ):
+    """ Upload many ordinances from a JSONL file, i.e. one with a JSON object
+    on each line. Returns the ordinals of the new blocks. """
+    def generate_ordinances(batch_file):
+        for line in batch_file:
+            if line.strip():
+                yield Ordinance(**json.loads(line))
+    with open(path_to_batch_file, "r") as batch_file:
+        uploader = \
+            BatchUploader(
+                ordinances=generate_ordinances(batch_file),
+                ledger=get_ledger(),
+                commit_group_size=commit_group_size,
+                deduplicate_annexe=deduplicate_annexe,
+                checkpoint_interval=checkpoint_interval
+            )
+        result = uploader.upload()
+    return result
 
-def extract_ordinance_with_ordinal(ordinal):
+def extract_ordinance_with_ordinal(ordinal, use_pdf_cache=True):
     """ Ronseal. """
-    extractor = Extractor(ordinal=ordinal)
+    pdf_cache = None
+    if use_pdf_cache:
+        pdf_cache = PDFCache()
+    extractor = \
+        Extractor(ordinal=ordinal, ledger=get_ledger(), pdf_cache=pdf_cache)
     result = extractor.extract()
     return result
 
+def extract_ordinances_in_range(
+        first_ordinal,
+        last_ordinal,
+        jobs=None,
+        use_pdf_cache=True
+    ):
+    """ Extract every ordinance from first_ordinal to last_ordinal inclusive,
+    using a pool of processes, and return a report object. """
+    path_to_pdf_cache = None
+    if use_pdf_cache:
+        path_to_pdf_cache = DEFAULT_PATH_TO_PDF_CACHE
+    range_extractor = \
+        RangeExtractor(
+            first_ordinal=first_ordinal,
+            last_ordinal=last_ordinal,
+            jobs=jobs,
+            path_to_pdf_cache=path_to_pdf_cache
+        )
+    result = range_extractor.extract()
+    return result
+
 def verify_pdf(path_to_pdf, path_to_public_key=DEFAULT_PATH_TO_PUBLIC_KEY):
     """ Ronseal. """
     document_verifier = \
@@ -40,3 +118,138 @@ def verify_pdf(path_to_pdf, path_to_public_key=DEFAULT_PATH_TO_PUBLIC_KEY):
         )
     result = document_verifier.verify()
     return result
+
+def verify_pdfs_in_directory(
+        path_to_dir,
+        path_to_public_key=DEFAULT_PATH_TO_PUBLIC_KEY,
+        jobs=None
+    ):
+    """ Verify every PDF in a given directory, or in any directory within it,
+    yielding a result object for each as soon as it has been checked. """
+    bulk_verifier = \
+        BulkPDFVerifier(
+            paths_to_pdfs=generate_paths_to_pdfs(path_to_dir),
+            path_to_public_key=path_to_public_key,
+            jobs=jobs
+        )
+    yield from bulk_verifier.generate_results()
+
+def verify_ledger(
+        path_to_ledger=DEFAULT_PATH_TO_LEDGER,
+        path_to_public_key=DEFAULT_PATH_TO_PUBLIC_KEY,
+        jobs=None,
+        path_to_audit_state=None,
+        full=False
+    ):
+    """ Verify every block in the ledger - or, given the path to an audit
+    state file, every block since the last audit - returning a report
+    object. """
+    ledger_verifier = \
+        LedgerVerifier(
+            path_to_ledger=path_to_ledger,
+            path_to_public_key=path_to_public_key,
+            jobs=jobs,
+            path_to_audit_state=path_to_audit_state,
+            full=full
+        )
+    result = ledger_verifier.verify()
+    return result
+
+def deduplicate_annexes(path_to_ledger=DEFAULT_PATH_TO_LEDGER, vacuum=True):
+    """ Move any annexes stored inline into the content-addressed store,
+    returning the number of blocks changed. """
+    ledger = get_ledger(path_to_ledger)
+    result = ledger.deduplicate_annexes()
+    if vacuum:
+        ledger.connection.execute("VACUUM;")
+    return result
+
+def checkpoint_ledger(
+        interval=DEFAULT_CHECKPOINT_INTERVAL,
+        path_to_ledger=DEFAULT_PATH_TO_LEDGER,
+        path_to_private_key=DEFAULT_PATH_TO_PRIVATE_KEY,
+        password=None
+    ):
+    """ Add a stamped checkpoint for every complete run of a given number of
+    blocks since the last checkpoint, returning the new checkpoints. """
+    stamp_machine = \
+        get_stamp_machine(
+            path_to_private_key=path_to_private_key,
+            password=password
+        )
+    result = \
+        make_checkpoints(get_ledger(path_to_ledger), stamp_machine, interval)
+    return result
+
+def prove_ordinance(ordinal, path_to_ledger=DEFAULT_PATH_TO_LEDGER):
+    """ Make the inclusion proof for the block with a given ordinal. """
+    result = make_inclusion_proof(get_ledger(path_to_ledger), ordinal)
+    return result
+
+def check_ordinance_proof(
+        path_to_proof,
+        path_to_public_key=DEFAULT_PATH_TO_PUBLIC_KEY,
+        expected_hash=None
+    ):
+    """ Check the inclusion proof in a given JSON file - and, optionally,
+    that it is a proof for the block with a given hash. """
+    with open(path_to_proof, "r") as proof_file:
+        proof = InclusionProof.from_json(proof_file.read())
+    if expected_hash and proof.hash != expected_hash:
+        return False
+    verifier = get_verifier(path_to_public_key=path_to_public_key)
+    result = proof.verify(verifier)
+    return result
+
+def search_ordinances(
+        query,
+        page=1,
+        page_size=DEFAULT_PAGE_SIZE,
+        path_to_ledger=DEFAULT_PATH_TO_LEDGER
+    ):
+    """ Return one page of the ordinances matching a given full-text query,
+    best match first. """
+    ledger = get_ledger(path_to_ledger)
+    result = ledger.search(query, page=page, page_size=page_size)
+    return result
+
+def rebuild_search_index(path_to_ledger=DEFAULT_PATH_TO_LEDGER):
+    """ Refill the full-text search index, returning the number of
+    ordinances indexed. """
+    ledger = get_ledger(path_to_ledger)
+    result = ledger.rebuild_search_index()
+    return result
+
+def get_ordinance_by_hash(hash_str, path_to_ledger=DEFAULT_PATH_TO_LEDGER):
+    """ Return the header of the block with a given hash, or None if there
+    isn't one in the ledger. """
+    result = get_ledger(path_to_ledger).get_by_hash(hash_str)
+    return result
+
+def list_ordinances_between(
+        date_from,
+        date_to,
+        after_ordinal=None,
+        limit=DEFAULT_PAGE_SIZE,
+        path_to_ledger=DEFAULT_PATH_TO_LEDGER
+    ):
+    """ Return a page of the ordinances dated from date_from to date_to
+    inclusive. """
+    result = \
+        get_ledger(path_to_ledger).list_between(
+            date_from, date_to, after_ordinal=after_ordinal, limit=limit
+        )
+    return result
+
+def list_ordinances_by_type(
+        ordinance_type,
+        after_ordinal=None,
+        limit=DEFAULT_PAGE_SIZE,
+        path_to_ledger=DEFAULT_PATH_TO_LEDGER
+    ):
+    """ Return a page of the ordinances of a given type. """
+    result = \
+        get_ledger(path_to_ledger).list_by_type(
+            ordinance_type, after_ordinal=after_ordinal, limit=limit
+        )
+    return result
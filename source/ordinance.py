@@ -3,14 +3,46 @@ This code defines a class which models the properties of an ordinance.
 """
 
 # Standard imports.
+import hashlib
+import os
 import shutil
+import zipfile
 from dataclasses import dataclass
 from pathlib import Path
+from tempfile import SpooledTemporaryFile
 
 # Local imports.
-from .configs import ANNEXE, ARCHIVE_FN, COMPRESSION_FORMAT
+from .configs import (
+    ORDINAL_COLUMN,
+    ORDINANCE_TYPE_COLUMN,
+    LATEX_COLUMN,
+    DAY_COLUMN,
+    MONTH_COLUMN,
+    YEAR_COLUMN,
+    HASH_COLUMN,
+    PREV_COLUMN,
+    ANNEXE_COLUMN,
+    STAMP_COLUMN,
+    HASH_SCHEME_COLUMN,
+    HASH_SCHEME_V1,
+    STAMP_SCHEME_COLUMN,
+    STAMP_SCHEME_RSA_PSS,
+    ANNEXE_DIGEST_COLUMN,
+    METADATA_FORMAT_V1,
+    METADATA_FORMAT_V2
+)
+from .pdf_info import get_embedded_stream, read_trailer
 from .utils import trim_brackets, trim_and_cast_hex, cast_pdf_int
 
+# Local constants.
+ANNEXE_SPOOL_SIZE = 16*1024*1024 # Bigger archives are spooled to disk.
+CHUNK_SIZE = 1024*1024
+# Fixing the timestamps and permissions of each entry, and the order in which
+# they appear, means that the same folder always zips to the same bytes.
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+ZIP_FILE_ATTRIBUTES = 0o100644 << 16
+ZIP_DIRECTORY_ATTRIBUTES = (0o40755 << 16) | 0x10
+
 ##############
 # MAIN CLASS #
 ##############
@@ -26,19 +58,20 @@ class Ordinance:
     month_num: int = None
     day: int = None
     annexe_path: str = None # A path to a folder of annexe data.
-    annexe: bytes = None
+    annexe: bytes = None # Or, if loaded from a PDF, an EmbeddedStream.
+    annexe_digest: str = None # The SHA256 hex digest of the annexe.
     prev: str = None
     hash: str = None
+    hash_scheme: int = None # None means that one has yet to be chosen.
     stamp: str = None
-    clean_flag: bool = True
+    stamp_scheme: int = None # Set along with the stamp.
 
     def __post_init__(self):
         self.update_annexe()
-        if self.clean_flag:
-            self.clean()
 
     def load_from_trailer(self, trailer):
-        """ Fill the attributes of this object using a trailer object. """
+        """ Fill the attributes of this object using a trailer object, i.e.
+        either a pdfrw trailer or a LightTrailer. """
         try:
             self.ordinal = cast_pdf_int(trailer.Info.data_ordinal)
             self.ordinance_type = \
@@ -48,41 +81,129 @@ class Ordinance:
             self.month_num = cast_pdf_int(trailer.Info.data_month)
             self.day = cast_pdf_int(trailer.Info.data_day)
             self.prev = trim_brackets(trailer.Info.data_prev)
-            self.annexe = trim_and_cast_hex(trailer.Info.data_annexe)
+            self.annexe = load_annexe_from_info(trailer.Info)
+            self.hash_scheme = \
+                cast_pdf_int(trailer.Info.data_hash_scheme) or HASH_SCHEME_V1
+            self.stamp_scheme = \
+                cast_pdf_int(trailer.Info.stamp_scheme) or STAMP_SCHEME_RSA_PSS
         except Exception as my_exception:
             message = "Error loading metadata: "+str(my_exception)
             raise OrdinanceError(message) from my_exception
 
+    def load_from_pdf(self, path_to_pdf):
+        """ Fill the attributes of this object using the metadata of the PDF
+        at a given path, reading no more of it than we have to. """
+        self.load_from_trailer(read_trailer(path_to_pdf))
+
+    def load_from_block(self, block):
+        """ Fill the attributes of this object using a row from the Block
+        table, given as a dictionary. """
+        self.ordinal = block[ORDINAL_COLUMN]
+        self.ordinance_type = block[ORDINANCE_TYPE_COLUMN]
+        self.latex = block[LATEX_COLUMN]
+        self.year = block[YEAR_COLUMN]
+        self.month_num = block[MONTH_COLUMN]
+        self.day = block[DAY_COLUMN]
+        self.annexe = block[ANNEXE_COLUMN]
+        self.prev = block[PREV_COLUMN]
+        self.hash = block[HASH_COLUMN]
+        self.stamp = block[STAMP_COLUMN]
+        self.annexe_digest = block.get(ANNEXE_DIGEST_COLUMN)
+        self.hash_scheme = block.get(HASH_SCHEME_COLUMN) or HASH_SCHEME_V1
+        self.stamp_scheme = \
+            block.get(STAMP_SCHEME_COLUMN) or STAMP_SCHEME_RSA_PSS
+
     def update_stamp(self, stamp_machine):
         """ Update the stamp attribute, in order to reflect a change in the
         hash attribute. """
         self.stamp = stamp_machine.make_stamp(self.hash)
-
-    def clean(self):
-        """ Clean up any temporary generated files. """
-        shutil.rmtree(ANNEXE, ignore_errors=True)
+        self.stamp_scheme = stamp_machine.stamp_scheme
 
     def update_annexe(self):
         """ Update the annexe attribute, on the basis of what's in the
-        annexe_path attribute. """
+        annexe_path attribute. The folder is zipped straight into a buffer -
+        spooled to disk if it gets big - and hashed as it goes. """
         if self.annexe or not self.annexe_path:
             return
-        # Copy the folder.
-        dest_folder_obj = Path(ANNEXE)
-        if dest_folder_obj.exists():
+        if not Path(self.annexe_path).is_dir():
             raise OrdinanceError(
-                "Annexe folder already exists at path: "+str(dest_folder_obj)
+                "No annexe folder at path: "+str(self.annexe_path)
             )
-        shutil.copytree(self.annexe_path, ANNEXE)
-        # Zip the folder.
-        shutil.make_archive(ANNEXE, COMPRESSION_FORMAT, ANNEXE)
-        # Read in the zip file as binary, and update the annexe attribute.
-        with open(ARCHIVE_FN, "rb") as archive_file:
-            self.annexe = archive_file.read()
+        with SpooledTemporaryFile(max_size=ANNEXE_SPOOL_SIZE) as buffer:
+            hashing_writer = HashingWriter(buffer)
+            with zipfile.ZipFile(
+                hashing_writer, "w", compression=zipfile.ZIP_DEFLATED
+            ) as archive:
+                write_folder_to_archive(self.annexe_path, archive)
+            buffer.seek(0)
+            self.annexe = buffer.read()
+        self.annexe_digest = hashing_writer.hash_maker.hexdigest()
 
-################
-# HELPER CLASS #
-################
+################################
+# HELPER CLASSES AND FUNCTIONS #
+################################
 
 class OrdinanceError(Exception):
     """ A custom exception. """
+
+class HashingWriter:
+    """ A write-only file-like object, which hashes whatever is written to it
+    on its way through to another file. It can't seek, so the zipfile module
+    never goes back to rewrite anything already hashed. """
+    def __init__(self, file):
+        self.file = file
+        self.hash_maker = hashlib.sha256()
+        self.position = 0
+
+    def write(self, data):
+        """ Ronseal. """
+        self.hash_maker.update(data)
+        self.position += len(data)
+        return self.file.write(data)
+
+    def tell(self):
+        """ Ronseal. """
+        return self.position
+
+    def flush(self):
+        """ Ronseal. """
+        self.file.flush()
+
+def write_folder_to_archive(path_to_folder, archive):
+    """ Write the contents of a folder into a zip archive, in a deterministic
+    order, and with fixed timestamps and permissions. """
+    for path_to_dir, dir_names, filenames in os.walk(path_to_folder):
+        dir_names.sort()
+        rel_path_obj = Path(path_to_dir).relative_to(path_to_folder)
+        if rel_path_obj != Path("."):
+            info = \
+                zipfile.ZipInfo(
+                    rel_path_obj.as_posix()+"/", date_time=ZIP_DATE_TIME
+                )
+            info.external_attr = ZIP_DIRECTORY_ATTRIBUTES
+            archive.writestr(info, b"")
+        for filename in sorted(filenames):
+            path_to_file = os.path.join(path_to_dir, filename)
+            info = \
+                zipfile.ZipInfo(
+                    (rel_path_obj/filename).as_posix(),
+                    date_time=ZIP_DATE_TIME
+                )
+            info.external_attr = ZIP_FILE_ATTRIBUTES
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.file_size = os.path.getsize(path_to_file)
+            with open(path_to_file, "rb") as source_file:
+                with archive.open(info, "w") as dest_file:
+                    shutil.copyfileobj(source_file, dest_file, CHUNK_SIZE)
+
+def load_annexe_from_info(info):
+    """ Load the annexe from an Info dictionary, in whichever format it was
+    written. """
+    metadata_format = cast_pdf_int(info.metadata_format) or METADATA_FORMAT_V1
+    if metadata_format == METADATA_FORMAT_V1:
+        return trim_and_cast_hex(info.data_annexe)
+    if metadata_format == METADATA_FORMAT_V2:
+        if info.data_annexe_file is None:
+            return None
+        return get_embedded_stream(info.data_annexe_file)
+    raise OrdinanceError("Unknown metadata format: "+str(metadata_format))
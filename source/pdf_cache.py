@@ -0,0 +1,145 @@
+"""
+This code defines a class which caches compiled PDFs on disk, keyed by a
+digest of everything which goes into compiling them, so that the same TeX
+need never be compiled twice.
+"""
+
+# Standard imports.
+import hashlib
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+# Local imports.
+from .configs import DEFAULT_PATH_TO_PDF_CACHE, ENCODING
+
+# Local constants.
+# Bump this whenever the way in which PDFs are compiled changes.
+CACHE_FORMAT_VERSION = b"chancery_b/pdf_cache/v1"
+DEFAULT_MAX_CACHE_BYTES = 1024*1024*1024
+CACHE_EXT = ".pdf"
+PATH_OBJ_TO_SOURCE = Path(__file__).parent
+ASSET_DIR_NAMES = ("tex", "images")
+
+##############
+# MAIN CLASS #
+##############
+
+@dataclass
+class PDFCache:
+    """ The class in question. Each entry's modification time is bumped
+    whenever it's used, so that eviction can drop the least recently used
+    entries first. """
+    # Object attributes.
+    path_to_cache: str = DEFAULT_PATH_TO_PDF_CACHE
+    max_bytes: int = DEFAULT_MAX_CACHE_BYTES
+    hits: int = 0
+    misses: int = 0
+
+    def __post_init__(self):
+        Path(self.path_to_cache).mkdir(parents=True, exist_ok=True)
+
+    def make_key(self, main_tex, latex_command):
+        """ Make the key for a given main.tex, compiled with a given
+        command. """
+        hash_maker = hashlib.sha256()
+        hash_maker.update(CACHE_FORMAT_VERSION)
+        hash_maker.update(bytes(get_assets_digest(), ENCODING))
+        hash_maker.update(bytes(latex_command, ENCODING))
+        hash_maker.update(bytes(main_tex, ENCODING))
+        result = hash_maker.hexdigest()
+        return result
+
+    def get_path_obj_to_entry(self, key):
+        """ Ronseal. """
+        result = Path(self.path_to_cache)/(key+CACHE_EXT)
+        return result
+
+    def fetch(self, key, path_to_dest):
+        """ Copy the PDF with a given key to a given path, if we have it,
+        and say whether we did. """
+        path_obj_to_entry = self.get_path_obj_to_entry(key)
+        try:
+            shutil.copyfile(path_obj_to_entry, path_to_dest)
+            os.utime(path_obj_to_entry)
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+        self.hits += 1
+        return True
+
+    def store(self, key, path_to_pdf):
+        """ Add a copy of a given PDF to the cache, and then make room. The
+        copy is moved into place in one go, so that other processes never
+        see half an entry. """
+        file_descriptor, path_to_temp = \
+            tempfile.mkstemp(dir=self.path_to_cache, suffix=".tmp")
+        os.close(file_descriptor)
+        try:
+            shutil.copyfile(path_to_pdf, path_to_temp)
+            os.replace(path_to_temp, self.get_path_obj_to_entry(key))
+        except BaseException:
+            Path(path_to_temp).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def get_entries(self):
+        """ Return a list of (mtime, size, path object) tuples, one for each
+        entry, least recently used first. """
+        result = []
+        for path_obj in Path(self.path_to_cache).glob("*"+CACHE_EXT):
+            try:
+                stat_result = path_obj.stat()
+            except FileNotFoundError:
+                continue # Evicted by another process.
+            result.append(
+                (stat_result.st_mtime_ns, stat_result.st_size, path_obj)
+            )
+        result.sort()
+        return result
+
+    def evict(self):
+        """ Delete the least recently used entries until the cache fits in
+        its budget. """
+        entries = self.get_entries()
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, path_obj in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            path_obj.unlink(missing_ok=True)
+            total_bytes -= size
+
+    def get_stats(self):
+        """ Return a dictionary of statistics about this cache. """
+        entries = self.get_entries()
+        result = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries)
+        }
+        return result
+
+####################
+# HELPER FUNCTIONS #
+####################
+
+@lru_cache(maxsize=None)
+def get_assets_digest():
+    """ Get a digest of the TeX templates and images, which could change what
+    pdflatex makes of a given main.tex. This is computed once per process. """
+    hash_maker = hashlib.sha256()
+    for dir_name in ASSET_DIR_NAMES:
+        path_obj_to_dir = PATH_OBJ_TO_SOURCE/dir_name
+        for path_obj in sorted(path_obj_to_dir.rglob("*")):
+            if path_obj.is_file():
+                relative_path = path_obj.relative_to(PATH_OBJ_TO_SOURCE)
+                hash_maker.update(
+                    bytes(relative_path.as_posix(), ENCODING)+b"\0"
+                )
+                hash_maker.update(path_obj.read_bytes())
+    result = hash_maker.hexdigest()
+    return result
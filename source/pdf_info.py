@@ -0,0 +1,446 @@
+"""
+This code defines a class which reads a PDF's trailer - and, in particular,
+its Info dictionary - without parsing the rest of the document. The file is
+memory-mapped and read from the end: "startxref", then the cross-reference
+table, then the trailer, then the Info object, if it's indirect.
+
+The values are returned as the raw tokens which pdfrw would give, brackets
+and all, so that the rest of the codebase can treat the result exactly like a
+pdfrw trailer - except for streams, which are returned as EmbeddedStream
+objects, and only read when they're needed. Anything this reader doesn't
+understand - cross-reference streams, say, or arrays within the Info
+dictionary - is handed over to pdfrw.
+"""
+
+# Standard imports.
+import mmap
+import re
+import zlib
+from collections import namedtuple
+from dataclasses import dataclass
+
+# Non-standard imports.
+from pdfrw import PdfReader
+
+# Local constants.
+TOKEN_ENCODING = "latin-1" # As used by pdfrw.
+STARTXREF_WINDOW = 1024 # How far from the end to look for "startxref".
+STARTXREF_KEYWORD = b"startxref"
+XREF_KEYWORD = b"xref"
+TRAILER_KEYWORD = b"trailer"
+IN_USE_FLAG = b"n"
+STREAM_KEYWORD = b"stream"
+FLATE_DECODE = "/FlateDecode"
+CHUNK_SIZE = 1024*1024
+# Regular expressions.
+WHITESPACE_CLASS = rb"[\x00\t\n\x0c\r ]"
+REGULAR_CLASS = rb"[^\x00\t\n\x0c\r ()<>\[\]{}/%]"
+WHITESPACE_PATTERN = re.compile(rb"(?:"+WHITESPACE_CLASS+rb"+|%[^\r\n]*)*")
+NAME_PATTERN = re.compile(rb"/"+REGULAR_CLASS+rb"*")
+REGULAR_PATTERN = re.compile(REGULAR_CLASS+rb"+")
+STRING_SPECIAL_PATTERN = re.compile(rb"[()\\]")
+INTEGER_PATTERN = re.compile(rb"\d+")
+OBJ_HEADER_PATTERN = \
+    re.compile(
+        WHITESPACE_CLASS+rb"*(\d+)"+WHITESPACE_CLASS+rb"+(\d+)"+
+        WHITESPACE_CLASS+rb"+obj"
+    )
+REFERENCE_PATTERN = \
+    re.compile(
+        rb"(\d+)"+WHITESPACE_CLASS+rb"+(\d+)"+WHITESPACE_CLASS+rb"+R"+
+        rb"(?!"+REGULAR_CLASS+rb")"
+    )
+
+# A reference to an indirect object.
+Reference = namedtuple("Reference", ("number", "generation"))
+
+################
+# MAIN CLASSES #
+################
+
+@dataclass
+class EmbeddedStream:
+    """ A class which represents a stream - e.g. an embedded file - which
+    may be Flate-compressed, and which is decoded a chunk at a time. The
+    encoded bytes are either read from the PDF itself, or held in memory. """
+    # Object attributes.
+    decoded_length: int = None # I.e. /DL, if given.
+    filter_name: str = None
+    path_to_pdf: str = None
+    offset: int = None
+    length: int = None
+    data: bytes = None
+
+    def __post_init__(self):
+        if self.filter_name not in (None, FLATE_DECODE):
+            raise PDFInfoError("Unsupported filter: "+str(self.filter_name))
+
+    def __len__(self):
+        if self.decoded_length is None:
+            self.decoded_length = \
+                sum(len(chunk) for chunk in self.generate_chunks())
+        return self.decoded_length
+
+    def generate_encoded_chunks(self):
+        """ Ronseal. """
+        if self.data is not None:
+            for start in range(0, len(self.data), CHUNK_SIZE):
+                yield self.data[start:start+CHUNK_SIZE]
+            return
+        with open(self.path_to_pdf, "rb") as pdf_file:
+            pdf_file.seek(self.offset)
+            remaining = self.length
+            while remaining > 0:
+                chunk = pdf_file.read(min(remaining, CHUNK_SIZE))
+                if not chunk:
+                    raise PDFInfoError("Stream runs past the end of the file.")
+                remaining -= len(chunk)
+                yield chunk
+
+    def generate_chunks(self):
+        """ Yield the decoded stream, in chunks of at most CHUNK_SIZE bytes,
+        checking, at the end, that we got as many bytes as /DL promised. """
+        if self.filter_name is None:
+            chunks = self.generate_encoded_chunks()
+        else:
+            chunks = self.generate_inflated_chunks()
+        decoded_length = 0
+        for chunk in chunks:
+            decoded_length += len(chunk)
+            yield chunk
+        if (
+            self.decoded_length is not None and
+            decoded_length != self.decoded_length
+        ):
+            raise PDFInfoError("Stream is not as long as /DL says.")
+
+    def generate_inflated_chunks(self):
+        """ Decompress the encoded chunks, never holding more than a chunk's
+        worth of output at once. """
+        decompressor = zlib.decompressobj()
+        try:
+            for encoded_chunk in self.generate_encoded_chunks():
+                while encoded_chunk:
+                    yield decompressor.decompress(encoded_chunk, CHUNK_SIZE)
+                    encoded_chunk = decompressor.unconsumed_tail
+            yield decompressor.flush()
+        except zlib.error as my_exception:
+            raise PDFInfoError(
+                "Bad compressed stream: "+str(my_exception)
+            ) from my_exception
+        if not decompressor.eof:
+            raise PDFInfoError("Compressed stream is truncated.")
+
+    def read(self):
+        """ Read the whole of the decoded stream into memory. """
+        result = b"".join(self.generate_chunks())
+        return result
+
+class InfoDict(dict):
+    """ A dictionary which, like pdfrw's, allows its keys to be read as
+    attributes, and gives None for any key it doesn't have. """
+    def __getattr__(self, key):
+        return self.get(key)
+
+@dataclass
+class LightTrailer:
+    """ A class which holds just the part of a trailer which we need. """
+    # Object attributes.
+    Info: InfoDict = None # pylint: disable=invalid-name
+
+@dataclass
+class TrailerReader:
+    """ The class in question. """
+    # Object attributes.
+    path_to_pdf: str
+    data: mmap.mmap = None
+    offsets: dict = None # Maps object numbers to their offsets.
+    next_xref_position: int = None # Of the next section not yet read.
+
+    def read(self):
+        """ Read the trailer, or raise a PDFInfoError if we can't. """
+        with open(self.path_to_pdf, "rb") as pdf_file:
+            try:
+                self.data = \
+                    mmap.mmap(pdf_file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as my_exception: # E.g. an empty file.
+                raise PDFInfoError(str(my_exception)) from my_exception
+        try:
+            result = self.read_trailer()
+        except (IndexError, ValueError) as my_exception:
+            raise PDFInfoError(
+                "Malformed trailer: "+str(my_exception)
+            ) from my_exception
+        finally:
+            self.data.close()
+            self.data = None
+        return result
+
+    def find_startxref(self):
+        """ Find the offset of the last cross-reference section. """
+        window_start = max(len(self.data)-STARTXREF_WINDOW, 0)
+        position = self.data.rfind(STARTXREF_KEYWORD, window_start)
+        if position < 0:
+            raise PDFInfoError("No startxref.")
+        position = self.skip_whitespace(position+len(STARTXREF_KEYWORD))
+        match = INTEGER_PATTERN.match(self.data, position)
+        if not match:
+            raise PDFInfoError("Bad startxref.")
+        result = int(match.group())
+        return result
+
+    def read_xref_section(self, position):
+        """ Read the classic cross-reference section at a given position into
+        the offsets dictionary, and return the dictionary of the trailer
+        which follows it. """
+        if self.data[position:position+len(XREF_KEYWORD)] != XREF_KEYWORD:
+            raise PDFInfoError("Not a classic cross-reference table.")
+        table_start = position+len(XREF_KEYWORD)
+        trailer_position = self.data.find(TRAILER_KEYWORD, table_start)
+        if trailer_position < 0:
+            raise PDFInfoError("No trailer.")
+        words = self.data[table_start:trailer_position].split()
+        index = 0
+        while index < len(words):
+            first_number, count = int(words[index]), int(words[index+1])
+            index += 2
+            for number in range(first_number, first_number+count):
+                offset, flag = words[index], words[index+2]
+                index += 3
+                # The newest section comes first, and takes precedence.
+                if flag == IN_USE_FLAG and number not in self.offsets:
+                    self.offsets[number] = int(offset)
+        result, _ = \
+            self.parse_object(
+                self.skip_whitespace(trailer_position+len(TRAILER_KEYWORD))
+            )
+        if not isinstance(result, dict):
+            raise PDFInfoError("Trailer is not a dictionary.")
+        self.next_xref_position = None
+        if "Prev" in result:
+            self.next_xref_position = int(result["Prev"])
+        return result
+
+    def read_trailer(self):
+        """ Read the trailer, and its Info dictionary, resolving any indirect
+        values in the latter. """
+        self.offsets = {}
+        trailer = self.read_xref_section(self.find_startxref())
+        info = trailer.get("Info")
+        if isinstance(info, Reference):
+            info, _ = self.read_indirect_object(info)
+        if info is None:
+            return LightTrailer()
+        if not isinstance(info, dict):
+            raise PDFInfoError("Info is not a dictionary.")
+        for key, value in info.items():
+            if isinstance(value, Reference):
+                info[key] = self.read_indirect_value(value)
+            elif not isinstance(value, str):
+                raise PDFInfoError("Info has a compound value.")
+        result = LightTrailer(Info=InfoDict(info))
+        return result
+
+    def find_offset(self, number):
+        """ Find the offset of the object with a given number, reading
+        earlier cross-reference sections, left by incremental updates, as
+        far as is necessary. """
+        positions_read = set()
+        while (
+            number not in self.offsets and
+            self.next_xref_position is not None
+        ):
+            if self.next_xref_position in positions_read:
+                raise PDFInfoError("Cross-reference sections form a loop.")
+            positions_read.add(self.next_xref_position)
+            self.read_xref_section(self.next_xref_position)
+        if number not in self.offsets:
+            raise PDFInfoError("No offset for object "+str(number))
+        return self.offsets[number]
+
+    def read_indirect_object(self, reference):
+        """ Read the object to which a given reference points, returning it
+        along with the position after it. """
+        match = \
+            OBJ_HEADER_PATTERN.match(
+                self.data, self.find_offset(reference.number)
+            )
+        if not match or int(match.group(1)) != reference.number:
+            raise PDFInfoError("Bad offset for object "+str(reference.number))
+        result = self.parse_object(self.skip_whitespace(match.end()))
+        return result
+
+    def read_indirect_value(self, reference):
+        """ Read a value within the Info dictionary to which a given
+        reference points: either a simple token or a stream. """
+        value, position = self.read_indirect_object(reference)
+        if isinstance(value, str):
+            return value
+        position = self.skip_whitespace(position)
+        if (
+            not isinstance(value, dict) or
+            self.data[position:position+len(STREAM_KEYWORD)] != STREAM_KEYWORD
+        ):
+            raise PDFInfoError("Info has a compound value.")
+        result = self.make_embedded_stream(value, position)
+        return result
+
+    def make_embedded_stream(self, stream_dict, position):
+        """ Make an object representing the stream whose "stream" keyword
+        is at a given position. """
+        position += len(STREAM_KEYWORD)
+        if self.data[position:position+2] == b"\r\n":
+            position += 2
+        elif self.data[position:position+1] == b"\n":
+            position += 1
+        else:
+            raise PDFInfoError("Bad end of line after \"stream\".")
+        length = stream_dict.get("Length")
+        if isinstance(length, Reference):
+            length, _ = self.read_indirect_object(length)
+        decoded_length = stream_dict.get("DL")
+        if decoded_length is not None:
+            decoded_length = int(decoded_length)
+        result = \
+            EmbeddedStream(
+                decoded_length=decoded_length,
+                filter_name=stream_dict.get("Filter"),
+                path_to_pdf=self.path_to_pdf,
+                offset=position,
+                length=int(length)
+            )
+        return result
+
+    def skip_whitespace(self, position):
+        """ Return the position of the next token, skipping any whitespace
+        and comments. """
+        result = WHITESPACE_PATTERN.match(self.data, position).end()
+        return result
+
+    def get_token(self, start, end):
+        """ Decode the raw bytes of a token, just as pdfrw would. """
+        result = self.data[start:end].decode(TOKEN_ENCODING)
+        return result
+
+    def parse_object(self, position):
+        """ Parse the object at a given position, returning it along with the
+        position after it. Dictionaries become dicts, arrays lists,
+        references Reference objects, and everything else the raw token. """
+        lead = self.data[position:position+2]
+        if lead == b"<<":
+            return self.parse_dict(position+2)
+        if lead[:1] == b"[":
+            return self.parse_array(position+1)
+        if lead[:1] == b"(":
+            end = self.find_end_of_literal_string(position)
+            return self.get_token(position, end), end
+        if lead[:1] == b"<":
+            end = self.data.find(b">", position)+1
+            if not end:
+                raise PDFInfoError("Unterminated hex string.")
+            return self.get_token(position, end), end
+        if lead[:1] == b"/":
+            end = NAME_PATTERN.match(self.data, position).end()
+            return self.get_token(position, end), end
+        match = REFERENCE_PATTERN.match(self.data, position)
+        if match:
+            reference = \
+                Reference(int(match.group(1)), int(match.group(2)))
+            return reference, match.end()
+        match = REGULAR_PATTERN.match(self.data, position)
+        if not match:
+            raise PDFInfoError("Unexpected byte at "+str(position))
+        return self.get_token(position, match.end()), match.end()
+
+    def parse_dict(self, position):
+        """ Parse the rest of a dictionary, the "<<" having been read. """
+        result = {}
+        position = self.skip_whitespace(position)
+        while self.data[position:position+2] != b">>":
+            match = NAME_PATTERN.match(self.data, position)
+            if not match:
+                raise PDFInfoError("Expected a key at "+str(position))
+            key = self.get_token(position+1, match.end())
+            value, position = \
+                self.parse_object(self.skip_whitespace(match.end()))
+            result[key] = value
+            position = self.skip_whitespace(position)
+        return result, position+2
+
+    def parse_array(self, position):
+        """ Parse the rest of an array, the "[" having been read. """
+        result = []
+        position = self.skip_whitespace(position)
+        while self.data[position:position+1] != b"]":
+            value, position = self.parse_object(position)
+            result.append(value)
+            position = self.skip_whitespace(position)
+        return result, position+1
+
+    def find_end_of_literal_string(self, position):
+        """ Find the position just after the literal string which starts at
+        a given position. A string with no escapes or nested brackets in it -
+        which is to say, a string of hex - is dealt with by a couple of
+        searches for single bytes, which are very fast. """
+        close_position = self.data.find(b")", position)
+        if (
+            close_position >= 0 and
+            self.data.find(b"\\", position, close_position) < 0 and
+            self.data.find(b"(", position+1, close_position) < 0
+        ):
+            return close_position+1
+        result = self.find_end_of_awkward_string(position)
+        return result
+
+    def find_end_of_awkward_string(self, position):
+        """ As above, but allowing for nested brackets and escapes. """
+        depth = 0
+        while True:
+            match = STRING_SPECIAL_PATTERN.search(self.data, position)
+            if not match:
+                raise PDFInfoError("Unterminated string.")
+            char = match.group()
+            position = match.end()
+            if char == b"\\":
+                position += 1
+            elif char == b"(":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return position
+
+################################
+# HELPER CLASSES AND FUNCTIONS #
+################################
+
+class PDFInfoError(Exception):
+    """ A custom exception. """
+
+def get_embedded_stream(value):
+    """ Get an EmbeddedStream object from a given value from an Info
+    dictionary, which may already be one, or may be a stream read by
+    pdfrw. """
+    if isinstance(value, EmbeddedStream):
+        return value
+    if getattr(value, "stream", None) is None:
+        raise PDFInfoError("Not a stream.")
+    decoded_length = value.DL
+    if decoded_length is not None:
+        decoded_length = int(decoded_length)
+    result = \
+        EmbeddedStream(
+            decoded_length=decoded_length,
+            filter_name=value.Filter,
+            data=value.stream.encode(TOKEN_ENCODING)
+        )
+    return result
+
+def read_trailer(path_to_pdf):
+    """ Read the trailer of the PDF at a given path, using the light reader
+    if we can, or pdfrw if we can't. """
+    try:
+        result = TrailerReader(path_to_pdf=path_to_pdf).read()
+    except PDFInfoError:
+        result = PdfReader(path_to_pdf)
+    return result
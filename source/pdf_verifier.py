@@ -6,14 +6,14 @@ issued by the Chancellor.
 # Standard imports.
 from dataclasses import dataclass
 
-# Non-standard imports.
-from pdfrw import PdfReader
-
 # Local imports.
 from .configs import DEFAULT_PATH_TO_PUBLIC_KEY
 from .digistamp import Verifier
+from .instrumentation import Instrument, get_instrument
+from .key_registry import get_verifier
 from .ordinance import Ordinance
-from .utils import get_hash_of_ordinance
+from .pdf_info import PDFInfoError, read_trailer
+from .utils import HashSchemeError, get_hash_of_ordinance
 
 ##############
 # MAIN CLASS #
@@ -25,17 +25,25 @@ class PDFVerifier:
     # Object attributes.
     path_to_pdf: str = None
     path_to_public_key: str = DEFAULT_PATH_TO_PUBLIC_KEY
-    trailer: PdfReader = None
+    trailer: object = None # Either a LightTrailer or a pdfrw trailer.
     verifier: Verifier = None
     ordinance: Ordinance = None
     hash: str = None
     stamp: str = None
     last_exception: Exception = None
     debug: bool = True
+    instrument: Instrument = None # Default: the process-wide instrument.
 
     def __post_init__(self):
-        self.trailer = PdfReader(self.path_to_pdf)
-        self.verifier = Verifier(path_to_public_key=self.path_to_public_key)
+        if not self.instrument:
+            self.instrument = get_instrument()
+        with self.instrument.stage("verify_pdf.read_trailer"):
+            self.trailer = read_trailer(self.path_to_pdf)
+        # A verifier may be passed in, so that the key is loaded only once
+        # when checking many PDFs.
+        if not self.verifier:
+            self.verifier = \
+                get_verifier(path_to_public_key=self.path_to_public_key)
 
     def load_ordinance(self):
         """ Load the ordinance's data from the trailer. """
@@ -58,24 +66,38 @@ class PDFVerifier:
 
     def check_hash(self):
         """ Check that the hash is what it's supposed to be, given the
-        ordinance's data. """
-        intended_hash = get_hash_of_ordinance(self.ordinance)
+        ordinance's data, using the hash scheme it specifies. An embedded
+        annexe is decompressed and hashed a chunk at a time. """
+        try:
+            intended_hash = get_hash_of_ordinance(self.ordinance)
+        except (HashSchemeError, PDFInfoError) as my_exception:
+            raise PDFVerifierError(str(my_exception)) from my_exception
         if self.hash != intended_hash:
             raise PDFVerifierError("Failed to verify hash.")
 
     def check_stamp(self):
         """ Verify the stamp against the hash. """
-        if not self.verifier.verify(self.hash, self.stamp):
+        verified = \
+            self.verifier.verify(
+                self.hash,
+                self.stamp,
+                stamp_scheme=self.ordinance.stamp_scheme
+            )
+        if not verified:
             raise PDFVerifierError("Failed to verify stamp.")
 
     def verify(self):
         """ Carry out all the checks. """
         try:
-            self.load_ordinance()
-            self.load_hash()
-            self.load_stamp()
-            self.check_hash()
-            self.check_stamp()
+            for method in (
+                self.load_ordinance,
+                self.load_hash,
+                self.load_stamp,
+                self.check_hash,
+                self.check_stamp
+            ):
+                with self.instrument.stage("verify_pdf."+method.__name__):
+                    method()
         except PDFVerifierError as my_exception:
             self.last_exception = my_exception
             if self.debug:
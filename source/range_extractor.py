@@ -0,0 +1,166 @@
+"""
+This code defines a class which extracts a whole range of ordinances at once,
+using a pool of processes.
+"""
+
+# Standard imports.
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+
+# Local imports.
+from .configs import (
+    DEFAULT_PATH_TO_LEDGER,
+    DEFAULT_PATH_TO_EXTRACTS,
+    DEFAULT_PATH_TO_PUBLIC_KEY
+)
+from .extractor import Extractor
+from .ledger import get_ledger
+from .pdf_cache import PDFCache
+
+################
+# MAIN CLASSES #
+################
+
+@dataclass
+class RangeExtractionReport:
+    """ A class which holds the results of extracting a range of
+    ordinances. """
+    # Object attributes.
+    extracted: dict = None # Maps each ordinal to the path of its extract.
+    failures: dict = None # Maps each ordinal to an error message.
+
+    def __post_init__(self):
+        if self.extracted is None:
+            self.extracted = {}
+        if self.failures is None:
+            self.failures = {}
+
+    @property
+    def succeeded(self):
+        """ Decide whether every ordinance was extracted. """
+        result = not self.failures
+        return result
+
+    def to_dict(self):
+        """ Convert this object into a JSON-friendly dictionary. """
+        result = {
+            "succeeded": self.succeeded,
+            "extracted": {
+                str(ordinal): self.extracted[ordinal]
+                for ordinal in sorted(self.extracted)
+            },
+            "failures": {
+                str(ordinal): self.failures[ordinal]
+                for ordinal in sorted(self.failures)
+            }
+        }
+        return result
+
+    def to_json(self):
+        """ Ronseal. """
+        result = json.dumps(self.to_dict(), indent=4)
+        return result
+
+@dataclass
+class RangeExtractor:
+    """ The class in question. Each extraction gets its own working
+    directory, so that any number of them can run side by side. """
+    # Object attributes.
+    first_ordinal: int
+    last_ordinal: int
+    jobs: int = None # Defaults to the number of CPUs.
+    path_to_extracts: str = DEFAULT_PATH_TO_EXTRACTS
+    path_to_ledger: str = DEFAULT_PATH_TO_LEDGER
+    path_to_public_key: str = DEFAULT_PATH_TO_PUBLIC_KEY
+    path_to_scratch: str = None
+    path_to_pdf_cache: str = None # If None, don't use a cache.
+    report: RangeExtractionReport = None
+
+    def __post_init__(self):
+        if self.first_ordinal > self.last_ordinal:
+            raise RangeExtractorError(
+                "Invalid range: "+str(self.first_ordinal)+"-"+
+                str(self.last_ordinal)
+            )
+        if not self.jobs:
+            self.jobs = os.cpu_count() or 1
+
+    def extract(self):
+        """ Extract every ordinance in the range, and return the report. """
+        self.report = RangeExtractionReport()
+        ordinals = range(self.first_ordinal, self.last_ordinal+1)
+        extract_one = \
+            partial(
+                extract_ordinance,
+                path_to_extracts=self.path_to_extracts,
+                path_to_ledger=self.path_to_ledger,
+                path_to_public_key=self.path_to_public_key,
+                path_to_scratch=self.path_to_scratch,
+                path_to_pdf_cache=self.path_to_pdf_cache
+            )
+        if self.jobs == 1:
+            results = map(extract_one, ordinals)
+            self.record_results(results)
+        else:
+            with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+                self.record_results(executor.map(extract_one, ordinals))
+        return self.report
+
+    def record_results(self, results):
+        """ Add some (ordinal, path, error) tuples to the report. """
+        for ordinal, path_to_extract, error in results:
+            if error:
+                self.report.failures[ordinal] = error
+            else:
+                self.report.extracted[ordinal] = path_to_extract
+
+################################
+# HELPER CLASSES AND FUNCTIONS #
+################################
+
+class RangeExtractorError(Exception):
+    """ A custom exception. """
+
+def parse_range(range_str):
+    """ Convert a string such as "1-5000" into a pair of ordinals. """
+    try:
+        first_str, last_str = range_str.split("-")
+        result = (int(first_str), int(last_str))
+    except ValueError as my_exception:
+        raise RangeExtractorError(
+            "Invalid range: "+range_str
+        ) from my_exception
+    return result
+
+def extract_ordinance(
+        ordinal,
+        path_to_extracts=DEFAULT_PATH_TO_EXTRACTS,
+        path_to_ledger=DEFAULT_PATH_TO_LEDGER,
+        path_to_public_key=DEFAULT_PATH_TO_PUBLIC_KEY,
+        path_to_scratch=None,
+        path_to_pdf_cache=None
+    ):
+    """ Extract a single ordinance, returning an (ordinal, path, error) tuple
+    rather than raising, so that one bad block doesn't sink the whole
+    range. """
+    try:
+        pdf_cache = None
+        if path_to_pdf_cache:
+            pdf_cache = PDFCache(path_to_cache=path_to_pdf_cache)
+        extractor = \
+            Extractor(
+                ordinal=ordinal,
+                path_to_extracts=path_to_extracts,
+                path_to_ledger=path_to_ledger,
+                path_to_public_key=path_to_public_key,
+                ledger=get_ledger(path_to_ledger),
+                path_to_scratch=path_to_scratch,
+                pdf_cache=pdf_cache
+            )
+        path_to_extract = extractor.extract()
+    except Exception as my_exception: # pylint: disable=broad-except
+        return (ordinal, None, str(my_exception))
+    return (ordinal, path_to_extract, None)
@@ -0,0 +1,151 @@
+"""
+This code defines the templates from which main.tex is rendered. Each base
+template is read and parsed only once per process, into a sequence of literal
+and slot segments, so that rendering is a single join.
+"""
+
+# Standard imports.
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+# Local imports.
+from .configs import (
+    ORDINAL_COLUMN,
+    ORDINANCE_TYPE_COLUMN,
+    LATEX_COLUMN,
+    DAY_COLUMN,
+    MONTH_COLUMN,
+    YEAR_COLUMN,
+    DECLARATION_KEY,
+    ORDER_KEY
+)
+
+# Local constants.
+MONTH_NAMES = (
+    "Jan",
+    "Feb",
+    "Mar",
+    "Apr",
+    "May",
+    "Jun",
+    "Jul",
+    "Aug",
+    "Sep",
+    "Oct",
+    "Nov",
+    "Dec"
+)
+MIN_PACKED_ORDINAL_LENGTH = 3
+# Paths.
+PATH_OBJ_TO_TEX = Path(__file__).parent/"tex"
+PATH_TO_DECLARATION_BASE = str(PATH_OBJ_TO_TEX/"base_declaration.tex")
+PATH_TO_ORDER_BASE = str(PATH_OBJ_TO_TEX/"base_order.tex")
+PATH_TO_IMAGES = str(Path(__file__).parent/"images")
+PATHS_TO_BASES = {
+    DECLARATION_KEY: PATH_TO_DECLARATION_BASE,
+    ORDER_KEY: PATH_TO_ORDER_BASE
+}
+# Markers.
+BODY_MARKER = "#BODY"
+DAY_STR_MARKER = "#DAY_STR"
+MONTH_STR_MARKER = "#MONTH_STR"
+YEAR_MARKER = "#YEAR"
+PACKED_ORDINAL_MARKER = "#PACKED_ORDINAL"
+PATH_TO_IMAGES_MARKER = "#PATH_TO_IMAGES"
+MARKERS = (
+    BODY_MARKER,
+    DAY_STR_MARKER,
+    MONTH_STR_MARKER,
+    YEAR_MARKER,
+    PACKED_ORDINAL_MARKER,
+    PATH_TO_IMAGES_MARKER
+)
+# Longest first, so that no marker can match just the start of another; the
+# group makes re.split() keep the markers.
+MARKER_PATTERN = re.compile(
+    "("+
+    "|".join(
+        re.escape(marker)
+        for marker in sorted(MARKERS, key=len, reverse=True)
+    )+
+    ")"
+)
+
+##############
+# MAIN CLASS #
+##############
+
+@dataclass(frozen=True)
+class Template:
+    """ The class in question. The segments alternate between literal text,
+    at even indices, and markers, at odd ones. """
+    # Object attributes.
+    segments: tuple
+
+    @classmethod
+    def parse(cls, text):
+        """ Split a given text into literal and slot segments. """
+        result = cls(segments=tuple(MARKER_PATTERN.split(text)))
+        return result
+
+    def render(self, values):
+        """ Fill each slot from a dictionary mapping markers to strings, in a
+        single pass. Nothing substituted is ever scanned again, so a body
+        which happens to contain a marker is left as it is. """
+        pieces = list(self.segments)
+        for index in range(1, len(pieces), 2):
+            pieces[index] = values[pieces[index]]
+        result = "".join(pieces)
+        return result
+
+################################
+# HELPER CLASSES AND FUNCTIONS #
+################################
+
+class TemplateError(Exception):
+    """ A custom exception. """
+
+@lru_cache(maxsize=None)
+def load_template(path_to_base):
+    """ Read and parse the base template at a given path. This is done once
+    per process. """
+    with open(path_to_base, "r") as base_file:
+        result = Template.parse(base_file.read())
+    return result
+
+def get_template(ordinance_type):
+    """ Get the template for a given type of ordinance. """
+    if ordinance_type not in PATHS_TO_BASES:
+        raise TemplateError(
+            "Invalid "+ORDINANCE_TYPE_COLUMN+": "+str(ordinance_type)
+        )
+    result = load_template(PATHS_TO_BASES[ordinance_type])
+    return result
+
+def get_values(block):
+    """ Get the value of each marker for a given block. """
+    result = {
+        DAY_STR_MARKER: str(block[DAY_COLUMN]).zfill(2),
+        MONTH_STR_MARKER: MONTH_NAMES[block[MONTH_COLUMN]-1],
+        YEAR_MARKER: str(block[YEAR_COLUMN]),
+        PACKED_ORDINAL_MARKER:
+            str(block[ORDINAL_COLUMN]).zfill(MIN_PACKED_ORDINAL_LENGTH),
+        PATH_TO_IMAGES_MARKER: PATH_TO_IMAGES,
+        BODY_MARKER: block[LATEX_COLUMN]
+    }
+    return result
+
+def render_main_tex(block):
+    """ Render the code for main.tex for a given block. """
+    template = get_template(block[ORDINANCE_TYPE_COLUMN])
+    result = template.render(get_values(block))
+    return result
+
+def generate_main_texs(blocks):
+    """ Yield an (ordinal, main.tex) pair for each of a given iterable of
+    blocks - or headers, which are all that's needed - e.g. for previewing
+    thousands of ordinances at once. """
+    for block in blocks:
+        yield (block[ORDINAL_COLUMN], render_main_tex(block))
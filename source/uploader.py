@@ -3,24 +3,30 @@ This code defines a class which uploads an ordinance record to the ledger.
 """
 
 # Standard imports.
-import sqlite3
 from dataclasses import dataclass
+from itertools import islice
+from typing import Iterable
 
 # Local imports.
+from .checkpoints import make_checkpoints
 from .configs import (
     DEFAULT_PATH_TO_LEDGER,
     DEFAULT_PATH_TO_PRIVATE_KEY,
+    DEFAULT_HASH_SCHEME,
     ORDINAL_COLUMN,
     HASH_COLUMN,
     GENESIS_KEY
 )
 from .digistamp import StampMachine
+from .instrumentation import Instrument, get_instrument
+from .key_registry import get_stamp_machine
+from .ledger import Ledger
 from .ordinance import Ordinance
-from .utils import dict_factory, get_hash_of_ordinance
+from .utils import get_hash_of_ordinance
 
-##############
-# MAIN CLASS #
-##############
+################
+# MAIN CLASSES #
+################
 
 @dataclass
 class Uploader:
@@ -28,78 +34,164 @@ class Uploader:
     # Object attributes.
     ordinance: Ordinance = None
     path_to_ledger: str = DEFAULT_PATH_TO_LEDGER
-    connection: sqlite3.Connection = None
-    cursor: sqlite3.Cursor = None
+    ledger: Ledger = None
     path_to_private_key: str = DEFAULT_PATH_TO_PRIVATE_KEY
     password: str = None
     stamp_machine: StampMachine = None
+    deduplicate_annexe: bool = False
+    checkpoint_interval: int = None # If None, don't make checkpoints.
+    instrument: Instrument = None # Default: the process-wide instrument.
 
     def __post_init__(self):
-        self.stamp_machine = \
-            StampMachine(
-                path_to_private_key=self.path_to_private_key,
-                password=self.password
-            )
-
-    def make_connection(self):
-        """ Ronseal. """
-        self.connection = sqlite3.connect(self.path_to_ledger)
-        self.connection.row_factory = dict_factory
-        self.cursor = self.connection.cursor()
-
-    def close_connection(self):
-        """ Ronseal. """
-        self.connection.close()
+        if not self.instrument:
+            self.instrument = get_instrument()
+        if not self.ledger:
+            self.ledger = Ledger(path_to_ledger=self.path_to_ledger)
+        if not self.stamp_machine:
+            self.stamp_machine = \
+                get_stamp_machine(
+                    path_to_private_key=self.path_to_private_key,
+                    password=self.password
+                )
 
     def add_ordinal_and_prev(self):
         """ Add the ordinal and the previous block's hash to the block. """
-        self.make_connection()
-        query = "SELECT * FROM Block ORDER BY ordinal DESC;"
-        self.cursor.execute(query)
-        result = self.cursor.fetchone()
-        self.close_connection()
-        if result:
-            self.ordinance.ordinal = result[ORDINAL_COLUMN]+1
-            self.ordinance.prev = result[HASH_COLUMN]
-        else:
-            self.ordinance.ordinal = 1
-            self.ordinance.prev = GENESIS_KEY
+        chain_ordinance(self.ordinance, self.ledger.tip())
 
     def add_hash(self):
         """ Add the hash to the present block. """
-        self.ordinance.hash = get_hash_of_ordinance(self.ordinance)
+        add_hash(self.ordinance)
+
+    def add_stamp(self):
+        """ Ronseal. """
         self.ordinance.update_stamp(self.stamp_machine)
 
     def add_new_block(self):
         """ Add a new block to the legder. """
-        attributes_tuple = (
-            "ordinal",
-            "ordinance_type",
-            "latex",
-            "year",
-            "month_num",
-            "day",
-            "stamp",
-            "annexe",
-            "prev",
-            "hash"
+        self.ledger.append(
+            self.ordinance, deduplicate_annexe=self.deduplicate_annexe
         )
-        new_block_list = []
-        substitutes_list = []
-        for attribute in attributes_tuple:
-            new_block_list.append(getattr(self.ordinance, attribute))
-            substitutes_list.append("?")
-        query = (
-            "INSERT INTO Block ("+", ".join(attributes_tuple)+") "+
-            "VALUES ("+", ".join(substitutes_list)+");"
-        )
-        self.make_connection()
-        self.cursor.execute(query, new_block_list)
-        self.connection.commit()
-        self.close_connection()
+
+    def add_checkpoints(self):
+        """ Add any checkpoints now due. """
+        if self.checkpoint_interval:
+            make_checkpoints(
+                self.ledger, self.stamp_machine, self.checkpoint_interval
+            )
 
     def upload(self):
         """ Construct a new block and add it to the chain. """
-        self.add_ordinal_and_prev()
-        self.add_hash()
-        self.add_new_block()
+        with self.instrument.stage("upload.tip"):
+            self.add_ordinal_and_prev()
+        with self.instrument.stage("upload.hash"):
+            self.add_hash()
+        with self.instrument.stage("upload.sign"):
+            self.add_stamp()
+        with self.instrument.stage("upload.insert"):
+            self.add_new_block()
+        if self.checkpoint_interval:
+            with self.instrument.stage("upload.checkpoint"):
+                self.add_checkpoints()
+
+@dataclass
+class BatchUploader:
+    """ A class which uploads many ordinances in one go. The private key is
+    loaded once, the ordinals and "prev" fields are chained in memory, and the
+    blocks are written in a single transaction - or, if commit_group_size is
+    set, in one transaction per that many blocks. """
+    # Object attributes.
+    ordinances: Iterable[Ordinance] = None
+    path_to_ledger: str = DEFAULT_PATH_TO_LEDGER
+    ledger: Ledger = None
+    path_to_private_key: str = DEFAULT_PATH_TO_PRIVATE_KEY
+    password: str = None
+    stamp_machine: StampMachine = None
+    commit_group_size: int = None
+    deduplicate_annexe: bool = False
+    checkpoint_interval: int = None # If None, don't make checkpoints.
+
+    def __post_init__(self):
+        if self.commit_group_size is not None and self.commit_group_size < 1:
+            raise UploaderError(
+                "Invalid commit group size: "+str(self.commit_group_size)
+            )
+        if not self.ledger:
+            self.ledger = Ledger(path_to_ledger=self.path_to_ledger)
+        if not self.stamp_machine:
+            self.stamp_machine = \
+                get_stamp_machine(
+                    path_to_private_key=self.path_to_private_key,
+                    password=self.password
+                )
+
+    def upload_group(self, ordinances):
+        """ Add a group of ordinances to the ledger in a single transaction,
+        returning their ordinals. The transaction takes the write lock up
+        front, so the tip can't move under us. """
+        result = []
+        with self.ledger.transaction():
+            tip = self.ledger.tip()
+            for ordinance in ordinances:
+                chain_ordinance(ordinance, tip)
+                add_hash_and_stamp(ordinance, self.stamp_machine)
+                self.ledger.append(
+                    ordinance, deduplicate_annexe=self.deduplicate_annexe
+                )
+                result.append(ordinance.ordinal)
+                tip = {
+                    ORDINAL_COLUMN: ordinance.ordinal,
+                    HASH_COLUMN: ordinance.hash
+                }
+            if self.checkpoint_interval:
+                make_checkpoints(
+                    self.ledger, self.stamp_machine, self.checkpoint_interval
+                )
+        return result
+
+    def upload(self):
+        """ Construct and add all the blocks, returning the ordinals of those
+        added. If anything goes wrong, the transaction in progress is rolled
+        back, and the exception is re-raised; any commit groups already
+        committed stay in the ledger. """
+        result = []
+        ordinances = iter(self.ordinances)
+        while True:
+            group = islice(ordinances, self.commit_group_size)
+            ordinals = self.upload_group(group)
+            result.extend(ordinals)
+            if (
+                not self.commit_group_size or
+                len(ordinals) < self.commit_group_size
+            ):
+                break
+        return result
+
+################################
+# HELPER CLASSES AND FUNCTIONS #
+################################
+
+class UploaderError(Exception):
+    """ A custom exception. """
+
+def chain_ordinance(ordinance, tip):
+    """ Add the ordinal and "prev" fields to a given ordinance, given the
+    block - or a dictionary with its ordinal and hash - at the tip of the
+    chain. """
+    if tip:
+        ordinance.ordinal = tip[ORDINAL_COLUMN]+1
+        ordinance.prev = tip[HASH_COLUMN]
+    else:
+        ordinance.ordinal = 1
+        ordinance.prev = GENESIS_KEY
+
+def add_hash(ordinance):
+    """ Add the hash to a given ordinance, choosing the hash scheme, if the
+    ordinance doesn't specify one already. """
+    if ordinance.hash_scheme is None:
+        ordinance.hash_scheme = DEFAULT_HASH_SCHEME
+    ordinance.hash = get_hash_of_ordinance(ordinance)
+
+def add_hash_and_stamp(ordinance, stamp_machine):
+    """ Add the hash and then the stamp to a given ordinance. """
+    add_hash(ordinance)
+    ordinance.update_stamp(stamp_machine)
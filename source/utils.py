@@ -5,14 +5,25 @@ This code defines some utility functions for the codebase as a whole.
 # Standard imports.
 import hashlib
 import shutil
+import struct
 from pathlib import Path
 
 # Local imports.
-from .configs import DEFAULT_LEDGER_FN, DEFAULT_PATH_OBJ_TO_DATA, ENCODING
+from .configs import (
+    DEFAULT_LEDGER_FN,
+    DEFAULT_PATH_OBJ_TO_DATA,
+    ENCODING,
+    HASH_SCHEME_V1,
+    HASH_SCHEME_V2
+)
 
 # Local constants.
 DEFAULT_PATH_TO_DATA = str(DEFAULT_PATH_OBJ_TO_DATA)
 PATH_TO_EMPTY_LEDGER = str(Path(__file__).parent/"db"/"empty_ledger.db")
+HASH_SCHEME_V2_TAG = b"chancery_b/hash/v2"
+LENGTH_FORMAT = ">Q"
+ORDINAL_FORMAT = ">Q"
+DATE_FORMAT = ">qBB"
 
 #############
 # FUNCTIONS #
@@ -27,7 +38,19 @@ def dict_factory(cursor, row):
     return result
 
 def get_hash_of_ordinance(ordinance):
-    """ Get a hash of the attributes of a given ordinance object. """
+    """ Get a hash of the attributes of a given ordinance object, using the
+    hash scheme recorded in that object. """
+    hash_scheme = ordinance.hash_scheme or HASH_SCHEME_V1
+    if hash_scheme == HASH_SCHEME_V1:
+        return get_hash_of_ordinance_v1(ordinance)
+    if hash_scheme == HASH_SCHEME_V2:
+        return get_hash_of_ordinance_v2(ordinance)
+    raise HashSchemeError("Unknown hash scheme: "+str(hash_scheme))
+
+def get_hash_of_ordinance_v1(ordinance):
+    """ Get a hash of the attributes of a given ordinance object, using the
+    original scheme. NB: bytes(n) is n zero bytes, so the cost of this grows
+    with the ordinal and the date; hence version 2. """
     hash_maker = hashlib.sha256()
     hash_maker.update(bytes(ordinance.ordinal))
     hash_maker.update(bytes(ordinance.ordinance_type, ENCODING))
@@ -36,11 +59,53 @@ def get_hash_of_ordinance(ordinance):
     hash_maker.update(bytes(ordinance.month_num))
     hash_maker.update(bytes(ordinance.day))
     if ordinance.annexe:
-        hash_maker.update(ordinance.annexe)
+        update_with_annexe(hash_maker, ordinance.annexe)
     hash_maker.update(bytes(ordinance.prev, ENCODING))
     result = hash_maker.hexdigest()
     return result
 
+def get_hash_of_ordinance_v2(ordinance):
+    """ Get a hash of the attributes of a given ordinance object, encoding
+    the integers with a fixed width, and prefixing everything else with its
+    length. """
+    hash_maker = hashlib.sha256()
+    hash_maker.update(HASH_SCHEME_V2_TAG)
+    hash_maker.update(struct.pack(ORDINAL_FORMAT, ordinance.ordinal))
+    update_with_length(hash_maker, bytes(ordinance.ordinance_type, ENCODING))
+    update_with_length(hash_maker, bytes(ordinance.latex, ENCODING))
+    hash_maker.update(
+        struct.pack(
+            DATE_FORMAT,
+            ordinance.year,
+            ordinance.month_num,
+            ordinance.day
+        )
+    )
+    hash_maker.update(
+        struct.pack(LENGTH_FORMAT, len(ordinance.annexe or b""))
+    )
+    if ordinance.annexe:
+        update_with_annexe(hash_maker, ordinance.annexe)
+    update_with_length(hash_maker, bytes(ordinance.prev, ENCODING))
+    result = hash_maker.hexdigest()
+    return result
+
+def update_with_length(hash_maker, data):
+    """ Feed a hash maker the length of some data, and then the data
+    itself. """
+    hash_maker.update(struct.pack(LENGTH_FORMAT, len(data)))
+    hash_maker.update(data)
+
+def update_with_annexe(hash_maker, annexe):
+    """ Feed a hash maker an annexe, which is either a bytes object or, if it
+    was read from a PDF, a stream object, which is fed in a chunk at a
+    time. """
+    if isinstance(annexe, (bytes, bytearray, memoryview)):
+        hash_maker.update(annexe)
+        return
+    for chunk in annexe.generate_chunks():
+        hash_maker.update(chunk)
+
 def trim_brackets(raw):
     """ Trim the brackets from a string. """
     if not raw:
@@ -91,3 +156,10 @@ def create_data_dir_as_necessary(
 def remove_data_dir(path_to_data=DEFAULT_PATH_TO_DATA):
     """ Delete the data directory, if it exists. """
     shutil.rmtree(path_to_data, ignore_errors=True)
+
+################
+# HELPER CLASS #
+################
+
+class HashSchemeError(Exception):
+    """ A custom exception. """
@@ -0,0 +1,145 @@
+"""
+This code tests the aio module.
+"""
+
+# Standard imports.
+import asyncio
+import json
+import os
+import tempfile
+from pathlib import Path
+
+# Non-standard imports.
+import pytest
+
+# Source imports.
+from source.aio import AsyncInterface, AsyncInterfaceError
+from source.configs import (
+    TEST_PASSWORD,
+    TEST_PATH_TO_DATA,
+    TEST_PATH_TO_EXTRACTS,
+    TEST_PATH_TO_LEDGER,
+    TEST_PATH_TO_PDF_CACHE,
+    TEST_PATH_TO_PRIVATE_KEY,
+    TEST_PATH_TO_PUBLIC_KEY
+)
+from source.extractor import (
+    WORKING_DIR_PREFIX,
+    get_default_path_to_scratch
+)
+from source.ledger import Ledger
+from source.utils import remove_data_dir
+
+# Local imports.
+from utils import construct_test_data
+
+# Local constants.
+UPLOADS = 8
+
+#############
+# FUNCTIONS #
+#############
+
+def make_async_interface(**kwargs):
+    """ Make an interface onto the test data. """
+    result = \
+        AsyncInterface(
+            path_to_ledger=TEST_PATH_TO_LEDGER,
+            path_to_extracts=TEST_PATH_TO_EXTRACTS,
+            path_to_private_key=TEST_PATH_TO_PRIVATE_KEY,
+            path_to_public_key=TEST_PATH_TO_PUBLIC_KEY,
+            path_to_pdf_cache=TEST_PATH_TO_PDF_CACHE,
+            password=TEST_PASSWORD,
+            **kwargs
+        )
+    return result
+
+def write_input_file(index):
+    """ Write an input file for an ordinance, and return its path. """
+    result = os.path.join(TEST_PATH_TO_DATA, "input_"+str(index)+".json")
+    input_dict = {
+        "ordinance_type": "order",
+        "latex": "Concurrent ordinance number "+str(index)+".",
+        "year": 2003,
+        "month_num": 4,
+        "day": 5
+    }
+    with open(result, "w") as input_file:
+        json.dump(input_dict, input_file)
+    return result
+
+async def upload_extract_and_verify(async_interface):
+    """ Upload several ordinances at once, then extract and verify them all
+    at once, returning the ordinals and the verdicts. """
+    ordinals = \
+        await asyncio.gather(*(
+            async_interface.upload_ordinance_from_input_file(
+                write_input_file(index)
+            )
+            for index in range(UPLOADS)
+        ))
+    paths_to_extracts = \
+        await asyncio.gather(*(
+            async_interface.extract_ordinance_with_ordinal(ordinal)
+            for ordinal in [1]+ordinals
+        ))
+    verdicts = \
+        await asyncio.gather(*(
+            async_interface.verify_pdf(
+                os.path.join(path_to_extract, "main.pdf")
+            )
+            for path_to_extract in paths_to_extracts
+        ))
+    return ordinals, verdicts
+
+###########
+# TESTING #
+###########
+
+def test_async_interface():
+    """ (1) Upload, extract and verify several ordinances concurrently. (2)
+    Check that the uploads were chained in turn, and that every extract
+    verifies. """
+    construct_test_data()
+    async_interface = make_async_interface(latex_jobs=2, max_requests=4)
+    ordinals, verdicts = \
+        asyncio.run(upload_extract_and_verify(async_interface))
+    assert sorted(ordinals) == list(range(2, UPLOADS+2))
+    assert all(verdicts)
+    ledger = Ledger(path_to_ledger=TEST_PATH_TO_LEDGER)
+    for ordinal in range(2, UPLOADS+2):
+        assert ledger.get(ordinal)["prev"] == ledger.get(ordinal-1)["hash"]
+    ledger.close()
+    # The semaphores are remade for a new event loop.
+    assert asyncio.run(async_interface.verify_pdf(
+        os.path.join(TEST_PATH_TO_EXTRACTS, "1", "main.pdf")
+    ))
+    async_interface.close()
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
+
+def test_async_interface_timeouts():
+    """ Test that LaTeX, and whole requests, are cut off when they run out
+    of time, and that the working directory is still cleaned up. """
+    construct_test_data()
+    path_obj_to_scratch = \
+        Path(get_default_path_to_scratch() or tempfile.gettempdir())
+    working_dir_pattern = WORKING_DIR_PREFIX+"1_*"
+    working_dirs = set(path_obj_to_scratch.glob(working_dir_pattern))
+    async_interface = make_async_interface(latex_timeout=0.001)
+    with pytest.raises(AsyncInterfaceError):
+        asyncio.run(
+            async_interface.extract_ordinance_with_ordinal(
+                1, use_pdf_cache=False
+            )
+        )
+    async_interface.latex_timeout = None
+    with pytest.raises(AsyncInterfaceError):
+        asyncio.run(
+            async_interface.extract_ordinance_with_ordinal(
+                1, use_pdf_cache=False, timeout=0.001
+            )
+        )
+    assert not os.path.exists(os.path.join(TEST_PATH_TO_EXTRACTS, "1"))
+    assert set(path_obj_to_scratch.glob(working_dir_pattern)) == working_dirs
+    async_interface.close()
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
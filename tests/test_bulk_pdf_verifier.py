@@ -0,0 +1,87 @@
+"""
+This code tests the BulkPDFVerifier class.
+"""
+
+# Standard imports.
+import json
+import shutil
+from pathlib import Path
+
+# Source imports.
+from source.bulk_pdf_verifier import (
+    BulkPDFVerifier,
+    PDFVerificationResult,
+    generate_paths_to_pdfs
+)
+from source.configs import (
+    TEST_PATH_TO_DATA,
+    TEST_PATH_TO_EXTRACTS,
+    TEST_PATH_TO_LEDGER,
+    TEST_PATH_TO_PUBLIC_KEY
+)
+from source.extractor import Extractor
+from source.utils import remove_data_dir
+
+# Local imports.
+from utils import construct_test_data
+
+# Local constants.
+PATH_TO_BAD_PDF = str(Path(__file__).parent/"test_data"/"test_pdf_bad.pdf")
+PATH_OBJ_TO_INTAKE = Path(TEST_PATH_TO_DATA)/"intake"
+
+###########
+# TESTING #
+###########
+
+def test_bulk_pdf_verifier():
+    """ (1) Set up a directory tree of good, bad and broken PDFs; (2) verify
+    them with a pool; (3) check each result; (4) clean. """
+    # Set up.
+    construct_test_data()
+    extractor = \
+        Extractor(
+            ordinal=1,
+            path_to_extracts=TEST_PATH_TO_EXTRACTS,
+            path_to_ledger=TEST_PATH_TO_LEDGER,
+            path_to_public_key=TEST_PATH_TO_PUBLIC_KEY
+        )
+    path_obj_to_good = Path(extractor.extract())/"main.pdf"
+    (PATH_OBJ_TO_INTAKE/"sub").mkdir(parents=True)
+    shutil.copy(path_obj_to_good, PATH_OBJ_TO_INTAKE/"good.pdf")
+    shutil.copy(PATH_TO_BAD_PDF, PATH_OBJ_TO_INTAKE/"sub"/"bad.pdf")
+    (PATH_OBJ_TO_INTAKE/"sub"/"broken.pdf").write_text("Not a PDF.")
+    (PATH_OBJ_TO_INTAKE/"notes.txt").write_text("Not even a PDF name.")
+    # Verify.
+    bulk_verifier = \
+        BulkPDFVerifier(
+            paths_to_pdfs=generate_paths_to_pdfs(str(PATH_OBJ_TO_INTAKE)),
+            path_to_public_key=TEST_PATH_TO_PUBLIC_KEY,
+            jobs=2,
+            chunk_size=1
+        )
+    results = {
+        Path(result.path_to_pdf).name: result
+        for result in bulk_verifier.generate_results()
+    }
+    # Check.
+    assert sorted(results) == ["bad.pdf", "broken.pdf", "good.pdf"]
+    assert results["good.pdf"].verified
+    assert results["good.pdf"].reason is None
+    assert not results["bad.pdf"].verified
+    assert results["bad.pdf"].reason == "Failed to verify stamp."
+    assert not results["broken.pdf"].verified
+    assert results["broken.pdf"].reason
+    assert (bulk_verifier.verified_count, bulk_verifier.failed_count) == (1, 2)
+    assert not bulk_verifier.all_verified
+    # Clean.
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
+
+def test_pdf_verification_result_to_json():
+    """ Test that each result is a single line of JSON. """
+    result = \
+        PDFVerificationResult(
+            path_to_pdf="a.pdf", verified=False, reason="Missing hash."
+        )
+    assert "\n" not in result.to_json()
+    assert json.loads(result.to_json()) == \
+        {"path": "a.pdf", "verified": False, "reason": "Missing hash."}
@@ -0,0 +1,153 @@
+"""
+This code tests the checkpoints module.
+"""
+
+# Standard imports.
+import hashlib
+
+# Non-standard imports.
+import pytest
+
+# Source imports.
+from source.checkpoints import (
+    CheckpointError,
+    InclusionProof,
+    check_audit_path,
+    get_audit_path,
+    get_root,
+    make_checkpoints,
+    make_inclusion_proof,
+    verify_checkpoints
+)
+from source.configs import (
+    TEST_PASSWORD,
+    TEST_PATH_TO_DATA,
+    TEST_PATH_TO_LEDGER,
+    TEST_PATH_TO_PRIVATE_KEY,
+    TEST_PATH_TO_PUBLIC_KEY
+)
+from source.digistamp import StampMachine, Verifier
+from source.ledger import Ledger
+from source.ordinance import Ordinance
+from source.uploader import BatchUploader
+from source.utils import remove_data_dir
+
+# Local imports.
+from utils import construct_test_data
+
+#############
+# FUNCTIONS #
+#############
+
+def get_reference_root(leaves):
+    """ Get the root of a tree exactly as RFC 6962 defines it. """
+    if len(leaves) == 1:
+        return leaves[0]
+    split = 1
+    while split*2 < len(leaves):
+        split *= 2
+    result = \
+        hashlib.sha256(
+            b"\x01"+
+            get_reference_root(leaves[:split])+
+            get_reference_root(leaves[split:])
+        ).digest()
+    return result
+
+def construct_checkpointed_ledger(checkpoint_interval):
+    """ Add six further blocks to the test ledger, making checkpoints as we
+    go. """
+    construct_test_data()
+    ordinances = [
+        Ordinance(
+            ordinance_type="order",
+            latex="Ordinance number "+str(index)+".",
+            year=2002,
+            month_num=3,
+            day=4
+        )
+        for index in range(6)
+    ]
+    batch_uploader = \
+        BatchUploader(
+            ordinances=ordinances,
+            path_to_ledger=TEST_PATH_TO_LEDGER,
+            path_to_private_key=TEST_PATH_TO_PRIVATE_KEY,
+            password=TEST_PASSWORD,
+            checkpoint_interval=checkpoint_interval
+        )
+    batch_uploader.upload()
+
+###########
+# TESTING #
+###########
+
+def test_merkle_tree():
+    """ Test that the roots match RFC 6962, and that every audit path leads
+    from its leaf to the root, and nowhere else. """
+    for size in range(1, 20):
+        leaves = [
+            hashlib.sha256(bytes([index])).digest() for index in range(size)
+        ]
+        root = get_root(leaves)
+        assert root == get_reference_root(leaves)
+        for index in range(size):
+            path = get_audit_path(leaves, index)
+            assert check_audit_path(leaves[index], index, size, path, root)
+            assert not \
+                check_audit_path(leaves[index], index, size, path+[root], root)
+            if size > 1:
+                other_index = (index+1)%size
+                assert not \
+                    check_audit_path(
+                        leaves[other_index], index, size, path, root
+                    )
+
+def test_inclusion_proof():
+    """ (1) Set up a ledger of seven blocks with checkpoints every three
+    blocks. (2) Check that the proof for each checkpointed block verifies,
+    survives a trip through JSON, and fails if tampered with. (3) Check that
+    the last block, not yet checkpointed, has no proof. """
+    construct_checkpointed_ledger(3)
+    ledger = Ledger(path_to_ledger=TEST_PATH_TO_LEDGER)
+    verifier = Verifier(path_to_public_key=TEST_PATH_TO_PUBLIC_KEY)
+    checkpoints = list(ledger.generate_checkpoints())
+    assert [
+        (checkpoint["first_ordinal"], checkpoint["last_ordinal"])
+        for checkpoint in checkpoints
+    ] == [(1, 3), (4, 6)]
+    assert not verify_checkpoints(ledger, verifier)
+    for ordinal in range(1, 7):
+        proof = make_inclusion_proof(ledger, ordinal)
+        assert proof.hash == ledger.get(ordinal)["hash"]
+        assert proof.verify(verifier)
+        assert InclusionProof.from_json(proof.to_json()).verify(verifier)
+        proof.hash = "0"*len(proof.hash)
+        assert not proof.verify(verifier)
+    proof = make_inclusion_proof(ledger, 5)
+    proof.checkpoint.root = "0"*64
+    assert not proof.verify(verifier)
+    with pytest.raises(CheckpointError):
+        make_inclusion_proof(ledger, 7)
+    ledger.close()
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
+
+def test_make_checkpoints():
+    """ Test that checkpoints are only made for complete runs, picking up
+    where the last one left off. """
+    construct_checkpointed_ledger(None)
+    ledger = Ledger(path_to_ledger=TEST_PATH_TO_LEDGER)
+    stamp_machine = \
+        StampMachine(
+            path_to_private_key=TEST_PATH_TO_PRIVATE_KEY,
+            password=TEST_PASSWORD
+        )
+    checkpoints = make_checkpoints(ledger, stamp_machine, 4)
+    assert [checkpoint.last_ordinal for checkpoint in checkpoints] == [4]
+    checkpoints = make_checkpoints(ledger, stamp_machine, 2)
+    assert [checkpoint.last_ordinal for checkpoint in checkpoints] == [6]
+    assert not make_checkpoints(ledger, stamp_machine, 2)
+    with pytest.raises(CheckpointError):
+        make_checkpoints(ledger, stamp_machine, 0)
+    ledger.close()
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
@@ -0,0 +1,160 @@
+"""
+This code tests the daemon and daemon_client modules.
+"""
+
+# Standard imports.
+import asyncio
+import json
+import os
+import stat
+import threading
+import time
+
+# Non-standard imports.
+import pytest
+
+# Source imports.
+from source.aio import AsyncInterface
+from source.configs import (
+    TEST_PASSWORD,
+    TEST_PATH_TO_DATA,
+    TEST_PATH_TO_EXTRACTS,
+    TEST_PATH_TO_LEDGER,
+    TEST_PATH_TO_PDF_CACHE,
+    TEST_PATH_TO_PRIVATE_KEY,
+    TEST_PATH_TO_PUBLIC_KEY,
+    TEST_PATH_TO_SOCKET
+)
+from source.daemon import ChanceryDaemon
+from source.daemon_client import (
+    DaemonError,
+    connect_to_daemon,
+    extract_ordinance_via_daemon,
+    upload_ordinance_via_daemon,
+    verify_pdf_via_daemon
+)
+from source.utils import remove_data_dir
+
+# Local imports.
+from utils import construct_test_data
+
+# Local constants.
+START_TIMEOUT = 10 # In seconds.
+
+#############
+# FUNCTIONS #
+#############
+
+def make_daemon(read_only=False):
+    """ Make a daemon onto the test data. """
+    result = \
+        ChanceryDaemon(
+            path_to_socket=TEST_PATH_TO_SOCKET,
+            async_interface=
+                AsyncInterface(
+                    path_to_ledger=TEST_PATH_TO_LEDGER,
+                    path_to_extracts=TEST_PATH_TO_EXTRACTS,
+                    path_to_private_key=TEST_PATH_TO_PRIVATE_KEY,
+                    path_to_public_key=TEST_PATH_TO_PUBLIC_KEY,
+                    path_to_pdf_cache=TEST_PATH_TO_PDF_CACHE,
+                    password=TEST_PASSWORD
+                ),
+            read_only=read_only
+        )
+    result.warm_up()
+    return result
+
+def start_daemon(daemon):
+    """ Start a given daemon on a thread of its own, and return that thread,
+    once the daemon is listening. """
+    result = \
+        threading.Thread(
+            target=asyncio.run, args=(daemon.serve(),), daemon=True
+        )
+    result.start()
+    deadline = time.monotonic()+START_TIMEOUT
+    while not os.path.exists(TEST_PATH_TO_SOCKET):
+        assert result.is_alive() and time.monotonic() < deadline
+        time.sleep(0.01)
+    return result
+
+def stop_daemon(daemon, thread):
+    """ Ronseal. """
+    daemon.stop()
+    thread.join()
+    daemon.async_interface.close()
+
+def write_input_file():
+    """ Write an input file for an ordinance, and return its path. """
+    result = os.path.join(TEST_PATH_TO_DATA, "input.json")
+    input_dict = {
+        "ordinance_type": "order",
+        "latex": "Uploaded through the daemon.",
+        "year": 2005,
+        "month_num": 6,
+        "day": 7
+    }
+    with open(result, "w") as input_file:
+        json.dump(input_dict, input_file)
+    return result
+
+###########
+# TESTING #
+###########
+
+def test_daemon():
+    """ (1) Start a daemon. (2) Upload, extract and verify an ordinance
+    through it. (3) Check that errors are passed back to the client, and
+    that the socket is private, and is removed when the daemon stops. """
+    construct_test_data()
+    daemon = make_daemon()
+    thread = start_daemon(daemon)
+    assert stat.S_IMODE(os.stat(TEST_PATH_TO_SOCKET).st_mode) == 0o600
+    with pytest.raises(DaemonError):
+        make_daemon().remove_stale_socket()
+    ordinal = \
+        upload_ordinance_via_daemon(
+            write_input_file(), path_to_socket=TEST_PATH_TO_SOCKET
+        )
+    assert ordinal == 2
+    path_to_extract = \
+        extract_ordinance_via_daemon(
+            ordinal, path_to_socket=TEST_PATH_TO_SOCKET
+        )
+    path_to_pdf = os.path.join(path_to_extract, "main.pdf")
+    assert verify_pdf_via_daemon(
+        path_to_pdf,
+        path_to_public_key=TEST_PATH_TO_PUBLIC_KEY,
+        path_to_socket=TEST_PATH_TO_SOCKET
+    )
+    client = connect_to_daemon(path_to_socket=TEST_PATH_TO_SOCKET)
+    assert client.request("ping")["pid"] == os.getpid()
+    with pytest.raises(DaemonError):
+        client.request("extract_ordinance_with_ordinal", ordinal=99)
+    with pytest.raises(DaemonError):
+        client.request("no_such_command")
+    client.close()
+    stop_daemon(daemon, thread)
+    assert not os.path.exists(TEST_PATH_TO_SOCKET)
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
+
+def test_daemon_fallback():
+    """ Test that, with no daemon listening, the client does the work in
+    process, and that a read-only daemon refuses uploads. """
+    construct_test_data()
+    path_to_bad_pdf = \
+        os.path.join(os.path.dirname(__file__), "test_data", "test_pdf_bad.pdf")
+    assert not connect_to_daemon(path_to_socket=TEST_PATH_TO_SOCKET)
+    assert not verify_pdf_via_daemon(
+        path_to_bad_pdf,
+        path_to_public_key=TEST_PATH_TO_PUBLIC_KEY,
+        path_to_socket=TEST_PATH_TO_SOCKET
+    )
+    daemon = make_daemon(read_only=True)
+    thread = start_daemon(daemon)
+    with pytest.raises(DaemonError):
+        upload_ordinance_via_daemon(
+            write_input_file(), path_to_socket=TEST_PATH_TO_SOCKET
+        )
+    stop_daemon(daemon, thread)
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
@@ -2,19 +2,42 @@
 This code tests the "digistamp" portion of the codebase.
 """
 
+# Standard imports.
+from pathlib import Path
+
 # Source imports.
 from source.configs import (
+    KEY_TYPE_ED25519,
+    STAMP_SCHEME_ED25519,
+    STAMP_SCHEME_RSA_PSS,
     TEST_PATH_TO_DATA,
     TEST_PATH_TO_PRIVATE_KEY,
     TEST_PATH_TO_PUBLIC_KEY,
     TEST_PASSWORD
 )
-from source.digistamp import StampMachine, Verifier
+from source.digistamp import StampMachine, Verifier, generate_keys
 from source.utils import remove_data_dir
 
 # Local imports.
 from utils import construct_test_data
 
+# Local constants.
+PATH_TO_ED25519_PRIVATE_KEY = str(Path(TEST_PATH_TO_DATA)/"ed25519_private.pem")
+PATH_TO_ED25519_PUBLIC_KEY = str(Path(TEST_PATH_TO_DATA)/"ed25519_public.pem")
+
+#############
+# FUNCTIONS #
+#############
+
+def generate_ed25519_keys():
+    """ Add a pair of Ed25519 keys to the test data. """
+    generate_keys(
+        path_to_private_key=PATH_TO_ED25519_PRIVATE_KEY,
+        path_to_public_key=PATH_TO_ED25519_PUBLIC_KEY,
+        password=TEST_PASSWORD,
+        key_type=KEY_TYPE_ED25519
+    )
+
 ###########
 # TESTING #
 ###########
@@ -39,3 +62,47 @@ def test_stamp_machine_and_verifier():
     assert not verifier.verify(bad_data, stamp)
     # Clean.
     remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
+
+def test_ed25519():
+    """ Test that Ed25519 keys are detected, and stamp and verify. """
+    construct_test_data()
+    generate_ed25519_keys()
+    stamp_machine = \
+        StampMachine(
+            path_to_private_key=PATH_TO_ED25519_PRIVATE_KEY,
+            password=TEST_PASSWORD
+        )
+    assert stamp_machine.stamp_scheme == STAMP_SCHEME_ED25519
+    stamp = stamp_machine.make_stamp("123")
+    assert len(bytes.fromhex(stamp)) == 64
+    verifier = Verifier(path_to_public_key=PATH_TO_ED25519_PUBLIC_KEY)
+    assert verifier.verify("123", stamp)
+    assert verifier.verify("123", stamp, stamp_scheme=STAMP_SCHEME_ED25519)
+    assert not verifier.verify("abc", stamp)
+    assert not verifier.verify("123", stamp, stamp_scheme=STAMP_SCHEME_RSA_PSS)
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
+
+def test_verifier_with_several_keys():
+    """ Test that a public key file holding both an RSA key and an Ed25519
+    key accepts stamps made with either, and nothing else. """
+    construct_test_data()
+    generate_ed25519_keys()
+    rsa_stamp = \
+        StampMachine(
+            path_to_private_key=TEST_PATH_TO_PRIVATE_KEY,
+            password=TEST_PASSWORD
+        ).make_stamp("123")
+    ed25519_stamp = \
+        StampMachine(
+            path_to_private_key=PATH_TO_ED25519_PRIVATE_KEY,
+            password=TEST_PASSWORD
+        ).make_stamp("123")
+    with open(TEST_PATH_TO_PUBLIC_KEY, "ab") as key_ring:
+        key_ring.write(Path(PATH_TO_ED25519_PUBLIC_KEY).read_bytes())
+    verifier = Verifier(path_to_public_key=TEST_PATH_TO_PUBLIC_KEY)
+    assert len(verifier.public_keys) == 2
+    assert verifier.verify("123", rsa_stamp)
+    assert verifier.verify("123", ed25519_stamp)
+    assert not verifier.verify("abc", rsa_stamp)
+    assert not verifier.verify("abc", ed25519_stamp)
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
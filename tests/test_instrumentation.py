@@ -0,0 +1,125 @@
+"""
+This code tests the instrumentation module.
+"""
+
+# Standard imports.
+import json
+import os
+
+# Non-standard imports.
+import pytest
+
+# Source imports.
+from source.configs import (
+    TEST_PASSWORD,
+    TEST_PATH_TO_DATA,
+    TEST_PATH_TO_EXTRACTS,
+    TEST_PATH_TO_LEDGER,
+    TEST_PATH_TO_PRIVATE_KEY,
+    TEST_PATH_TO_PUBLIC_KEY
+)
+from source.extractor import Extractor
+from source.instrumentation import (
+    Instrument,
+    JSONSink,
+    MemorySink,
+    get_instrument
+)
+from source.ordinance import Ordinance
+from source.pdf_verifier import PDFVerifier
+from source.uploader import Uploader
+from source.utils import remove_data_dir
+
+# Local imports.
+from utils import construct_test_data
+
+###########
+# TESTING #
+###########
+
+def test_instrument():
+    """ Test that stages are timed, passed to every sink, and marked if they
+    fail, and that an instrument without sinks records nothing. """
+    construct_test_data()
+    assert not get_instrument().sinks
+    with Instrument().stage("idle") as timing:
+        assert timing is None
+    memory_sink = MemorySink()
+    path_to_output = os.path.join(TEST_PATH_TO_DATA, "timings.jsonl")
+    instrument = \
+        Instrument(
+            sinks=[memory_sink, JSONSink(path_to_output=path_to_output)]
+        )
+    with instrument.stage("write"):
+        with open(os.path.join(TEST_PATH_TO_DATA, "scratch"), "wb") as file:
+            file.write(bytes(4096))
+    with pytest.raises(ValueError):
+        with instrument.stage("fail"):
+            raise ValueError()
+    assert [timing.name for timing in memory_sink.timings] == \
+        ["write", "fail"]
+    assert not memory_sink.timings[0].failed
+    assert memory_sink.timings[1].failed
+    if memory_sink.timings[0].bytes_written is not None:
+        assert memory_sink.timings[0].bytes_written >= 4096
+    with open(path_to_output, "r") as output_file:
+        lines = [json.loads(line) for line in output_file]
+    assert lines == [timing.to_dict() for timing in memory_sink.timings]
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
+
+def test_instrumented_stages():
+    """ (1) Upload, extract and verify an ordinance, with an in-memory sink
+    attached. (2) Check that each stage of each was recorded. """
+    construct_test_data()
+    memory_sink = MemorySink()
+    instrument = Instrument(sinks=[memory_sink])
+    ordinance = \
+        Ordinance(
+            ordinance_type="order",
+            latex="Timed.",
+            year=2001,
+            month_num=2,
+            day=3
+        )
+    Uploader(
+        ordinance=ordinance,
+        path_to_ledger=TEST_PATH_TO_LEDGER,
+        path_to_private_key=TEST_PATH_TO_PRIVATE_KEY,
+        password=TEST_PASSWORD,
+        instrument=instrument
+    ).upload()
+    path_to_extract = \
+        Extractor(
+            ordinal=ordinance.ordinal,
+            path_to_extracts=TEST_PATH_TO_EXTRACTS,
+            path_to_ledger=TEST_PATH_TO_LEDGER,
+            path_to_public_key=TEST_PATH_TO_PUBLIC_KEY,
+            instrument=instrument
+        ).extract()
+    pdf_verifier = \
+        PDFVerifier(
+            path_to_pdf=os.path.join(path_to_extract, "main.pdf"),
+            path_to_public_key=TEST_PATH_TO_PUBLIC_KEY,
+            instrument=instrument
+        )
+    assert pdf_verifier.verify()
+    assert list(memory_sink.get_totals()) == [
+        "upload.tip",
+        "upload.hash",
+        "upload.sign",
+        "upload.insert",
+        "extract.authenticate",
+        "extract.write_main_tex",
+        "extract.compile_main_tex",
+        "extract.add_metadata",
+        "extract.create_and_copy",
+        "extract.write_and_unpack_annexe",
+        "verify_pdf.read_trailer",
+        "verify_pdf.load_ordinance",
+        "verify_pdf.load_hash",
+        "verify_pdf.load_stamp",
+        "verify_pdf.check_hash",
+        "verify_pdf.check_stamp"
+    ]
+    assert not any(timing.failed for timing in memory_sink.timings)
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
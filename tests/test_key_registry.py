@@ -0,0 +1,88 @@
+"""
+This code tests the KeyRegistry class.
+"""
+
+# Standard imports.
+import os
+
+# Non-standard imports.
+import pytest
+
+# Source imports.
+from source.configs import (
+    TEST_PATH_TO_DATA,
+    TEST_PATH_TO_PRIVATE_KEY,
+    TEST_PATH_TO_PUBLIC_KEY,
+    TEST_PASSWORD
+)
+from source.digistamp import generate_keys
+from source.key_registry import KeyRegistry
+from source.utils import remove_data_dir
+
+# Local imports.
+from utils import construct_test_data
+
+#############
+# FUNCTIONS #
+#############
+
+def rotate_keys():
+    """ Replace the test keys with a new pair, making sure that the files'
+    modification times change, however coarse the file system's clock. """
+    old_mtime_ns = os.stat(TEST_PATH_TO_PUBLIC_KEY).st_mtime_ns
+    os.remove(TEST_PATH_TO_PRIVATE_KEY)
+    os.remove(TEST_PATH_TO_PUBLIC_KEY)
+    generate_keys(
+        path_to_private_key=TEST_PATH_TO_PRIVATE_KEY,
+        path_to_public_key=TEST_PATH_TO_PUBLIC_KEY,
+        password=TEST_PASSWORD
+    )
+    new_mtime_ns = old_mtime_ns+1_000_000_000
+    for path_to_key in (TEST_PATH_TO_PRIVATE_KEY, TEST_PATH_TO_PUBLIC_KEY):
+        os.utime(path_to_key, ns=(new_mtime_ns, new_mtime_ns))
+
+###########
+# TESTING #
+###########
+
+def test_key_registry():
+    """ Test that keys are loaded once, and reloaded after rotation. """
+    construct_test_data()
+    key_registry = KeyRegistry()
+    verifier = key_registry.get_verifier(TEST_PATH_TO_PUBLIC_KEY)
+    stamp_machine = \
+        key_registry.get_stamp_machine(
+            TEST_PATH_TO_PRIVATE_KEY, password=TEST_PASSWORD
+        )
+    assert key_registry.get_verifier(TEST_PATH_TO_PUBLIC_KEY) is verifier
+    assert \
+        key_registry.get_stamp_machine(
+            TEST_PATH_TO_PRIVATE_KEY, password=TEST_PASSWORD
+        ) is stamp_machine
+    assert (key_registry.hits, key_registry.misses) == (2, 2)
+    old_stamp = stamp_machine.make_stamp("123")
+    rotate_keys()
+    new_verifier = key_registry.get_verifier(TEST_PATH_TO_PUBLIC_KEY)
+    new_stamp_machine = \
+        key_registry.get_stamp_machine(
+            TEST_PATH_TO_PRIVATE_KEY, password=TEST_PASSWORD
+        )
+    assert new_verifier is not verifier
+    assert new_stamp_machine is not stamp_machine
+    assert new_verifier.verify("123", new_stamp_machine.make_stamp("123"))
+    assert not new_verifier.verify("123", old_stamp)
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
+
+def test_key_registry_wrong_password():
+    """ Test that a cached private key isn't handed out for the wrong
+    password. """
+    construct_test_data()
+    key_registry = KeyRegistry()
+    key_registry.get_stamp_machine(
+        TEST_PATH_TO_PRIVATE_KEY, password=TEST_PASSWORD
+    )
+    with pytest.raises(ValueError):
+        key_registry.get_stamp_machine(
+            TEST_PATH_TO_PRIVATE_KEY, password="wrong"+TEST_PASSWORD
+        )
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
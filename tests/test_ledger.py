@@ -0,0 +1,246 @@
+"""
+This code tests the Ledger class.
+"""
+
+# Standard imports.
+from datetime import date
+
+# Non-standard imports.
+import pytest
+
+# Source imports.
+from source.configs import (
+    TEST_LEDGER_FN,
+    TEST_PATH_TO_DATA,
+    TEST_PATH_TO_LEDGER
+)
+from source.ledger import (
+    SELECT_HEADER_BY_HASH_QUERY,
+    Ledger,
+    LedgerError,
+    get_ledger
+)
+from source.ordinance import Ordinance
+from source.utils import create_data_dir_as_necessary, remove_data_dir
+
+#############
+# FUNCTIONS #
+#############
+
+def construct_empty_test_ledger():
+    """ Ronseal. """
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
+    create_data_dir_as_necessary(
+        path_to_data=TEST_PATH_TO_DATA,
+        ledger_fn=TEST_LEDGER_FN
+    )
+
+def make_test_ordinance(ordinal, prev):
+    """ Make an ordinance which is ready to be appended. """
+    result = \
+        Ordinance(
+            ordinal=ordinal,
+            ordinance_type="order",
+            latex="Test.",
+            year=2003,
+            month_num=4,
+            day=5,
+            prev=prev,
+            hash="hash"+str(ordinal),
+            hash_scheme=2,
+            stamp="00"
+        )
+    return result
+
+###########
+# TESTING #
+###########
+
+def test_ledger():
+    """ Test the connection settings, and the basic reads and writes. """
+    construct_empty_test_ledger()
+    ledger = Ledger(path_to_ledger=TEST_PATH_TO_LEDGER)
+    journal_mode = \
+        ledger.connection.execute("PRAGMA journal_mode;").fetchone()
+    assert list(journal_mode.values()) == ["wal"]
+    assert ledger.tip() is None
+    ledger.append(make_test_ordinance(1, "genesis"))
+    with ledger.transaction():
+        ledger.append(make_test_ordinance(2, "hash1"))
+    assert ledger.tip()["ordinal"] == 2
+    assert ledger.get(1)["hash"] == "hash1"
+    assert ledger.get(3) is None
+    assert [block["ordinal"] for block in ledger.generate_blocks()] == [1, 2]
+    ledger.close()
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
+
+def test_ledger_projections():
+    """ Test that headers leave out the annexe, which can be fetched on its
+    own. """
+    construct_empty_test_ledger()
+    ledger = Ledger(path_to_ledger=TEST_PATH_TO_LEDGER)
+    ordinance = make_test_ordinance(1, "genesis")
+    ordinance.annexe = b"annexe"
+    ledger.append(ordinance)
+    assert set(ledger.tip()) == {"ordinal", "hash"}
+    assert "annexe" not in ledger.get_header(1)
+    assert ledger.get_header(1)["latex"] == "Test."
+    assert ledger.get_annexe(1) == b"annexe"
+    assert ledger.get(1)["annexe"] == b"annexe"
+    assert ledger.get_annexe(2) is None
+    assert all(
+        "annexe" not in header
+        for header in ledger.generate_blocks(headers_only=True)
+    )
+    ledger.close()
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
+
+def test_ledger_annexe_store():
+    """ Test that deduplicated annexes are stored once, read back just like
+    inline ones, and that inline annexes can be moved into the store. """
+    construct_empty_test_ledger()
+    ledger = Ledger(path_to_ledger=TEST_PATH_TO_LEDGER)
+    prev = "genesis"
+    for ordinal in (1, 2, 3):
+        ordinance = make_test_ordinance(ordinal, prev)
+        ordinance.annexe = b"same annexe"
+        ledger.append(ordinance, deduplicate_annexe=(ordinal != 3))
+        prev = ordinance.hash
+    count_query = "SELECT COUNT(*) AS count FROM Annexe;"
+    inline_query = "SELECT ordinal FROM Block WHERE annexe IS NOT NULL;"
+    assert ledger.connection.execute(count_query).fetchone()["count"] == 1
+    assert ledger.connection.execute(inline_query).fetchall() == \
+        [{"ordinal": 3}]
+    for ordinal in (1, 2, 3):
+        assert ledger.get(ordinal)["annexe"] == b"same annexe"
+        assert ledger.get_annexe(ordinal) == b"same annexe"
+    assert ledger.deduplicate_annexes() == 1
+    assert ledger.connection.execute(count_query).fetchone()["count"] == 1
+    assert not ledger.connection.execute(inline_query).fetchall()
+    assert ledger.get_annexe(3) == b"same annexe"
+    ledger.close()
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
+
+def test_ledger_transaction_rollback():
+    """ Test that an exception inside a transaction rolls it back. """
+    construct_empty_test_ledger()
+    ledger = Ledger(path_to_ledger=TEST_PATH_TO_LEDGER)
+    with pytest.raises(ZeroDivisionError):
+        with ledger.transaction():
+            ledger.append(make_test_ordinance(1, "genesis"))
+            _ = 1/0
+    assert ledger.tip() is None
+    assert not ledger.connection.in_transaction
+    ledger.close()
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
+
+def test_get_ledger():
+    """ Test that the same object is reused, until the file is replaced. """
+    construct_empty_test_ledger()
+    ledger = get_ledger(TEST_PATH_TO_LEDGER)
+    assert get_ledger(TEST_PATH_TO_LEDGER) is ledger
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
+    assert ledger.is_stale()
+    construct_empty_test_ledger()
+    get_ledger(TEST_PATH_TO_LEDGER).close()
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
+
+def test_ledger_search():
+    """ (1) Check that appended blocks can be found by their LaTeX, type and
+    date, a page at a time, without their annexes. (2) Check that a ledger
+    without a search index gets one, filled, when next opened. """
+    construct_empty_test_ledger()
+    ledger = Ledger(path_to_ledger=TEST_PATH_TO_LEDGER)
+    prev = "genesis"
+    for ordinal in range(1, 6):
+        ordinance = make_test_ordinance(ordinal, prev)
+        ordinance.latex = "A warrant for the keeper of the seals."
+        if ordinal%2:
+            ordinance.latex = "Regarding the royal swans."
+            ordinance.annexe = b"annexe"
+        ledger.append(ordinance)
+        prev = ordinance.hash
+    results = ledger.search("swan")
+    assert [result["ordinal"] for result in results] == [1, 3, 5]
+    assert "annexe" not in results[0]
+    assert \
+        [result["ordinal"] for result in ledger.search("seal", page_size=1)] \
+        == [2]
+    assert \
+        [
+            result["ordinal"]
+            for result in ledger.search("seal", page=2, page_size=1)
+        ] == [4]
+    assert not ledger.search("seal", page=3, page_size=1)
+    assert len(ledger.search("ordinance_type:order")) == 5
+    assert len(ledger.search("date:\"2003 04 05\"")) == 5
+    with pytest.raises(LedgerError):
+        ledger.search("\"unbalanced")
+    with pytest.raises(LedgerError):
+        ledger.search("swan", page=0)
+    ledger.connection.execute("DROP TABLE OrdinanceSearch;")
+    ledger.close()
+    ledger = Ledger(path_to_ledger=TEST_PATH_TO_LEDGER)
+    assert [result["ordinal"] for result in ledger.search("swan")] == [1, 3, 5]
+    assert ledger.rebuild_search_index() == 5
+    assert [result["ordinal"] for result in ledger.search("swan")] == [1, 3, 5]
+    ledger.close()
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
+
+def test_ledger_lookups():
+    """ (1) Check looking up blocks by hash, and listing them by date and by
+    type, a page at a time. (2) Check that a ledger without the indexes gets
+    them when next opened, and that the hash lookup uses one. """
+    construct_empty_test_ledger()
+    ledger = Ledger(path_to_ledger=TEST_PATH_TO_LEDGER)
+    prev = "genesis"
+    days = (3, 1, 2, 1, 3, 2)
+    for ordinal, day in enumerate(days, start=1):
+        ordinance = make_test_ordinance(ordinal, prev)
+        ordinance.day = day
+        if ordinal > 4:
+            ordinance.ordinance_type = "declaration"
+        ledger.append(ordinance)
+        prev = ordinance.hash
+    assert ledger.get_by_hash("hash3")["ordinal"] == 3
+    assert "annexe" not in ledger.get_by_hash("hash3")
+    assert ledger.get_by_hash("no such hash") is None
+    date_from = date(2003, 4, 1)
+    date_to = date(2003, 4, 2)
+    pages = [ledger.list_between(date_from, date_to, limit=3)]
+    pages.append(
+        ledger.list_between(
+            date_from, date_to, after_ordinal=pages[0][-1]["ordinal"], limit=3
+        )
+    )
+    assert \
+        [[summary["ordinal"] for summary in page] for page in pages] == \
+        [[2, 4, 3], [6]]
+    assert \
+        [
+            summary["ordinal"]
+            for summary in ledger.list_between(
+                date(2003, 4, 3), date(2003, 4, 3), after_ordinal=4
+            )
+        ] == [1, 5]
+    assert \
+        [
+            summary["ordinal"]
+            for summary in ledger.list_by_type("order", after_ordinal=1)
+        ] == [2, 3, 4]
+    assert \
+        [
+            summary["ordinal"]
+            for summary in ledger.list_by_type("declaration", limit=1)
+        ] == [5]
+    for index_name in ("BlockHash", "BlockDate", "BlockType"):
+        ledger.connection.execute("DROP INDEX "+index_name+";")
+    ledger.close()
+    ledger = Ledger(path_to_ledger=TEST_PATH_TO_LEDGER)
+    plan = \
+        ledger.connection.execute(
+            "EXPLAIN QUERY PLAN "+SELECT_HEADER_BY_HASH_QUERY, ("hash3",)
+        ).fetchall()
+    assert "USING INDEX BlockHash" in plan[0]["detail"]
+    ledger.close()
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
@@ -0,0 +1,199 @@
+"""
+This code tests the LedgerVerifier class.
+"""
+
+# Standard imports.
+import sqlite3
+from pathlib import Path
+
+# Source imports.
+from source.configs import (
+    KEY_TYPE_ED25519,
+    STAMP_SCHEME_ED25519,
+    STAMP_SCHEME_RSA_PSS,
+    TEST_PASSWORD,
+    TEST_PATH_TO_AUDIT_STATE,
+    TEST_PATH_TO_DATA,
+    TEST_PATH_TO_LEDGER,
+    TEST_PATH_TO_PRIVATE_KEY,
+    TEST_PATH_TO_PUBLIC_KEY
+)
+from source.ledger_verifier import (
+    BAD_HASH_REASON,
+    BAD_PREV_REASON,
+    BAD_STAMP_REASON,
+    LedgerVerifier
+)
+from source.digistamp import generate_keys
+from source.ordinance import Ordinance
+from source.uploader import BatchUploader
+from source.utils import remove_data_dir
+
+# Local imports.
+from utils import construct_test_data
+
+#############
+# FUNCTIONS #
+#############
+
+def construct_longer_test_ledger(
+        number, path_to_private_key=TEST_PATH_TO_PRIVATE_KEY, fresh=True
+    ):
+    """ Add a number of further blocks to the test ledger. """
+    if fresh:
+        construct_test_data()
+    ordinances = [
+        Ordinance(
+            ordinance_type="order",
+            latex="Ordinance number "+str(index)+".",
+            year=2002,
+            month_num=3,
+            day=4
+        )
+        for index in range(number)
+    ]
+    batch_uploader = \
+        BatchUploader(
+            ordinances=ordinances,
+            path_to_ledger=TEST_PATH_TO_LEDGER,
+            path_to_private_key=path_to_private_key,
+            password=TEST_PASSWORD
+        )
+    batch_uploader.upload()
+
+def audit_incrementally(full=False):
+    """ Verify the test ledger, resuming from the test audit state. """
+    ledger_verifier = \
+        LedgerVerifier(
+            path_to_ledger=TEST_PATH_TO_LEDGER,
+            path_to_public_key=TEST_PATH_TO_PUBLIC_KEY,
+            jobs=1,
+            path_to_audit_state=TEST_PATH_TO_AUDIT_STATE,
+            full=full
+        )
+    result = ledger_verifier.verify()
+    return result
+
+def tamper(query, parameters):
+    """ Run a given UPDATE query against the test ledger. """
+    connection = sqlite3.connect(TEST_PATH_TO_LEDGER)
+    connection.execute(query, parameters)
+    connection.commit()
+    connection.close()
+
+###########
+# TESTING #
+###########
+
+def test_ledger_verifier_good():
+    """ Test that an untouched ledger verifies, both serially and in
+    parallel. """
+    construct_longer_test_ledger(9)
+    for jobs in (1, 2):
+        ledger_verifier = \
+            LedgerVerifier(
+                path_to_ledger=TEST_PATH_TO_LEDGER,
+                path_to_public_key=TEST_PATH_TO_PUBLIC_KEY,
+                jobs=jobs,
+                chunk_size=3
+            )
+        report = ledger_verifier.verify()
+        assert report.verified
+        assert report.blocks_checked == 10
+        assert report.first_bad_ordinal is None
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
+
+def test_ledger_verifier_bad():
+    """ Test that tampering with the data, the links and the stamps is each
+    picked up. """
+    construct_longer_test_ledger(9)
+    tamper("UPDATE Block SET latex = ? WHERE ordinal = 4;", ("Forged.",))
+    tamper("UPDATE Block SET prev = ? WHERE ordinal = 6;", ("abc",))
+    tamper("UPDATE Block SET stamp = ? WHERE ordinal = 8;", ("00",))
+    ledger_verifier = \
+        LedgerVerifier(
+            path_to_ledger=TEST_PATH_TO_LEDGER,
+            path_to_public_key=TEST_PATH_TO_PUBLIC_KEY,
+            jobs=2,
+            chunk_size=3
+        )
+    report = ledger_verifier.verify()
+    assert not report.verified
+    assert report.first_bad_ordinal == 4
+    assert report.bad_ordinals == [4, 6, 8]
+    assert report.failures[4] == [BAD_HASH_REASON]
+    assert BAD_PREV_REASON in report.failures[6]
+    assert report.failures[8] == [BAD_STAMP_REASON]
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
+
+def test_ledger_verifier_mixed_schemes():
+    """ Test that a ledger whose key changed from RSA to Ed25519 part of the
+    way through verifies, once both public keys are in the key file. """
+    construct_longer_test_ledger(2)
+    path_to_private_key = str(Path(TEST_PATH_TO_DATA)/"ed25519_private.pem")
+    path_to_public_key = str(Path(TEST_PATH_TO_DATA)/"ed25519_public.pem")
+    generate_keys(
+        path_to_private_key=path_to_private_key,
+        path_to_public_key=path_to_public_key,
+        password=TEST_PASSWORD,
+        key_type=KEY_TYPE_ED25519
+    )
+    construct_longer_test_ledger(
+        3, path_to_private_key=path_to_private_key, fresh=False
+    )
+    with open(TEST_PATH_TO_PUBLIC_KEY, "ab") as key_ring:
+        key_ring.write(Path(path_to_public_key).read_bytes())
+    connection = sqlite3.connect(TEST_PATH_TO_LEDGER)
+    cursor = connection.execute("SELECT stamp_scheme FROM Block;")
+    assert [row[0] for row in cursor] == \
+        [STAMP_SCHEME_RSA_PSS]*3+[STAMP_SCHEME_ED25519]*3
+    connection.close()
+    ledger_verifier = \
+        LedgerVerifier(
+            path_to_ledger=TEST_PATH_TO_LEDGER,
+            path_to_public_key=TEST_PATH_TO_PUBLIC_KEY,
+            jobs=1
+        )
+    assert ledger_verifier.verify().verified
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
+
+def test_ledger_verifier_incremental():
+    """ (1) Audit a ledger from scratch. (2) Add some blocks, and check that
+    only those are audited next time. (3) Check that changing the key, or
+    asking for a full audit, starts from scratch again. """
+    construct_longer_test_ledger(3)
+    report = audit_incrementally()
+    assert report.verified
+    assert report.blocks_checked == 4
+    assert report.resumed_after_ordinal is None
+    construct_longer_test_ledger(2, fresh=False)
+    report = audit_incrementally()
+    assert report.verified
+    assert report.blocks_checked == 2
+    assert report.resumed_after_ordinal == 4
+    report = audit_incrementally()
+    assert report.verified
+    assert report.blocks_checked == 0
+    assert audit_incrementally(full=True).blocks_checked == 6
+    with open(TEST_PATH_TO_PUBLIC_KEY, "ab") as key_file:
+        key_file.write(b"\n")
+    assert audit_incrementally().blocks_checked == 6
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
+
+def test_ledger_verifier_incremental_rewrite():
+    """ Test that rewriting a block which an earlier audit has already
+    verified is picked up, and that the audit state isn't then moved on. """
+    construct_longer_test_ledger(5)
+    assert audit_incrementally().verified
+    with open(TEST_PATH_TO_AUDIT_STATE, "r") as audit_state_file:
+        old_audit_state = audit_state_file.read()
+    tamper("UPDATE Block SET latex = ? WHERE ordinal = 2;", ("Forged.",))
+    construct_longer_test_ledger(1, fresh=False)
+    report = audit_incrementally()
+    assert not report.verified
+    assert report.history_changed
+    assert report.blocks_checked == 7
+    assert report.bad_ordinals == [2]
+    with open(TEST_PATH_TO_AUDIT_STATE, "r") as audit_state_file:
+        assert audit_state_file.read() == old_audit_state
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
@@ -0,0 +1,63 @@
+"""
+This code tests the Ordinance class.
+"""
+
+# Standard imports.
+import hashlib
+import io
+import os
+import zipfile
+from pathlib import Path
+
+# Source imports.
+from source.configs import ANNEXE, ARCHIVE_FN, TEST_PATH_OBJ_TO_DATA
+from source.ordinance import Ordinance
+from source.utils import remove_data_dir
+
+# Local constants.
+PATH_OBJ_TO_TEST_ANNEXE = TEST_PATH_OBJ_TO_DATA/"annexe_source"
+
+#############
+# FUNCTIONS #
+#############
+
+def construct_test_annexe():
+    """ Make a small folder, with a subfolder, to serve as an annexe. """
+    remove_data_dir(path_to_data=str(TEST_PATH_OBJ_TO_DATA))
+    (PATH_OBJ_TO_TEST_ANNEXE/"schedules").mkdir(parents=True)
+    (PATH_OBJ_TO_TEST_ANNEXE/"key.pem").write_text("not really a key")
+    (PATH_OBJ_TO_TEST_ANNEXE/"schedules"/"one.txt").write_text("Schedule 1")
+
+def make_ordinance_with_annexe():
+    """ Ronseal. """
+    result = \
+        Ordinance(
+            ordinance_type="order",
+            latex="See annexe.",
+            year=2004,
+            month_num=5,
+            day=6,
+            annexe_path=str(PATH_OBJ_TO_TEST_ANNEXE)
+        )
+    return result
+
+###########
+# TESTING #
+###########
+
+def test_update_annexe():
+    """ Test that the annexe is zipped deterministically, hashed correctly,
+    and without leaving anything in the working directory. """
+    construct_test_annexe()
+    ordinance = make_ordinance_with_annexe()
+    assert not Path(ANNEXE).exists()
+    assert not Path(ARCHIVE_FN).exists()
+    assert \
+        ordinance.annexe_digest == hashlib.sha256(ordinance.annexe).hexdigest()
+    os.utime(PATH_OBJ_TO_TEST_ANNEXE/"key.pem", (0, 0))
+    assert make_ordinance_with_annexe().annexe == ordinance.annexe
+    with zipfile.ZipFile(io.BytesIO(ordinance.annexe)) as archive:
+        assert archive.namelist() == \
+            ["key.pem", "schedules/", "schedules/one.txt"]
+        assert archive.read("schedules/one.txt") == b"Schedule 1"
+    remove_data_dir(path_to_data=str(TEST_PATH_OBJ_TO_DATA))
@@ -0,0 +1,70 @@
+"""
+This code tests the PDFCache class.
+"""
+
+# Standard imports.
+import os
+from pathlib import Path
+
+# Source imports.
+from source.configs import TEST_PATH_TO_DATA, TEST_PATH_TO_PDF_CACHE
+from source.pdf_cache import PDFCache
+from source.utils import remove_data_dir
+
+# Local constants.
+PATH_OBJ_TO_SCRATCH = Path(TEST_PATH_TO_DATA)/"scratch"
+
+#############
+# FUNCTIONS #
+#############
+
+def make_test_pdf(filename, content):
+    """ Write a "PDF" - it need not be a real one - to the scratch
+    directory. """
+    PATH_OBJ_TO_SCRATCH.mkdir(parents=True, exist_ok=True)
+    result = PATH_OBJ_TO_SCRATCH/filename
+    result.write_bytes(content)
+    return str(result)
+
+###########
+# TESTING #
+###########
+
+def test_pdf_cache():
+    """ (1) Set up; (2) miss, store and then hit; (3) check that the keys
+    depend on the TeX; (4) clean. """
+    # Set up.
+    pdf_cache = PDFCache(path_to_cache=TEST_PATH_TO_PDF_CACHE)
+    path_to_pdf = make_test_pdf("in.pdf", b"%PDF-1.4 test")
+    path_to_dest = str(PATH_OBJ_TO_SCRATCH/"out.pdf")
+    key = pdf_cache.make_key("\\begin{document}", "pdflatex")
+    # Miss, store and hit.
+    assert not pdf_cache.fetch(key, path_to_dest)
+    pdf_cache.store(key, path_to_pdf)
+    assert pdf_cache.fetch(key, path_to_dest)
+    assert Path(path_to_dest).read_bytes() == b"%PDF-1.4 test"
+    assert pdf_cache.get_stats() == \
+        {"hits": 1, "misses": 1, "entries": 1, "bytes": 13}
+    # Check the keys.
+    assert key == pdf_cache.make_key("\\begin{document}", "pdflatex")
+    assert key != pdf_cache.make_key("\\begin{document} ", "pdflatex")
+    assert key != pdf_cache.make_key("\\begin{document}", "xelatex")
+    # Clean.
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
+
+def test_pdf_cache_eviction():
+    """ Test that, once the cache is over budget, the least recently used
+    entries are dropped first. """
+    pdf_cache = PDFCache(path_to_cache=TEST_PATH_TO_PDF_CACHE, max_bytes=20)
+    path_to_pdf = make_test_pdf("in.pdf", b"0123456789")
+    path_to_dest = str(PATH_OBJ_TO_SCRATCH/"out.pdf")
+    pdf_cache.store("a", path_to_pdf)
+    pdf_cache.store("b", path_to_pdf)
+    os.utime(pdf_cache.get_path_obj_to_entry("a"), ns=(1, 1))
+    os.utime(pdf_cache.get_path_obj_to_entry("b"), ns=(2, 2))
+    assert pdf_cache.fetch("a", path_to_dest) # Now the most recently used.
+    pdf_cache.store("c", path_to_pdf)
+    assert pdf_cache.get_path_obj_to_entry("a").exists()
+    assert not pdf_cache.get_path_obj_to_entry("b").exists()
+    assert pdf_cache.get_path_obj_to_entry("c").exists()
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
@@ -0,0 +1,179 @@
+"""
+This code tests the TrailerReader class, mostly by checking that it agrees
+with pdfrw.
+"""
+
+# Standard imports.
+import os
+import zlib
+from pathlib import Path
+
+# Non-standard imports.
+import pytest
+from pdfrw import PdfReader
+
+# Source imports.
+from source.configs import TEST_PATH_TO_DATA
+from source.pdf_info import (
+    CHUNK_SIZE,
+    EmbeddedStream,
+    LightTrailer,
+    PDFInfoError,
+    TrailerReader,
+    get_embedded_stream,
+    read_trailer
+)
+from source.utils import remove_data_dir
+
+# Local constants.
+PATH_TO_BAD_PDF = str(Path(__file__).parent/"test_data"/"test_pdf_bad.pdf")
+PATH_OBJ_TO_PDF = Path(TEST_PATH_TO_DATA)/"test.pdf"
+INFO = (
+    b"<< /Producer (pdfTeX\\(tm\\) (nested) text) /data_ordinal 12 "+
+    b"/data_latex (Line one\r\nline two) /hash <0A1b> /Trapped /False "+
+    b"/data_annexe ("+b"0f"*100000+b") >>"
+)
+
+#############
+# FUNCTIONS #
+#############
+
+def make_pdf(objects, trailer_extra=b"", base=b"", prev=None):
+    """ Make the bytes of a PDF - or of an incremental update to one - from a
+    dictionary mapping object numbers to their bodies. """
+    result = base or b"%PDF-1.4\n"
+    offsets = {}
+    for number, body in objects.items():
+        offsets[number] = len(result)
+        result += bytes(str(number), "ascii")+b" 0 obj\n"+body+b"\nendobj\n"
+    xref_position = len(result)
+    result += b"xref\n"
+    if not base:
+        result += b"0 1\n0000000000 65535 f \n"
+    for number in sorted(offsets):
+        result += bytes(str(number)+" 1\n", "ascii")
+        result += bytes("%010d 00000 n \n" % offsets[number], "ascii")
+    result += b"trailer\n<< /Size 10 /Root 1 0 R "+trailer_extra
+    if prev is not None:
+        result += b" /Prev "+bytes(str(prev), "ascii")
+    result += b" >>\nstartxref\n"+bytes(str(xref_position), "ascii")
+    result += b"\n%%EOF\n"
+    return result, xref_position
+
+def write_pdf(pdf_bytes):
+    """ Ronseal. """
+    PATH_OBJ_TO_PDF.parent.mkdir(parents=True, exist_ok=True)
+    PATH_OBJ_TO_PDF.write_bytes(pdf_bytes)
+    result = str(PATH_OBJ_TO_PDF)
+    return result
+
+def get_pdfrw_info(path_to_pdf):
+    """ Get the Info dictionary as pdfrw reads it, with the slashes taken off
+    the keys. """
+    info = PdfReader(path_to_pdf).Info
+    result = {key[1:]: value for key, value in info.items()}
+    return result
+
+def make_basic_objects():
+    """ Make a catalog and an empty page tree. """
+    result = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        2: b"<< /Type /Pages /Kids [] /Count 0 >>"
+    }
+    return result
+
+###########
+# TESTING #
+###########
+
+def test_indirect_info():
+    """ (1) Write a PDF whose Info is an indirect object; (2) check that the
+    raw tokens match pdfrw's; (3) clean. """
+    # Write a PDF.
+    objects = make_basic_objects()
+    objects[3] = INFO
+    pdf_bytes, _ = make_pdf(objects, trailer_extra=b"/Info 3 0 R")
+    path_to_pdf = write_pdf(pdf_bytes)
+    # Check the tokens.
+    trailer = TrailerReader(path_to_pdf=path_to_pdf).read()
+    assert dict(trailer.Info) == get_pdfrw_info(path_to_pdf)
+    assert trailer.Info.data_ordinal == "12"
+    assert trailer.Info.Producer == "(pdfTeX\\(tm\\) (nested) text)"
+    assert trailer.Info.missing is None
+    # Clean.
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
+
+def test_direct_info():
+    """ Test an Info dictionary which sits inside the trailer itself. """
+    pdf_bytes, _ = \
+        make_pdf(make_basic_objects(), trailer_extra=b"/Info "+INFO)
+    path_to_pdf = write_pdf(pdf_bytes)
+    trailer = TrailerReader(path_to_pdf=path_to_pdf).read()
+    assert dict(trailer.Info) == get_pdfrw_info(path_to_pdf)
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
+
+def test_incremental_update():
+    """ Test that an Info object from before an incremental update is found
+    by following /Prev. """
+    objects = make_basic_objects()
+    objects[3] = INFO
+    base, prev = make_pdf(objects, trailer_extra=b"/Info 3 0 R")
+    pdf_bytes, _ = \
+        make_pdf(
+            {4: b"(An update.)"},
+            trailer_extra=b"/Info 3 0 R",
+            base=base,
+            prev=prev
+        )
+    path_to_pdf = write_pdf(pdf_bytes)
+    trailer = TrailerReader(path_to_pdf=path_to_pdf).read()
+    assert dict(trailer.Info) == get_pdfrw_info(path_to_pdf)
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
+
+def test_fallback():
+    """ Test that a PDF with a cross-reference stream is handed to pdfrw. """
+    trailer = read_trailer(PATH_TO_BAD_PDF)
+    assert not isinstance(trailer, LightTrailer)
+    assert trailer.Info.data_ordinal == "(1)"
+
+def test_embedded_stream():
+    """ (1) Write a PDF with a compressed stream in its Info dictionary; (2)
+    check that it's read lazily, in chunks, and agrees with pdfrw; (3)
+    clean. """
+    # Write a PDF.
+    content = os.urandom(2*CHUNK_SIZE+1)
+    encoded = zlib.compress(content)
+    objects = make_basic_objects()
+    objects[3] = b"<< /data_annexe_file 4 0 R >>"
+    objects[4] = (
+        b"<< /Type /EmbeddedFile /Filter /FlateDecode /DL "+
+        bytes(str(len(content)), "ascii")+b" /Length 5 0 R >>\nstream\n"+
+        encoded+b"\nendstream"
+    )
+    objects[5] = bytes(str(len(encoded)), "ascii")
+    pdf_bytes, _ = make_pdf(objects, trailer_extra=b"/Info 3 0 R")
+    path_to_pdf = write_pdf(pdf_bytes)
+    # Check the stream.
+    stream = TrailerReader(path_to_pdf=path_to_pdf).read().Info.data_annexe_file
+    assert isinstance(stream, EmbeddedStream)
+    assert stream.data is None
+    assert len(stream) == len(content)
+    chunks = list(stream.generate_chunks())
+    assert max(len(chunk) for chunk in chunks) <= CHUNK_SIZE
+    assert b"".join(chunks) == content
+    pdfrw_stream = \
+        get_embedded_stream(PdfReader(path_to_pdf).Info.data_annexe_file)
+    assert pdfrw_stream.read() == content
+    # Clean.
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
+
+def test_embedded_stream_wrong_length():
+    """ Test that a stream which isn't as long as /DL says is rejected. """
+    stream = \
+        EmbeddedStream(
+            decoded_length=4,
+            filter_name="/FlateDecode",
+            data=zlib.compress(b"abc")
+        )
+    with pytest.raises(PDFInfoError):
+        stream.read()
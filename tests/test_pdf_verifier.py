@@ -7,13 +7,19 @@ from pathlib import Path
 
 # Source imports.
 from source.configs import (
+    METADATA_FORMAT_V1,
+    TEST_PASSWORD,
     TEST_PATH_TO_DATA,
     TEST_PATH_TO_EXTRACTS,
     TEST_PATH_TO_LEDGER,
+    TEST_PATH_TO_PRIVATE_KEY,
     TEST_PATH_TO_PUBLIC_KEY
 )
 from source.extractor import Extractor
+from source.ordinance import Ordinance
+from source.pdf_info import EmbeddedStream, TrailerReader
 from source.pdf_verifier import PDFVerifier
+from source.uploader import Uploader
 from source.utils import remove_data_dir
 
 # Local imports.
@@ -22,6 +28,59 @@ from utils import construct_test_data
 # Local constants.
 GOOD_PDF_FN = "test_pdf_good.pdf"
 PATH_TO_BAD_PDF = str(Path(__file__).parent/"test_data"/"test_pdf_bad.pdf")
+PATH_OBJ_TO_TEST_ANNEXE = Path(TEST_PATH_TO_DATA)/"annexe_source"
+
+#############
+# FUNCTIONS #
+#############
+
+def upload_ordinance_with_annexe():
+    """ Add a second ordinance, with an annexe, to the test ledger, and
+    return that annexe. """
+    PATH_OBJ_TO_TEST_ANNEXE.mkdir(parents=True)
+    (PATH_OBJ_TO_TEST_ANNEXE/"schedule.txt").write_text("Schedule 1\n"*1000)
+    ordinance = \
+        Ordinance(
+            ordinance_type="order",
+            latex="See annexe.",
+            year=2004,
+            month_num=5,
+            day=6,
+            annexe_path=str(PATH_OBJ_TO_TEST_ANNEXE)
+        )
+    uploader = \
+        Uploader(
+            ordinance=ordinance,
+            path_to_private_key=TEST_PATH_TO_PRIVATE_KEY,
+            path_to_ledger=TEST_PATH_TO_LEDGER,
+            password=TEST_PASSWORD
+        )
+    uploader.upload()
+    return ordinance.annexe
+
+def extract_pdf(ordinal, **kwargs):
+    """ Extract a given ordinance, and return the path to its PDF. """
+    extractor = \
+        Extractor(
+            ordinal=ordinal,
+            path_to_extracts=TEST_PATH_TO_EXTRACTS,
+            path_to_ledger=TEST_PATH_TO_LEDGER,
+            path_to_public_key=TEST_PATH_TO_PUBLIC_KEY,
+            **kwargs
+        )
+    result = str(Path(extractor.extract())/"main.pdf")
+    return result
+
+def verify(path_to_pdf):
+    """ Ronseal. """
+    pdf_verifier = \
+        PDFVerifier(
+            path_to_pdf=path_to_pdf,
+            path_to_public_key=TEST_PATH_TO_PUBLIC_KEY,
+            debug=False
+        )
+    result = pdf_verifier.verify()
+    return result
 
 ###########
 # TESTING #
@@ -65,3 +124,38 @@ def test_pdf_verifier_bad():
         )
     assert not pdf_verifier.verify()
     remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
+
+def test_pdf_verifier_embedded_annexe():
+    """ (1) Set up; (2) extract an ordinance with an annexe, which should be
+    embedded as a compressed stream, not hex; (3) check that it verifies; (4)
+    check that a corrupted stream does not; (5) clean. """
+    # Set up.
+    construct_test_data()
+    annexe = upload_ordinance_with_annexe()
+    # Extract.
+    path_to_pdf = extract_pdf(2)
+    info = TrailerReader(path_to_pdf=path_to_pdf).read().Info
+    assert info.data_annexe is None
+    assert isinstance(info.data_annexe_file, EmbeddedStream)
+    assert info.data_annexe_file.read() == annexe
+    # Verify.
+    assert verify(path_to_pdf)
+    # Corrupt.
+    pdf_bytes = bytearray(Path(path_to_pdf).read_bytes())
+    pdf_bytes[info.data_annexe_file.offset+20] ^= 0xff
+    Path(path_to_pdf).write_bytes(pdf_bytes)
+    assert not verify(path_to_pdf)
+    # Clean.
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
+
+def test_pdf_verifier_hex_annexe():
+    """ Test that PDFs in the old format, with the annexe in hex, still
+    verify. """
+    construct_test_data()
+    upload_ordinance_with_annexe()
+    path_to_pdf = extract_pdf(2, metadata_format=METADATA_FORMAT_V1)
+    info = TrailerReader(path_to_pdf=path_to_pdf).read().Info
+    assert info.data_annexe_file is None
+    assert info.data_annexe
+    assert verify(path_to_pdf)
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
@@ -0,0 +1,85 @@
+"""
+This code tests the RangeExtractor class.
+"""
+
+# Standard imports.
+from pathlib import Path
+
+# Source imports.
+from source.configs import (
+    TEST_PASSWORD,
+    TEST_PATH_TO_DATA,
+    TEST_PATH_TO_EXTRACTS,
+    TEST_PATH_TO_LEDGER,
+    TEST_PATH_TO_PRIVATE_KEY,
+    TEST_PATH_TO_PUBLIC_KEY
+)
+from source.ordinance import Ordinance
+from source.range_extractor import RangeExtractor
+from source.uploader import BatchUploader
+from source.utils import remove_data_dir
+
+# Local imports.
+from utils import construct_test_data
+
+#############
+# FUNCTIONS #
+#############
+
+def make_range_extractor(first_ordinal, last_ordinal):
+    """ Make an extractor for the test ledger. """
+    result = \
+        RangeExtractor(
+            first_ordinal=first_ordinal,
+            last_ordinal=last_ordinal,
+            jobs=2,
+            path_to_extracts=TEST_PATH_TO_EXTRACTS,
+            path_to_ledger=TEST_PATH_TO_LEDGER,
+            path_to_public_key=TEST_PATH_TO_PUBLIC_KEY
+        )
+    return result
+
+###########
+# TESTING #
+###########
+
+def test_range_extractor():
+    """ (1) Set up; (2) extract three ordinances at once; (3) check the
+    extracts exist; (4) clean. """
+    # Set up.
+    construct_test_data()
+    ordinances = [
+        Ordinance(
+            ordinance_type="order",
+            latex="Ordinance number "+str(index)+".",
+            year=2005,
+            month_num=6,
+            day=7
+        )
+        for index in range(2)
+    ]
+    batch_uploader = \
+        BatchUploader(
+            ordinances=ordinances,
+            path_to_ledger=TEST_PATH_TO_LEDGER,
+            path_to_private_key=TEST_PATH_TO_PRIVATE_KEY,
+            password=TEST_PASSWORD
+        )
+    batch_uploader.upload()
+    # Extract.
+    report = make_range_extractor(1, 3).extract()
+    # Check the extracts exist.
+    assert report.succeeded
+    for ordinal in (1, 2, 3):
+        assert (Path(report.extracted[ordinal])/"main.pdf").exists()
+    # Clean.
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
+
+def test_range_extractor_missing_blocks():
+    """ Test that ordinals with no block are reported, not raised. """
+    construct_test_data()
+    report = make_range_extractor(2, 3).extract()
+    assert not report.succeeded
+    assert sorted(report.failures) == [2, 3]
+    assert not report.extracted
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
@@ -0,0 +1,74 @@
+"""
+This code tests the templates module.
+"""
+
+# Non-standard imports.
+import pytest
+
+# Source imports.
+from source.templates import (
+    PATH_TO_IMAGES,
+    PATH_TO_DECLARATION_BASE,
+    TemplateError,
+    generate_main_texs,
+    load_template,
+    render_main_tex
+)
+
+# Local constants.
+TEST_BLOCK = {
+    "ordinal": 7,
+    "ordinance_type": "declaration",
+    "latex": "Let #YEAR be a year of #BODY.",
+    "year": 2001,
+    "month_num": 2,
+    "day": 3
+}
+
+###########
+# TESTING #
+###########
+
+def test_render_main_tex():
+    """ (1) Render; (2) check that the markers are filled in, and that those
+    in the body are left alone. """
+    # Render.
+    main_tex = render_main_tex(TEST_BLOCK)
+    # Check.
+    assert "Let #YEAR be a year of #BODY." in main_tex
+    assert "03 Feb 2001" in main_tex
+    assert "WNT007" in main_tex
+    assert PATH_TO_IMAGES+"/stamp.png" in main_tex
+    assert "#DAY_STR" not in main_tex
+    assert "#PATH_TO_IMAGES" not in main_tex
+
+def test_render_matches_replace():
+    """ Test that rendering agrees with plain substitution, for a body with no
+    markers in it. """
+    block = dict(TEST_BLOCK, latex="Be it known.")
+    with open(PATH_TO_DECLARATION_BASE, "r") as base_file:
+        expected = base_file.read()
+    for marker, value in (
+        ("#BODY", "Be it known."),
+        ("#DAY_STR", "03"),
+        ("#MONTH_STR", "Feb"),
+        ("#YEAR", "2001"),
+        ("#PACKED_ORDINAL", "007"),
+        ("#PATH_TO_IMAGES", PATH_TO_IMAGES)
+    ):
+        expected = expected.replace(marker, value)
+    assert render_main_tex(block) == expected
+
+def test_templates_are_loaded_once():
+    """ Test that rendering many blocks parses the base only once. """
+    load_template.cache_clear()
+    blocks = [dict(TEST_BLOCK, ordinal=ordinal) for ordinal in range(1, 101)]
+    previews = dict(generate_main_texs(blocks))
+    assert len(previews) == 100
+    assert "WNT100" in previews[100]
+    assert load_template.cache_info().misses == 1
+
+def test_invalid_ordinance_type():
+    """ Ronseal. """
+    with pytest.raises(TemplateError):
+        render_main_tex(dict(TEST_BLOCK, ordinance_type="edict"))
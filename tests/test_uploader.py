@@ -0,0 +1,125 @@
+"""
+This code tests the Uploader and BatchUploader classes.
+"""
+
+# Standard imports.
+import sqlite3
+
+# Non-standard imports.
+import pytest
+
+# Source imports.
+from source.configs import (
+    DEFAULT_HASH_SCHEME,
+    HASH_SCHEME_V1,
+    TEST_PASSWORD,
+    TEST_PATH_TO_DATA,
+    TEST_PATH_TO_LEDGER,
+    TEST_PATH_TO_PRIVATE_KEY
+)
+from source.ordinance import Ordinance
+from source.uploader import BatchUploader
+from source.utils import get_hash_of_ordinance, remove_data_dir
+
+# Local imports.
+from utils import construct_test_data
+
+#############
+# FUNCTIONS #
+#############
+
+def make_test_ordinances(number):
+    """ Make a list of simple ordinances. """
+    result = [
+        Ordinance(
+            ordinance_type="order",
+            latex="Batch ordinance number "+str(index)+".",
+            year=2001,
+            month_num=2,
+            day=3
+        )
+        for index in range(number)
+    ]
+    return result
+
+def fetch_all_blocks():
+    """ Fetch every block from the test ledger, in ordinal order. """
+    connection = sqlite3.connect(TEST_PATH_TO_LEDGER)
+    cursor = connection.cursor()
+    cursor.execute("SELECT ordinal, prev, hash FROM Block ORDER BY ordinal;")
+    result = cursor.fetchall()
+    connection.close()
+    return result
+
+###########
+# TESTING #
+###########
+
+def test_batch_uploader():
+    """ (1) Set up; (2) upload a batch in commit groups; (3) check that the
+    blocks are chained onto the existing tip; (4) clean. """
+    # Set up.
+    construct_test_data()
+    # Upload a batch.
+    ordinances = make_test_ordinances(5)
+    batch_uploader = \
+        BatchUploader(
+            ordinances=ordinances,
+            path_to_ledger=TEST_PATH_TO_LEDGER,
+            path_to_private_key=TEST_PATH_TO_PRIVATE_KEY,
+            password=TEST_PASSWORD,
+            commit_group_size=2
+        )
+    assert batch_uploader.upload() == [2, 3, 4, 5, 6]
+    # Check the chain.
+    blocks = fetch_all_blocks()
+    assert [block[0] for block in blocks] == [1, 2, 3, 4, 5, 6]
+    for prev_block, block in zip(blocks, blocks[1:]):
+        assert block[1] == prev_block[2]
+    for ordinance, block in zip(ordinances, blocks[1:]):
+        assert block[2] == get_hash_of_ordinance(ordinance)
+    # Clean.
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
+
+def test_batch_uploader_rollback():
+    """ Test that a failure part of the way through a batch leaves the ledger
+    as it was. """
+    construct_test_data()
+    ordinances = make_test_ordinances(3)
+    ordinances[2].ordinance_type = None # Violates a NOT NULL constraint.
+    batch_uploader = \
+        BatchUploader(
+            ordinances=ordinances,
+            path_to_ledger=TEST_PATH_TO_LEDGER,
+            path_to_private_key=TEST_PATH_TO_PRIVATE_KEY,
+            password=TEST_PASSWORD
+        )
+    with pytest.raises(Exception):
+        batch_uploader.upload()
+    assert len(fetch_all_blocks()) == 1
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
+
+def test_uploader_upgrades_old_ledger():
+    """ Test that uploading to a ledger which predates hash schemes adds the
+    column, leaves the old block on version 1, and puts the new one on the
+    default scheme. """
+    construct_test_data()
+    connection = sqlite3.connect(TEST_PATH_TO_LEDGER)
+    connection.execute("UPDATE Block SET hash_scheme = 1;")
+    connection.execute("ALTER TABLE Block DROP COLUMN hash_scheme;")
+    connection.commit()
+    connection.close()
+    batch_uploader = \
+        BatchUploader(
+            ordinances=make_test_ordinances(1),
+            path_to_ledger=TEST_PATH_TO_LEDGER,
+            path_to_private_key=TEST_PATH_TO_PRIVATE_KEY,
+            password=TEST_PASSWORD
+        )
+    batch_uploader.upload()
+    connection = sqlite3.connect(TEST_PATH_TO_LEDGER)
+    cursor = connection.cursor()
+    cursor.execute("SELECT hash_scheme FROM Block ORDER BY ordinal;")
+    assert cursor.fetchall() == [(HASH_SCHEME_V1,), (DEFAULT_HASH_SCHEME,)]
+    connection.close()
+    remove_data_dir(path_to_data=TEST_PATH_TO_DATA)
@@ -0,0 +1,64 @@
+"""
+This code tests the "utils" portion of the codebase.
+"""
+
+# Non-standard imports.
+import pytest
+
+# Source imports.
+from source.configs import HASH_SCHEME_V1, HASH_SCHEME_V2
+from source.ordinance import Ordinance
+from source.utils import HashSchemeError, get_hash_of_ordinance
+
+# Local constants.
+# This was computed using the original, unversioned implementation.
+EXPECTED_V1_HASH = \
+    "8dc888e5997affc7ab43f9c0020f7fd809655f4aae95d1585472ceec92e95bcc"
+
+#############
+# FUNCTIONS #
+#############
+
+def make_test_ordinance(hash_scheme):
+    """ Make an ordinance with every hashed field filled in. """
+    result = \
+        Ordinance(
+            ordinal=7,
+            ordinance_type="order",
+            latex="Be it so.",
+            year=2022,
+            month_num=10,
+            day=1,
+            annexe=b"\x01\x02",
+            prev="abc",
+            hash_scheme=hash_scheme
+        )
+    return result
+
+###########
+# TESTING #
+###########
+
+def test_hash_scheme_v1_unchanged():
+    """ Test that version 1 - and, for the sake of older ledgers and PDFs,
+    no version at all - hashes exactly as it always has. """
+    assert \
+        get_hash_of_ordinance(make_test_ordinance(None)) == EXPECTED_V1_HASH
+    assert \
+        get_hash_of_ordinance(make_test_ordinance(HASH_SCHEME_V1)) == \
+        EXPECTED_V1_HASH
+
+def test_hash_scheme_v2():
+    """ Test that version 2 differs from version 1, and that moving bytes
+    between adjacent fields changes the hash. """
+    ordinance = make_test_ordinance(HASH_SCHEME_V2)
+    hash_v2 = get_hash_of_ordinance(ordinance)
+    assert hash_v2 != EXPECTED_V1_HASH
+    ordinance.ordinance_type = "orderB"
+    ordinance.latex = "e it so."
+    assert get_hash_of_ordinance(ordinance) != hash_v2
+
+def test_unknown_hash_scheme():
+    """ Ronseal. """
+    with pytest.raises(HashSchemeError):
+        get_hash_of_ordinance(make_test_ordinance(99))
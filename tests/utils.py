@@ -2,6 +2,10 @@
 This code defines some utilities functions used by multiple test modules.
 """
 
+# Standard imports.
+import shutil
+from pathlib import Path
+
 # Source imports.
 from source.configs import (
     TEST_LEDGER_FN,
@@ -11,11 +15,19 @@ from source.configs import (
     TEST_PATH_TO_PRIVATE_KEY,
     TEST_PATH_TO_PUBLIC_KEY
 )
-from source.digistamp import generate_keys
 from source.ordinance import Ordinance
 from source.uploader import Uploader
 from source.utils import create_data_dir_as_necessary, remove_data_dir
 
+# Local constants.
+# A fixed pair of keys - the private one encrypted with TEST_PASSWORD - so
+# that the tests needn't generate a fresh pair every time.
+PATH_OBJ_TO_FIXED_DATA = Path(__file__).parent/"test_data"
+PATH_TO_FIXED_PRIVATE_KEY = \
+    str(PATH_OBJ_TO_FIXED_DATA/"fixed_stamp_private_key.pem")
+PATH_TO_FIXED_PUBLIC_KEY = \
+    str(PATH_OBJ_TO_FIXED_DATA/"fixed_stamp_public_key.pem")
+
 #############
 # FUNCTIONS #
 #############
@@ -31,11 +43,8 @@ def construct_test_data():
         ledger_fn=TEST_LEDGER_FN
     )
     # Add test keys.
-    generate_keys(
-        path_to_private_key=TEST_PATH_TO_PRIVATE_KEY,
-        path_to_public_key=TEST_PATH_TO_PUBLIC_KEY,
-        password=TEST_PASSWORD
-    )
+    shutil.copyfile(PATH_TO_FIXED_PRIVATE_KEY, TEST_PATH_TO_PRIVATE_KEY)
+    shutil.copyfile(PATH_TO_FIXED_PUBLIC_KEY, TEST_PATH_TO_PUBLIC_KEY)
     # Add test data to the ledger.
     ordinance = \
         Ordinance(